@@ -0,0 +1,33 @@
+import argparse
+import os
+import sys
+from pathlib import Path
+
+from helpers.logger import logger
+from models.enums import BatchJobStatus
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the whole pipeline on several datasets concurrently, without prompting, and summarize the runs.")
+    parser.add_argument("datasets", nargs="+", help="Dataset folders holding a dataset and its config, or glob patterns of such folders or of their config files, e.g. 'samples/datasets/*'.")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="Number of datasets run at the same time.")
+    parser.add_argument("--timeout", type=float, help="Wall time in seconds after which a dataset run is killed.")
+    parser.add_argument("--memory-limit-mb", type=int, help="Address space limit of each dataset run in MB.")
+    parser.add_argument("--cpu-seconds", type=int, help="CPU time limit of each dataset run in seconds.")
+    parser.add_argument("--threads", type=int, help="Number of BLAS and OpenMP threads of each dataset run.")
+    parser.add_argument("--summary", type=Path, help="JSON file for the batch summary. Defaults to a timestamped file in 'temp/batch_summaries'.")
+    arguments = parser.parse_args()
+    try:
+        from services import batch_runner_service
+        dataset_folders = batch_runner_service.find_dataset_folders(arguments.datasets)
+        batch_results = batch_runner_service.run_batch(dataset_folders, max(1, arguments.workers), arguments.timeout, arguments.memory_limit_mb,
+                                                       arguments.cpu_seconds, arguments.threads, arguments.summary)
+    except Exception as exception:
+        logger.error(f"\tError in batch run. Exception: {str(exception)}")
+        sys.exit(1)
+    if any(batch_result.status != BatchJobStatus.SUCCEEDED for batch_result in batch_results):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+import argparse
+import os
+import re
+import subprocess
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from configurations.constants import TEMP_FOLDER_PATH
+from helpers.functions import write_json, read_json
+from helpers.logger import logger
+
+DEFAULT_MODULES = ["ml_pipeline", "predict", "scoring_server", "batch_runner", "invalidate_cache", "services.prediction_service", "services.pipeline_service"]
+ESTIMATOR_MODULES = ["sklearn.ensemble", "sklearn.svm", "sklearn.neighbors", "sklearn.tree", "sklearn.naive_bayes", "sklearn.linear_model"]
+MINIMUM_IMPORT_REGRESSION_MS = 20.0
+IMPORT_TIME_LINE_PATTERN = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure the import time of the entry points with 'python -X importtime', check that no estimator module is imported at startup "
+                                                 "and flag import time regressions against a baseline.")
+    parser.add_argument("--modules", nargs="*", default=DEFAULT_MODULES, help="Modules whose import is measured.")
+    parser.add_argument("--forbidden-modules", nargs="*", default=ESTIMATOR_MODULES, help="Modules that must not be imported by the measured modules.")
+    parser.add_argument("--repeats", type=int, default=5, help="Number of fresh interpreters started for each module.")
+    parser.add_argument("--output", type=Path, default=None, help="Path of the results JSON file.")
+    parser.add_argument("--baseline", type=Path, default=None, help="Results JSON file of a previous run to compare with.")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Relative import time growth over the baseline that is flagged as a regression.")
+    arguments = parser.parse_args()
+
+    results = {"created_at": datetime.now().isoformat(timespec="seconds"), "python": sys.version.split()[0], "modules": dict()}
+    for module in arguments.modules:
+        results["modules"][module] = __benchmark_module_import(module, arguments.repeats, arguments.forbidden_modules)
+
+    output_path = arguments.output or TEMP_FOLDER_PATH / "benchmarks" / f"import_time_benchmark_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    os.makedirs(output_path.parent, exist_ok=True)
+    write_json(output_path, results)
+    logger.info(f"Import time results saved at '{output_path}'")
+
+    regressions = [f"{module}: imports {result['forbidden_imports']}" for module, result in results["modules"].items() if result["forbidden_imports"]]
+    if arguments.baseline is not None:
+        regressions.extend(__compare_with_baseline(results, read_json(arguments.baseline), arguments.tolerance))
+    if regressions:
+        logger.warning(f"{len(regressions)} import regressions:")
+        for regression in regressions:
+            logger.warning(f"\t{regression}")
+        sys.exit(1)
+    logger.info("No import regressions")
+
+
+def __benchmark_module_import(module: str, repeats: int, forbidden_modules: List[str]) -> Dict:
+    import_milliseconds, wall_milliseconds = list(), list()
+    for _ in range(repeats):
+        start_time = time.perf_counter()
+        process = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"], capture_output=True, text=True, env={**os.environ, "PYTHONPATH": os.getcwd()})
+        wall_milliseconds.append((time.perf_counter() - start_time) * 1000)
+        if process.returncode:
+            raise Exception(f"Importing module '{module}' failed: {process.stderr.strip().splitlines()[-1]}")
+        import_lines = __get_module_import_lines(__parse_import_times(process.stderr), module)
+        import_milliseconds.append(import_lines[-1][1])
+    imported_modules = {name for _, _, _, name in import_lines[:-1]}
+    top_level_packages = sorted([(name, cumulative_ms) for _, cumulative_ms, _, name in import_lines[:-1] if "." not in name],
+                                key=lambda package: package[1], reverse=True)
+    result = {"import_ms": import_milliseconds, "best_import_ms": min(import_milliseconds), "median_import_ms": float(np.median(import_milliseconds)),
+              "best_wall_ms": min(wall_milliseconds), "imported_modules_count": len(imported_modules),
+              "slowest_packages": [[name, cumulative_ms] for name, cumulative_ms in top_level_packages[:10]],
+              "forbidden_imports": sorted(imported_modules & set(forbidden_modules))}
+    logger.info(f"Module '{module}': best import {result['best_import_ms']:.1f} ms, median {result['median_import_ms']:.1f} ms, "
+                f"best interpreter wall time {result['best_wall_ms']:.1f} ms, {len(imported_modules)} modules imported")
+    for name, cumulative_ms in result["slowest_packages"][:5]:
+        logger.info(f"\t{name}: {cumulative_ms:.1f} ms")
+    return result
+
+
+def __parse_import_times(import_time_output: str) -> List[Tuple[float, float, int, str]]:
+    import_lines = list()
+    for line in import_time_output.splitlines():
+        match = IMPORT_TIME_LINE_PATTERN.match(line)
+        if match:
+            import_lines.append((int(match.group(1)) / 1000, int(match.group(2)) / 1000, (len(match.group(3)) - 1) // 2, match.group(4)))
+    return import_lines
+
+
+def __get_module_import_lines(import_lines: List[Tuple[float, float, int, str]], module: str) -> List[Tuple[float, float, int, str]]:
+    module_index = max(index for index, (_, _, depth, name) in enumerate(import_lines) if name == module and depth == 0)
+    first_index = module_index
+    while first_index > 0 and import_lines[first_index - 1][2] > 0:
+        first_index -= 1
+    return import_lines[first_index:module_index + 1]
+
+
+def __compare_with_baseline(results: Dict, baseline: Dict, tolerance: float) -> List[str]:
+    regressions = list()
+    for module, result in results["modules"].items():
+        baseline_result = baseline.get("modules", dict()).get(module)
+        if baseline_result is None:
+            logger.info(f"\tModule '{module}' has no baseline")
+            continue
+        import_time_growth = result["best_import_ms"] - baseline_result["best_import_ms"]
+        if import_time_growth > MINIMUM_IMPORT_REGRESSION_MS and import_time_growth > tolerance * baseline_result["best_import_ms"]:
+            regressions.append(f"{module}: import time {result['best_import_ms']:.1f} ms against {baseline_result['best_import_ms']:.1f} ms "
+                               f"({import_time_growth / baseline_result['best_import_ms']:+.1%})")
+    return regressions
+
+
+if __name__ == "__main__":
+    main()
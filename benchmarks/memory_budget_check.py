@@ -0,0 +1,54 @@
+import argparse
+import shutil
+import sys
+
+import numpy as np
+
+from configurations.constants import MODELS_PERFORMANCE_FILE
+from helpers.artifact_cache import preprocessing_cache, model_cache
+from helpers.artifact_writer import artifact_writer
+from helpers.functions import read_json
+from helpers.logger import logger
+from models.enums import ModelTrainingStatus
+from models.models import TrainingBudgetConfig
+from services.dataset_preprocessing_service import preprocess_dataset
+from services.model_training_service import train_models
+from services.read_dataset_service import read_dataset
+
+BYTES_IN_MB = 1024 ** 2
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check that the model memory budget only counts the memory a training worker allocates: train the models of a sample dataset "
+                                                 "under a generous memory budget from a parent process inflated with a large array, and fail if any model is killed for memory.")
+    parser.add_argument("--dataset", default="titanic", help="Name of the sample dataset whose models are trained.")
+    parser.add_argument("--parent-mb", type=int, default=600, help="Size of the array allocated in the parent process before the workers are forked.")
+    parser.add_argument("--budget-mb", type=int, default=300, help="Model memory budget, generous for the sample dataset but smaller than the parent process.")
+    parser.add_argument("--keep-artifacts", action="store_true", help="Keep the working directory of the check.")
+    arguments = parser.parse_args()
+
+    preprocessing_cache.enabled = False
+    model_cache.enabled = False
+    parent_ballast = np.ones(arguments.parent_mb * BYTES_IN_MB // 8)
+    logger.info(f"Parent process inflated by {parent_ballast.nbytes / BYTES_IN_MB:.0f} MB")
+    dataset, config = read_dataset(arguments.dataset)
+    try:
+        config.training_config.budget = TrainingBudgetConfig(model_memory_budget_mb=arguments.budget_mb)
+        train_models(preprocess_dataset(dataset, config), config)
+        artifact_writer.flush()
+        models_performance = read_json(config.working_directory_path / MODELS_PERFORMANCE_FILE)
+    finally:
+        artifact_writer.flush()
+        if not arguments.keep_artifacts:
+            shutil.rmtree(config.working_directory_path, ignore_errors=True)
+
+    killed_models = [model_performance["model"] for model_performance in models_performance
+                     if model_performance["training_status"] == ModelTrainingStatus.MEMORY_EXCEEDED.value]
+    if killed_models:
+        logger.warning(f"{len(killed_models)} of {len(models_performance)} models killed for exceeding the {arguments.budget_mb} MB memory budget: {killed_models}")
+        sys.exit(1)
+    logger.info(f"No model killed for exceeding the {arguments.budget_mb} MB memory budget")
+
+
+if __name__ == "__main__":
+    main()
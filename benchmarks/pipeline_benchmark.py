@@ -0,0 +1,227 @@
+import argparse
+import os
+import platform
+import shutil
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+import sklearn
+
+from benchmarks.synthetic_dataset_generator import generate_dataset, write_sample_dataset
+from configurations.constants import SAMPLE_DATASETS_PATH, TEMP_FOLDER_PATH
+from helpers.artifact_cache import preprocessing_cache, model_cache
+from helpers.artifact_writer import artifact_writer
+from helpers.functions import write_json, read_json, to_model_input
+from helpers.logger import logger
+from helpers.profiler import profiler
+from models.enums import ProblemType, PreprocessingMode, ClassificationModels, RegressionModels
+from models.models import DatasetConfig, DatasetSplits
+from services.dataset_preprocessing_service import preprocess_dataset
+from services.model_training_services.classification_models import get_classification_model
+from services.model_training_services.regression_models import get_regression_model
+from services.preprocessing_services.dataset_spliting_service import split_training_testing_validation_datasets
+from services.preprocessing_services.feature_encoding_service import encode_categorical_features
+from services.preprocessing_services.feature_scaling_service import scale_continuous_features
+from services.preprocessing_services.dtype_compaction_service import compact_dataset_splits
+from services.preprocessing_services.missing_values_handler import handle_missing_values
+from services.read_dataset_service import read_dataset
+
+BENCHMARK_DATASET_NAME = "ztmp_pipeline_benchmark"
+MINIMUM_MEMORY_REGRESSION_MB = 1.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark reading, every preprocessing stage and every estimator on a synthetic dataset, save the results as JSON "
+                                                 "and flag throughput and memory regressions against a baseline. Run with SNAPSHOT_FORMAT=none to leave snapshot writes out of the timings.")
+    parser.add_argument("--rows", type=int, default=20_000, help="Number of rows of the synthetic dataset.")
+    parser.add_argument("--continuous-columns", type=int, default=20, help="Number of continuous columns.")
+    parser.add_argument("--categorical-columns", type=int, default=10, help="Number of categorical columns.")
+    parser.add_argument("--cardinality", type=int, default=10, help="Number of categories of each multi onehot and ordinal encoded column.")
+    parser.add_argument("--missing-rate", type=float, default=0.05, help="Fraction of missing values in each feature column.")
+    parser.add_argument("--problem-type", choices=[ProblemType.CLASSIFICATION.value, ProblemType.REGRESSION.value], default=ProblemType.CLASSIFICATION.value)
+    parser.add_argument("--models", nargs="*", default=None, help="Names of the estimators to benchmark, all of the problem type by default.")
+    parser.add_argument("--repeats", type=int, default=3, help="Number of timed runs of each benchmark.")
+    parser.add_argument("--no-memory", action="store_true", help="Skip the extra traced run that measures the peak memory of each benchmark.")
+    parser.add_argument("--output", type=Path, default=None, help="Path of the results JSON file.")
+    parser.add_argument("--baseline", type=Path, default=None, help="Results JSON file of a previous run to compare with.")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Relative throughput loss or memory growth over the baseline that is flagged as a regression.")
+    parser.add_argument("--keep-artifacts", action="store_true", help="Keep the synthetic sample dataset and the working directories of the benchmark.")
+    arguments = parser.parse_args()
+
+    preprocessing_cache.enabled = False
+    model_cache.enabled = False
+    profiler.enabled = True
+    profiler.trace_memory = False
+    profiler.drain()
+    problem_type = ProblemType(arguments.problem_type)
+    parameters = {"rows": arguments.rows, "continuous_columns": arguments.continuous_columns, "categorical_columns": arguments.categorical_columns,
+                  "cardinality": arguments.cardinality, "missing_rate": arguments.missing_rate, "problem_type": problem_type.value,
+                  "snapshot_format": os.environ.get("SNAPSHOT_FORMAT")}
+    dataset, config_json = generate_dataset(arguments.rows, arguments.continuous_columns, arguments.categorical_columns, arguments.cardinality,
+                                            arguments.missing_rate, problem_type, dataset_name=BENCHMARK_DATASET_NAME)
+    write_sample_dataset(SAMPLE_DATASETS_PATH / BENCHMARK_DATASET_NAME, dataset, config_json)
+
+    working_directory_paths = set()
+    try:
+        benchmarks = dict()
+        benchmarks.update(__benchmark_read_dataset(arguments.rows, arguments.repeats, not arguments.no_memory, working_directory_paths))
+        dataset, config = read_dataset(BENCHMARK_DATASET_NAME)
+        working_directory_paths.add(config.working_directory_path)
+        benchmarks_results, dataset_splits = __benchmark_preprocessing(dataset, config, arguments.repeats, not arguments.no_memory)
+        benchmarks.update(benchmarks_results)
+        benchmarks.update(__benchmark_estimators(dataset_splits, config, arguments.models, arguments.repeats, not arguments.no_memory))
+    finally:
+        artifact_writer.flush()
+        if not arguments.keep_artifacts:
+            shutil.rmtree(SAMPLE_DATASETS_PATH / BENCHMARK_DATASET_NAME, ignore_errors=True)
+            for working_directory_path in working_directory_paths:
+                shutil.rmtree(working_directory_path, ignore_errors=True)
+
+    results = {"created_at": datetime.now().isoformat(timespec="seconds"), "parameters": parameters, "environment": __get_environment(), "benchmarks": benchmarks}
+    output_path = arguments.output or TEMP_FOLDER_PATH / "benchmarks" / f"pipeline_benchmark_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    os.makedirs(output_path.parent, exist_ok=True)
+    write_json(output_path, results)
+    logger.info(f"Benchmark results saved at '{output_path}'")
+
+    if arguments.baseline is not None:
+        regressions = __compare_with_baseline(results, read_json(arguments.baseline), arguments.tolerance)
+        if regressions:
+            logger.warning(f"{len(regressions)} regressions over baseline '{arguments.baseline}' (tolerance {arguments.tolerance:.0%}):")
+            for regression in regressions:
+                logger.warning(f"\t{regression}")
+            sys.exit(1)
+        logger.info(f"No regressions over baseline '{arguments.baseline}' (tolerance {arguments.tolerance:.0%})")
+
+
+def __benchmark_read_dataset(rows: int, repeats: int, measure_memory: bool, working_directory_paths: set) -> Dict[str, Dict]:
+    def run() -> None:
+        _, config = read_dataset(BENCHMARK_DATASET_NAME)
+        working_directory_paths.add(config.working_directory_path)
+
+    return {"read_dataset": __run_benchmark("read_dataset", rows, lambda: tuple(), run, repeats, measure_memory)}
+
+
+def __benchmark_preprocessing(dataset: pd.DataFrame, config: DatasetConfig, repeats: int, measure_memory: bool) -> Tuple[Dict[str, Dict], DatasetSplits]:
+    rows = len(dataset)
+    benchmarks = dict()
+    benchmarks["handle_missing_values"] = __run_benchmark("handle_missing_values", rows, lambda: (dataset.copy(), config),
+                                                          handle_missing_values, repeats, measure_memory)
+    imputed_dataset = dataset.copy()
+    handle_missing_values(imputed_dataset, config)
+    benchmarks["encode_categorical_features"] = __run_benchmark("encode_categorical_features", rows, lambda: (imputed_dataset.copy(), config),
+                                                                encode_categorical_features, repeats, measure_memory)
+    encoded_dataset = imputed_dataset.copy()
+    encodings_config = encode_categorical_features(encoded_dataset, config)
+    benchmarks["split_dataset"] = __run_benchmark("split_dataset", rows, lambda: (encoded_dataset, config),
+                                                  split_training_testing_validation_datasets, repeats, measure_memory)
+    dataset_splits = split_training_testing_validation_datasets(encoded_dataset, config)
+    benchmarks["scale_continuous_features"] = __run_benchmark("scale_continuous_features", rows, lambda: (__copy_dataset_splits(dataset_splits), config),
+                                                              scale_continuous_features, repeats, measure_memory)
+    scale_continuous_features(dataset_splits, config)
+    benchmarks["compact_dtypes"] = __run_benchmark("compact_dtypes", rows, lambda: (__copy_dataset_splits(dataset_splits), config, encodings_config),
+                                                   compact_dataset_splits, repeats, measure_memory)
+    for preprocessing_mode in PreprocessingMode:
+        benchmark_name = f"preprocess_dataset:{preprocessing_mode.value}"
+        benchmarks[benchmark_name] = __run_benchmark(benchmark_name, rows, lambda: (dataset.copy(), config.model_copy(deep=True), preprocessing_mode),
+                                                     preprocess_dataset, repeats, measure_memory)
+    artifact_writer.flush()
+    return benchmarks, dataset_splits
+
+
+def __benchmark_estimators(dataset_splits: DatasetSplits, config: DatasetConfig, model_names: Optional[List[str]], repeats: int, measure_memory: bool) -> Dict[str, Dict]:
+    target_names = [column.name for column in config.columns if column.target]
+    training_x = dataset_splits.training_dataset.drop(columns=target_names).to_numpy(dtype=np.float64)
+    training_y = dataset_splits.training_dataset[target_names[0]].to_numpy()
+    testing_x = dataset_splits.testing_dataset.drop(columns=target_names).to_numpy(dtype=np.float64)
+    if config.problem_type == ProblemType.CLASSIFICATION:
+        models, get_model = list(ClassificationModels), get_classification_model
+    else:
+        models, get_model = list(RegressionModels), get_regression_model
+    if model_names:
+        unknown_model_names = set(model_names) - {model_name.value for model_name in models}
+        if unknown_model_names:
+            raise Exception(f"Unknown models for problem type '{config.problem_type.value}': {sorted(unknown_model_names)}")
+        models = [model_name for model_name in models if model_name.value in model_names]
+
+    benchmarks = dict()
+    for model_name in models:
+        fitted_models = list()
+
+        def fit(model: Any) -> None:
+            model.fit(to_model_input(model, training_x), training_y)
+            fitted_models.append(model)
+
+        benchmarks[f"fit:{model_name.value}"] = __run_benchmark(f"fit:{model_name.value}", len(training_x), lambda: (get_model(model_name),),
+                                                                fit, repeats, measure_memory)
+        benchmarks[f"predict:{model_name.value}"] = __run_benchmark(f"predict:{model_name.value}", len(testing_x), lambda: (fitted_models[-1],),
+                                                                    lambda model: model.predict(to_model_input(model, testing_x)), repeats, measure_memory)
+    return benchmarks
+
+
+def __run_benchmark(benchmark_name: str, rows: int, setup: Callable[[], tuple], run: Callable, repeats: int, measure_memory: bool) -> Dict:
+    logger.info(f"Benchmark '{benchmark_name}'")
+    wall_seconds, cpu_seconds = list(), list()
+    for _ in range(repeats):
+        run_arguments = setup()
+        start_time, start_cpu_time = time.perf_counter(), time.process_time()
+        run(*run_arguments)
+        artifact_writer.flush()
+        wall_seconds.append(time.perf_counter() - start_time)
+        cpu_seconds.append(time.process_time() - start_cpu_time)
+    result = {"rows": rows, "repeats": repeats, "wall_seconds": wall_seconds, "best_seconds": min(wall_seconds), "mean_seconds": float(np.mean(wall_seconds)),
+              "best_cpu_seconds": min(cpu_seconds), "rows_per_second": rows / max(min(wall_seconds), 1e-9)}
+    if measure_memory:
+        run_arguments = setup()
+        profiler.trace_memory = True
+        try:
+            with profiler.profile(f"benchmark:{benchmark_name}", rows):
+                run(*run_arguments)
+                artifact_writer.flush()
+        finally:
+            profiler.trace_memory = False
+            tracemalloc.stop()
+        record = [record for record in profiler.drain() if record["stage"] == f"benchmark:{benchmark_name}"][0]
+        result.update(tracemalloc_peak_mb=record["tracemalloc_peak_delta_mb"], peak_rss_mb=record["peak_rss_mb"])
+    profiler.drain()
+    logger.info(f"\tBest {result['best_seconds']:.4f}s, mean {result['mean_seconds']:.4f}s over {repeats} runs, {result['rows_per_second']:,.0f} rows/s"
+                + (f", peak traced memory {result['tracemalloc_peak_mb']:.1f} MB" if measure_memory else ""))
+    return result
+
+
+def __copy_dataset_splits(dataset_splits: DatasetSplits) -> DatasetSplits:
+    return DatasetSplits(dataset_splits.dataset.copy(), dataset_splits.training_indices, dataset_splits.testing_indices, dataset_splits.validation_indices,
+                         dataset_splits.sparse_columns)
+
+
+def __compare_with_baseline(results: Dict, baseline: Dict, tolerance: float) -> List[str]:
+    if results["parameters"] != baseline.get("parameters"):
+        logger.warning(f"Benchmark parameters differ from the baseline parameters {baseline.get('parameters')}, comparison may not be meaningful")
+    regressions = list()
+    for benchmark_name, result in results["benchmarks"].items():
+        baseline_result = baseline.get("benchmarks", dict()).get(benchmark_name)
+        if baseline_result is None:
+            logger.info(f"\tBenchmark '{benchmark_name}' has no baseline")
+            continue
+        throughput_change = result["rows_per_second"] / baseline_result["rows_per_second"] - 1
+        if throughput_change < -tolerance:
+            regressions.append(f"{benchmark_name}: throughput {result['rows_per_second']:,.0f} rows/s against {baseline_result['rows_per_second']:,.0f} rows/s ({throughput_change:+.1%})")
+        if result.get("tracemalloc_peak_mb") is not None and baseline_result.get("tracemalloc_peak_mb") is not None:
+            memory_growth = result["tracemalloc_peak_mb"] - baseline_result["tracemalloc_peak_mb"]
+            if memory_growth > MINIMUM_MEMORY_REGRESSION_MB and memory_growth > tolerance * baseline_result["tracemalloc_peak_mb"]:
+                regressions.append(f"{benchmark_name}: peak traced memory {result['tracemalloc_peak_mb']:.1f} MB against {baseline_result['tracemalloc_peak_mb']:.1f} MB")
+    return regressions
+
+
+def __get_environment() -> Dict:
+    return {"python": platform.python_version(), "platform": platform.platform(), "cpu_count": os.cpu_count(),
+            "numpy": np.__version__, "pandas": pd.__version__, "scikit-learn": sklearn.__version__}
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+import argparse
+import time
+from typing import Tuple
+
+import numpy as np
+import pandas as pd
+
+from helpers.artifact_cache import preprocessing_cache
+from helpers.artifact_writer import artifact_writer
+from helpers.logger import logger
+from models.enums import PreprocessingMode
+from models.models import DatasetConfig
+from services.dataset_preprocessing_service import preprocess_dataset
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare staged and fused preprocessing on a synthetic wide dataset. Run with SNAPSHOT_FORMAT=none to leave snapshot writes out of the timings.")
+    parser.add_argument("--rows", type=int, default=50_000, help="Number of rows of the synthetic dataset.")
+    parser.add_argument("--continuous-columns", type=int, default=300, help="Number of continuous columns.")
+    parser.add_argument("--categorical-columns", type=int, default=30, help="Number of categorical columns.")
+    parser.add_argument("--categories", type=int, default=12, help="Number of categories of each multi onehot encoded column.")
+    parser.add_argument("--repeats", type=int, default=3, help="Number of timed runs of each preprocessing mode.")
+    arguments = parser.parse_args()
+
+    preprocessing_cache.enabled = False
+    dataset, config_json = __generate_dataset(arguments.rows, arguments.continuous_columns, arguments.categorical_columns, arguments.categories)
+    logger.info(f"Synthetic dataset: {dataset.shape[0]} rows, {dataset.shape[1]} columns, {dataset.memory_usage(deep=True).sum() / 1024 ** 2:.1f} MB")
+
+    timings, training_datasets = dict(), dict()
+    for preprocessing_mode in PreprocessingMode:
+        timings[preprocessing_mode] = list()
+        for _ in range(arguments.repeats):
+            config = DatasetConfig(**config_json)
+            dataset_copy = dataset.copy()
+            start_time = time.perf_counter()
+            dataset_splits = preprocess_dataset(dataset_copy, config, preprocessing_mode)
+            timings[preprocessing_mode].append(time.perf_counter() - start_time)
+            artifact_writer.flush()
+        training_datasets[preprocessing_mode] = dataset_splits.training_dataset
+
+    staged_training_dataset = training_datasets[PreprocessingMode.STAGED]
+    fused_training_dataset = training_datasets[PreprocessingMode.FUSED][staged_training_dataset.columns]
+    maximum_difference = np.nanmax(np.abs(staged_training_dataset.to_numpy(dtype=np.float64) - fused_training_dataset.to_numpy(dtype=np.float64)))
+    logger.info("Preprocessing benchmark results:")
+    for preprocessing_mode, mode_timings in timings.items():
+        logger.info(f"\t{preprocessing_mode.value}: best {min(mode_timings):.3f}s, mean {np.mean(mode_timings):.3f}s over {len(mode_timings)} runs")
+    logger.info(f"\tSpeedup of fused over staged: {min(timings[PreprocessingMode.STAGED]) / min(timings[PreprocessingMode.FUSED]):.2f}x")
+    logger.info(f"\tMaximum absolute difference between training datasets: {maximum_difference}")
+
+
+def __generate_dataset(rows: int, continuous_columns: int, categorical_columns: int, categories: int) -> Tuple[pd.DataFrame, dict]:
+    random_generator = np.random.default_rng(0)
+    columns, config_columns = dict(), list()
+    for column_index in range(continuous_columns):
+        column_name = f"continuous_{column_index}"
+        values = random_generator.normal(column_index, 1 + column_index % 5, rows)
+        values[random_generator.random(rows) < 0.05] = np.nan
+        columns[column_name] = values
+        config_columns.append({"name": column_name, "type": "continuous", "drop": False, "missing": "mean",
+                               "scale": ["standard", "minmax", None][column_index % 3]})
+    for column_index in range(categorical_columns):
+        column_name = f"categorical_{column_index}"
+        encoding = ["multi_onehot", "binary_onehot", "ordinal"][column_index % 3]
+        column_categories = [f"level_{level}" for level in range(2 if encoding == "binary_onehot" else categories)]
+        values = pd.Series(random_generator.choice(column_categories, rows), dtype="category")
+        values[random_generator.random(rows) < 0.05] = np.nan
+        columns[column_name] = values
+        config_columns.append({"name": column_name, "type": "categorical", "drop": False, "missing": "mode", "encode": encoding,
+                               "encoding_values": {category: level for level, category in enumerate(column_categories)} if encoding == "ordinal" else None})
+    columns["target"] = random_generator.integers(0, 2, rows)
+    config_columns.append({"name": "target", "type": "categorical", "drop": False, "target": True})
+    config_json = {
+        "dataset_name": "preprocessing_plan_benchmark",
+        "problem_type": "classification",
+        "columns": config_columns,
+        "dataset_split_config": {"training": 0.6, "testing": 0.2, "validation": 0.2, "random_seed": 0}
+    }
+    return pd.DataFrame(columns), config_json
+
+
+if __name__ == "__main__":
+    main()
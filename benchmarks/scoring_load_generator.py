@@ -0,0 +1,53 @@
+import argparse
+import json
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict
+
+import numpy as np
+import pandas as pd
+
+from helpers.logger import logger
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Send concurrent single-row requests to a local scoring server and report latency and throughput.")
+    parser.add_argument("--url", default="http://127.0.0.1:8080", help="Base URL of the scoring server.")
+    parser.add_argument("--input", required=True, type=Path, help="CSV file whose rows are sent as requests.")
+    parser.add_argument("--requests", type=int, default=2_000, help="Total number of requests to send.")
+    parser.add_argument("--concurrency", type=int, default=32, help="Number of concurrent clients.")
+    arguments = parser.parse_args()
+
+    rows = json.loads(pd.read_csv(arguments.input).to_json(orient="records"))
+    request_rows = [rows[i % len(rows)] for i in range(arguments.requests)]
+
+    start_time = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=arguments.concurrency) as executor:
+        results = list(executor.map(lambda row: __send_request(f"{arguments.url}/predict", row), request_rows))
+    elapsed_time = time.perf_counter() - start_time
+
+    latencies = np.array([latency for latency, succeeded in results]) * 1000
+    failures = sum(1 for _, succeeded in results if not succeeded)
+    logger.info(f"Sent {arguments.requests} requests with concurrency {arguments.concurrency} in {elapsed_time:.2f}s")
+    logger.info(f"\tClient QPS: {arguments.requests / elapsed_time:.1f}")
+    logger.info(f"\tClient latency p50: {np.percentile(latencies, 50):.2f} ms, p99: {np.percentile(latencies, 99):.2f} ms")
+    logger.info(f"\tFailed requests: {failures}")
+    with urllib.request.urlopen(f"{arguments.url}/metrics") as response:
+        logger.info(f"\tServer metrics: {json.loads(response.read())}")
+
+
+def __send_request(url: str, row: Dict) -> tuple:
+    request = urllib.request.Request(url, data=json.dumps(row).encode(), headers={"Content-Type": "application/json"})
+    start_time = time.perf_counter()
+    try:
+        with urllib.request.urlopen(request) as response:
+            response.read()
+        return time.perf_counter() - start_time, True
+    except Exception:
+        return time.perf_counter() - start_time, False
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+import argparse
+import json
+import os
+from pathlib import Path
+from typing import Tuple
+
+import numpy as np
+import pandas as pd
+
+from configurations.constants import SAMPLE_DATASETS_PATH, SAMPLE_DATASET_FILE_NAME, SAMPLE_CONFIG_FILE_NAME
+from helpers.logger import logger
+from models.enums import ProblemType
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic sample dataset and its config, ready to be picked by the pipeline.")
+    parser.add_argument("--name", default="synthetic", help="Name of the sample dataset folder.")
+    parser.add_argument("--output", type=Path, default=SAMPLE_DATASETS_PATH, help="Folder in which the sample dataset folder is created.")
+    parser.add_argument("--rows", type=int, default=100_000, help="Number of rows.")
+    parser.add_argument("--continuous-columns", type=int, default=20, help="Number of continuous columns.")
+    parser.add_argument("--categorical-columns", type=int, default=10, help="Number of categorical columns.")
+    parser.add_argument("--cardinality", type=int, default=10, help="Number of categories of each multi onehot and ordinal encoded column.")
+    parser.add_argument("--missing-rate", type=float, default=0.05, help="Fraction of missing values in each feature column.")
+    parser.add_argument("--problem-type", choices=[problem_type.value for problem_type in ProblemType], default=ProblemType.CLASSIFICATION.value)
+    parser.add_argument("--seed", type=int, default=0, help="Random seed of the generator.")
+    arguments = parser.parse_args()
+
+    dataset, config_json = generate_dataset(arguments.rows, arguments.continuous_columns, arguments.categorical_columns, arguments.cardinality,
+                                            arguments.missing_rate, ProblemType(arguments.problem_type), arguments.seed, arguments.name)
+    write_sample_dataset(arguments.output / arguments.name, dataset, config_json)
+
+
+def generate_dataset(rows: int, continuous_columns: int, categorical_columns: int, cardinality: int, missing_rate: float,
+                     problem_type: ProblemType, seed: int = 0, dataset_name: str = "synthetic") -> Tuple[pd.DataFrame, dict]:
+    random_generator = np.random.default_rng(seed)
+    columns, config_columns = dict(), list()
+    signal = np.zeros(rows)
+    for column_index in range(continuous_columns):
+        column_name = f"continuous_{column_index}"
+        values = random_generator.normal(column_index, 1 + column_index % 5, rows)
+        signal += random_generator.normal() * (values - column_index) / (1 + column_index % 5)
+        values[random_generator.random(rows) < missing_rate] = np.nan
+        columns[column_name] = values
+        config_columns.append({"name": column_name, "type": "continuous", "drop": False, "missing": ["mean", "median"][column_index % 2],
+                               "scale": ["standard", "minmax", None][column_index % 3]})
+    for column_index in range(categorical_columns):
+        column_name = f"categorical_{column_index}"
+        encoding = ["multi_onehot", "binary_onehot", "ordinal"][column_index % 3]
+        categories_count = 2 if encoding == "binary_onehot" else max(2, cardinality)
+        column_categories = [f"level_{level}" for level in range(categories_count)]
+        category_weights = 1 / np.arange(1, categories_count + 1)
+        codes = random_generator.choice(categories_count, rows, p=category_weights / category_weights.sum())
+        signal += random_generator.normal(0, 1, categories_count)[codes]
+        values = pd.Series(pd.Categorical.from_codes(codes, column_categories))
+        values[random_generator.random(rows) < missing_rate] = np.nan
+        columns[column_name] = values
+        config_columns.append({"name": column_name, "type": "categorical", "drop": False, "missing": "mode", "encode": encoding,
+                               "encoding_values": {category: level for level, category in enumerate(column_categories)} if encoding == "ordinal" else None})
+    signal += random_generator.normal(0, max(1.0, signal.std()), rows) * 0.5
+    if problem_type == ProblemType.CLASSIFICATION:
+        columns["target"] = (signal > np.median(signal)).astype(np.int64)
+        config_columns.append({"name": "target", "type": "categorical", "drop": False, "target": True})
+    else:
+        columns["target"] = signal
+        config_columns.append({"name": "target", "type": "continuous", "drop": False, "target": True})
+    config_json = {
+        "dataset_name": dataset_name,
+        "problem_type": problem_type.value,
+        "columns": config_columns,
+        "dataset_split_config": {"training": 0.6, "testing": 0.2, "validation": 0.2, "random_seed": seed}
+    }
+    return pd.DataFrame(columns), config_json
+
+
+def write_sample_dataset(sample_dataset_path: Path, dataset: pd.DataFrame, config_json: dict) -> None:
+    os.makedirs(sample_dataset_path, exist_ok=True)
+    dataset.to_csv(sample_dataset_path / SAMPLE_DATASET_FILE_NAME, index=False)
+    with open(sample_dataset_path / SAMPLE_CONFIG_FILE_NAME, "w") as f:
+        json.dump(config_json, f, indent=4)
+    logger.info(f"Synthetic dataset written at '{sample_dataset_path}' ({dataset.shape[0]} rows, {dataset.shape[1]} columns)")
+
+
+if __name__ == "__main__":
+    main()
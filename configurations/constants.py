@@ -2,17 +2,48 @@ from pathlib import Path
 
 SAMPLE_DATASETS_PATH = Path("samples/datasets")
 TEMP_FOLDER_PATH = Path("temp")
+CACHE_FOLDER_PATH = TEMP_FOLDER_PATH / "cache"
+BATCH_SUMMARIES_FOLDER_PATH = TEMP_FOLDER_PATH / "batch_summaries"
+PREPROCESSING_CACHE_FOLDER = "preprocessing"
+MODELS_CACHE_FOLDER = "models"
+PREPROCESSING_CACHE_VERSION = 1
+MODELS_CACHE_VERSION = 1
 
 INTERMEDIARY_DATASETS_FOLDER = "intermediary_datasets"
+DATASET_SPLITS_FOLDER = "dataset_splits"
 SCALERS_FOLDER = "scalers"
 MODELS_FOLDER = "models"
-SUB_FOLDERS = [INTERMEDIARY_DATASETS_FOLDER, SCALERS_FOLDER, MODELS_FOLDER]
+FEATURE_MATRICES_FOLDER = "feature_matrices"
+CROSS_VALIDATION_FOLDER = "cross_validation"
+PROFILES_FOLDER = "profiles"
+SUB_FOLDERS = [INTERMEDIARY_DATASETS_FOLDER, SCALERS_FOLDER, MODELS_FOLDER, FEATURE_MATRICES_FOLDER]
 
+DATASET_CONFIG_FILE = "dataset_config.json"
+IMPUTATION_STATISTICS_FILE = "imputation_statistics.json"
+COLUMN_STATISTICS_FILE = "column_statistics.json"
 ENCODINGS_CONFIG_FILE = "encodings_config.json"
 SCALERS_CONFIG_FILE = "scalers_config.json"
 MODELS_PERFORMANCE_FILE = "models_performance.json"
+MODEL_RACE_FILE = "model_race.json"
+HYPERPARAMETER_SEARCH_FILE = "hyperparameter_search.json"
+CROSS_VALIDATION_FILE = "cross_validation.json"
+PROFILE_FILE = "profile.json"
+FEATURES_CONFIG_FILE = "features_config.json"
+PREDICTIONS_FILE = "predictions.csv"
 
 SAMPLE_DATASET_FILE_NAME = "dataset.csv"
 SAMPLE_CONFIG_FILE_NAME = "config.json"
 
+DEFAULT_HASH_BUCKETS = 1024
+QUANTILE_SKETCH_SIZE = 10_000
+TOP_VALUES_COUNT = 10
+SEARCH_HOLDOUT_FRACTION = 0.2
+EARLY_STOPPING_ITERATIONS = 10
+WARM_START_STEPS = 10
+WARM_START_PATIENCE = 2
+BUDGET_MEMORY_POLL_SECONDS = 0.1
+BUDGET_ESTIMATION_ROWS = 1_000
+BUDGET_SAFETY_FRACTION = 0.8
+THREAD_LIMIT_VARIABLES = ["OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS"]
+
 LINE_BREAK = "*" * 50
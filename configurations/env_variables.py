@@ -4,4 +4,23 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
-LOG_LEVEL = int(os.getenv("LOG_LEVEL", 10))
\ No newline at end of file
+LOG_LEVEL = int(os.getenv("LOG_LEVEL", 10))
+TRAINING_WORKERS = int(os.getenv("TRAINING_WORKERS", 1))
+SNAPSHOT_FORMAT = os.getenv("SNAPSHOT_FORMAT", "csv")
+SNAPSHOT_COMPRESSION = os.getenv("SNAPSHOT_COMPRESSION")
+ASYNC_ARTIFACT_WRITES = os.getenv("ASYNC_ARTIFACT_WRITES", "true").lower() == "true"
+ARTIFACT_WRITER_QUEUE_SIZE = int(os.getenv("ARTIFACT_WRITER_QUEUE_SIZE", 2))
+CSV_ENGINE = os.getenv("CSV_ENGINE", "c")
+CONTINUOUS_FEATURES_AS_FLOAT32 = os.getenv("CONTINUOUS_FEATURES_AS_FLOAT32", "false").lower() == "true"
+PREPROCESSING_MODE = os.getenv("PREPROCESSING_MODE", "staged")
+DTYPE_COMPACTION_ENABLED = os.getenv("DTYPE_COMPACTION_ENABLED", "true").lower() == "true"
+SCALED_FEATURES_AS_FLOAT32 = os.getenv("SCALED_FEATURES_AS_FLOAT32", "false").lower() == "true"
+OUT_OF_CORE_CHUNK_SIZE = int(os.getenv("OUT_OF_CORE_CHUNK_SIZE", 0))
+ARTIFACT_CACHE_ENABLED = os.getenv("ARTIFACT_CACHE_ENABLED", "true").lower() == "true"
+ARTIFACT_CACHE_MAX_SIZE_MB = int(os.getenv("ARTIFACT_CACHE_MAX_SIZE_MB", 1024))
+ARTIFACT_CACHE_MAX_AGE_DAYS = int(os.getenv("ARTIFACT_CACHE_MAX_AGE_DAYS", 30))
+WORKING_DIRECTORIES_MAX_AGE_DAYS = int(os.getenv("WORKING_DIRECTORIES_MAX_AGE_DAYS", 0))
+PROFILING_ENABLED = os.getenv("PROFILING_ENABLED", "true").lower() == "true"
+PROFILING_TRACE_MEMORY = os.getenv("PROFILING_TRACE_MEMORY", "false").lower() == "true"
+PROFILING_HOOK = os.getenv("PROFILING_HOOK", "none")
+PROFILING_HOOK_STAGES = os.getenv("PROFILING_HOOK_STAGES", "")
\ No newline at end of file
@@ -0,0 +1,134 @@
+import hashlib
+import json
+import os
+import shutil
+import time
+from pathlib import Path
+from typing import Any, Optional
+
+import joblib
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from configurations.constants import CACHE_FOLDER_PATH, PREPROCESSING_CACHE_FOLDER, MODELS_CACHE_FOLDER, TEMP_FOLDER_PATH, BATCH_SUMMARIES_FOLDER_PATH
+from configurations.env_variables import ARTIFACT_CACHE_ENABLED, ARTIFACT_CACHE_MAX_SIZE_MB, ARTIFACT_CACHE_MAX_AGE_DAYS
+from helpers.logger import logger
+
+SECONDS_IN_DAY = 24 * 60 * 60
+
+
+class ArtifactCache:
+    def __init__(self, cache_path: Path, enabled: bool, max_size_mb: int, max_age_days: int):
+        self.cache_path = cache_path
+        self.enabled = enabled
+        self.max_size_bytes = max_size_mb * 1024 ** 2
+        self.max_age_seconds = max_age_days * SECONDS_IN_DAY
+
+    def get(self, key: str) -> Optional[Any]:
+        if not self.enabled:
+            return None
+        entry_path = self.__get_entry_path(key)
+        if not os.path.exists(entry_path):
+            logger.info(f"\tCache miss for '{self.cache_path.name}' entry '{key[:12]}'")
+            return None
+        try:
+            value = joblib.load(entry_path)
+            os.utime(entry_path)
+            logger.info(f"\tCache hit for '{self.cache_path.name}' entry '{key[:12]}'")
+            return value
+        except Exception as exception:
+            logger.warning(f"\tIgnoring unreadable cache entry '{entry_path}'. Exception: {str(exception)}")
+            return None
+
+    def put(self, key: str, value: Any) -> None:
+        if not self.enabled:
+            return
+        os.makedirs(self.cache_path, exist_ok=True)
+        entry_path = self.__get_entry_path(key)
+        temporary_entry_path = entry_path.with_suffix(f".{os.getpid()}.tmp")
+        joblib.dump(value, temporary_entry_path)
+        os.replace(temporary_entry_path, entry_path)
+        logger.info(f"\tCached '{self.cache_path.name}' entry '{key[:12]}'")
+        self.evict()
+
+    def invalidate(self) -> int:
+        if not os.path.exists(self.cache_path):
+            return 0
+        entries_count = len([entry for entry in os.scandir(self.cache_path) if entry.is_file()])
+        shutil.rmtree(self.cache_path)
+        logger.info(f"Cache '{self.cache_path}' invalidated ({entries_count} entries removed)")
+        return entries_count
+
+    def evict(self) -> None:
+        if not os.path.exists(self.cache_path):
+            return
+        now = time.time()
+        entries = list()
+        for entry in os.scandir(self.cache_path):
+            try:
+                if entry.is_file():
+                    entries.append((entry.path, entry.stat()))
+            except FileNotFoundError:
+                continue
+        entries.sort(key=lambda entry: entry[1].st_mtime)
+        total_size = sum(entry_stat.st_size for _, entry_stat in entries)
+        for entry_path, entry_stat in entries:
+            is_expired = self.max_age_seconds and now - entry_stat.st_mtime > self.max_age_seconds
+            is_over_size = total_size > self.max_size_bytes
+            if not is_expired and not is_over_size:
+                continue
+            total_size -= entry_stat.st_size
+            try:
+                os.remove(entry_path)
+            except FileNotFoundError:
+                continue
+            logger.info(f"\tEvicted cache entry '{entry_path}' ({'expired' if is_expired else 'cache size limit reached'})")
+
+    def __get_entry_path(self, key: str) -> Path:
+        return self.cache_path / f"{key}.pkl"
+
+
+def fingerprint(*parts: Any) -> str:
+    serialized_parts = json.dumps(parts, sort_keys=True, default=str)
+    return hashlib.sha256(serialized_parts.encode()).hexdigest()
+
+
+def fingerprint_dataset(dataset: pd.DataFrame) -> str:
+    dataset_hash = hashlib.sha256()
+    dataset_hash.update(json.dumps([[str(column), str(dtype)] for column, dtype in dataset.dtypes.items()]).encode())
+    dataset_hash.update(pd.util.hash_pandas_object(dataset, index=True).values.tobytes())
+    return dataset_hash.hexdigest()
+
+
+def fingerprint_arrays(*arrays: np.ndarray) -> str:
+    arrays_hash = hashlib.sha256()
+    for array in arrays:
+        if array is None:
+            arrays_hash.update(b"none")
+            continue
+        arrays_hash.update(f"{array.dtype}{array.shape}".encode())
+        if sparse.issparse(array):
+            arrays_hash.update(fingerprint_arrays(array.data, array.indices, array.indptr).encode())
+        elif array.dtype.kind == "O":
+            arrays_hash.update(pd.util.hash_array(array.ravel()).tobytes())
+        else:
+            arrays_hash.update(np.ascontiguousarray(array).data)
+    return arrays_hash.hexdigest()
+
+
+def evict_working_directories(current_working_directory_path: Path, max_age_days: int) -> None:
+    if not max_age_days or not os.path.exists(TEMP_FOLDER_PATH):
+        return
+    now = time.time()
+    for entry in os.scandir(TEMP_FOLDER_PATH):
+        entry_path = Path(entry.path)
+        if not entry.is_dir() or entry_path in [current_working_directory_path, CACHE_FOLDER_PATH, BATCH_SUMMARIES_FOLDER_PATH]:
+            continue
+        if now - entry.stat().st_mtime > max_age_days * SECONDS_IN_DAY:
+            shutil.rmtree(entry_path, ignore_errors=True)
+            logger.info(f"Evicted working directory '{entry_path}' (older than {max_age_days} days)")
+
+
+preprocessing_cache = ArtifactCache(CACHE_FOLDER_PATH / PREPROCESSING_CACHE_FOLDER, ARTIFACT_CACHE_ENABLED, ARTIFACT_CACHE_MAX_SIZE_MB, ARTIFACT_CACHE_MAX_AGE_DAYS)
+model_cache = ArtifactCache(CACHE_FOLDER_PATH / MODELS_CACHE_FOLDER, ARTIFACT_CACHE_ENABLED, ARTIFACT_CACHE_MAX_SIZE_MB, ARTIFACT_CACHE_MAX_AGE_DAYS)
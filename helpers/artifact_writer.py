@@ -0,0 +1,67 @@
+import atexit
+import multiprocessing
+import os
+import queue
+import threading
+from pathlib import Path
+from typing import Callable, List
+
+from configurations.env_variables import ASYNC_ARTIFACT_WRITES, ARTIFACT_WRITER_QUEUE_SIZE
+from helpers.logger import logger
+
+
+class ArtifactWriter:
+    def __init__(self, enabled: bool, max_pending_writes: int):
+        self.enabled = enabled
+        self.max_pending_writes = max(1, max_pending_writes)
+        self.__queue = None
+        self.__thread = None
+        self.__lock = threading.Lock()
+        self.__failures: List[str] = list()
+
+    def is_asynchronous(self) -> bool:
+        return self.enabled and multiprocessing.parent_process() is None
+
+    def submit(self, artifact_path: Path, write_function: Callable[[Path], None]) -> None:
+        if not self.is_asynchronous():
+            write_function(artifact_path)
+            return
+        self.__start()
+        self.__queue.put((artifact_path, write_function))
+
+    def flush(self) -> None:
+        if self.__queue is not None:
+            self.__queue.join()
+        with self.__lock:
+            failures, self.__failures = self.__failures, list()
+        if failures:
+            raise Exception(f"{len(failures)} artifact write(s) failed: {failures}")
+
+    def __start(self) -> None:
+        with self.__lock:
+            if self.__thread is not None:
+                return
+            self.__queue = queue.Queue(maxsize=self.max_pending_writes)
+            self.__thread = threading.Thread(target=self.__write_pending_artifacts, name="artifact_writer", daemon=True)
+            self.__thread.start()
+            atexit.register(self.__drain)
+
+    def __write_pending_artifacts(self) -> None:
+        while True:
+            artifact_path, write_function = self.__queue.get()
+            try:
+                write_function(artifact_path)
+                with open(artifact_path, "rb") as f:
+                    os.fsync(f.fileno())
+            except Exception as exception:
+                logger.error(f"Error while writing artifact '{artifact_path}'. Exception: {str(exception)}")
+                with self.__lock:
+                    self.__failures.append(f"{artifact_path}: {str(exception)}")
+            finally:
+                self.__queue.task_done()
+
+    def __drain(self) -> None:
+        self.__queue.join()
+
+
+artifact_writer = ArtifactWriter(ASYNC_ARTIFACT_WRITES, ARTIFACT_WRITER_QUEUE_SIZE)
@@ -1,38 +1,134 @@
+import json
 import os
 from pathlib import Path
-from typing import Literal
+from typing import Literal, Union, Any
 
-from configurations.constants import INTERMEDIARY_DATASETS_FOLDER
+from configurations.constants import INTERMEDIARY_DATASETS_FOLDER, DATASET_SPLITS_FOLDER, PREPROCESSING_CACHE_VERSION
+from configurations.env_variables import SNAPSHOT_FORMAT, SNAPSHOT_COMPRESSION
+from helpers.artifact_cache import fingerprint
+from helpers.artifact_writer import artifact_writer
 from helpers.logger import logger
+from helpers.profiler import profiler
 
+import numpy as np
 import pandas as pd
+import sklearn
+from scipy import sparse
 
-from models.enums import MissingValueImputationMethod
-from models.models import DatasetSplits
+from models.enums import SnapshotFormat
+from models.models import DatasetSplits, DatasetConfig
 
+PreprocessingStage = Literal["missing_values", "categorical_encoding", "dataset_splitting", "feature_scaling"]
+PREPROCESSING_STAGES = ["missing_values", "categorical_encoding", "dataset_splitting", "feature_scaling"]
+DatasetType = Literal["dropped_unused_columns", "missing_values_handled", "categorical_features_encoded", "continuous_features_scaled"]
 
-def calculate_statistic(data: pd.Series, statistic: MissingValueImputationMethod) -> float:
-    if statistic == MissingValueImputationMethod.MEAN:
-        return data.mean()
-    if statistic == MissingValueImputationMethod.MEDIAN:
-        return data.median()
-    if statistic == MissingValueImputationMethod.MODE:
-        return data.mode().iloc[0]
 
+def get_preprocessing_cache_key(config: DatasetConfig, stage: PreprocessingStage) -> str:
+    config_slices = {
+        "missing_values": [[column.name, column.type.value, column.missing] for column in config.columns],
+        "categorical_encoding": [[column.name, column.type.value, column.encode, column.encoding_values, column.sparse, column.hash_buckets] for column in config.columns],
+        "dataset_splitting": [config.dataset_split_config.model_dump(mode="json"), [column.name for column in config.columns if column.target]],
+        "feature_scaling": [[column.name, column.type.value, column.scale] for column in config.columns],
+    }
+    stages = PREPROCESSING_STAGES[:PREPROCESSING_STAGES.index(stage) + 1]
+    return fingerprint(stage, PREPROCESSING_CACHE_VERSION, sklearn.__version__, config.dataset_fingerprint, [config_slices[stage] for stage in stages])
 
-def save_intermediary_dataset(dataset: pd.DataFrame, working_directory_path: Path, dataset_type: Literal["dropped_unused_columns", "missing_values_handled", "categorical_features_encoded", "continuous_features_scaled", "training", "testing", "validation"], sub_directory: str = None) -> None:
-    dataset_name = f"dataset_{dataset_type}.csv"
-    dataset_path = working_directory_path / INTERMEDIARY_DATASETS_FOLDER
-    if sub_directory:
-        dataset_path = dataset_path / sub_directory
+
+def to_model_input(model: Any, predictors: Union[np.ndarray, sparse.spmatrix]) -> Union[np.ndarray, sparse.spmatrix]:
+    if not sparse.issparse(predictors):
+        return predictors
+    from sklearn.utils import get_tags
+    if not get_tags(model).input_tags.sparse:
+        logger.debug(f"\t\tConverting sparse predictors to dense for model '{model.__class__.__name__}'")
+        return predictors.toarray()
+    return predictors
+
+
+def write_json(file_path: Path, content: Union[list, dict]) -> None:
+    with open(file_path, 'w') as f:
+        json.dump(content, f, indent=4, default=__to_json_value)
+
+
+def read_json(file_path: Path) -> Union[list, dict]:
+    with open(file_path, 'r') as f:
+        return json.load(f)
+
+
+def save_intermediary_dataset(dataset: pd.DataFrame, working_directory_path: Path, dataset_type: DatasetType, sub_directory: str = None) -> None:
+    snapshot_format = SnapshotFormat(SNAPSHOT_FORMAT)
+    if snapshot_format == SnapshotFormat.NONE:
+        logger.debug(f"Dataset snapshot '{dataset_type}' skipped.")
+        return
+    dataset_path = __get_intermediary_datasets_path(working_directory_path, sub_directory)
     os.makedirs(dataset_path, exist_ok=True)
-    dataset_path = dataset_path / dataset_name
-    dataset.to_csv(dataset_path, index=False)
+    dataset_path = dataset_path / f"dataset_{dataset_type}.{snapshot_format.value}"
+    snapshot = dataset.copy() if artifact_writer.is_asynchronous() else dataset
+    artifact_writer.submit(dataset_path, lambda path: __write_profiled_snapshot(snapshot, path, snapshot_format))
     logger.info(f"Dataset snapshot '{dataset_path}' saved.")
 
 
-def save_dataset_splits(dataset_split: DatasetSplits, working_directory_path: Path, sub_directory: Literal["dataset_splits", "continuous_features_scaled"]) -> None:
-    save_intermediary_dataset(dataset_split.training_dataset, working_directory_path, "training", sub_directory)
-    save_intermediary_dataset(dataset_split.testing_dataset, working_directory_path, "testing", sub_directory)
-    if dataset_split.validation_dataset is not None:
-        save_intermediary_dataset(dataset_split.validation_dataset, working_directory_path, "validation", sub_directory)
+def load_intermediary_dataset(working_directory_path: Path, dataset_type: DatasetType, sub_directory: str = None) -> pd.DataFrame:
+    datasets_path = __get_intermediary_datasets_path(working_directory_path, sub_directory)
+    for snapshot_format in [SnapshotFormat.PARQUET, SnapshotFormat.FEATHER, SnapshotFormat.CSV]:
+        dataset_path = datasets_path / f"dataset_{dataset_type}.{snapshot_format.value}"
+        if os.path.exists(dataset_path):
+            dataset = __read_snapshot(dataset_path, snapshot_format)
+            logger.info(f"Dataset snapshot '{dataset_path}' loaded.")
+            return dataset
+    raise Exception(f"Dataset snapshot '{dataset_type}' not found in '{datasets_path}'")
+
+
+def save_dataset_splits(dataset_splits: DatasetSplits, working_directory_path: Path) -> None:
+    split_indices_path = __get_intermediary_datasets_path(working_directory_path, DATASET_SPLITS_FOLDER)
+    os.makedirs(split_indices_path, exist_ok=True)
+    indices_dtype = np.min_scalar_type(len(dataset_splits.dataset))
+    for split_name in DatasetSplits.SPLIT_NAMES:
+        split_indices = dataset_splits.get_indices(split_name)
+        if split_indices is not None:
+            compact_split_indices = split_indices.astype(indices_dtype)
+            artifact_writer.submit(split_indices_path / f"{split_name}_indices.npy", lambda path, indices=compact_split_indices: np.save(path, indices))
+    logger.info(f"Dataset split indices saved in '{split_indices_path}'")
+
+
+def load_dataset_splits(working_directory_path: Path, dataset_type: DatasetType = "continuous_features_scaled") -> DatasetSplits:
+    dataset = load_intermediary_dataset(working_directory_path, dataset_type)
+    split_indices_path = __get_intermediary_datasets_path(working_directory_path, DATASET_SPLITS_FOLDER)
+    split_indices = {split_name: np.load(split_indices_path / f"{split_name}_indices.npy") if (split_indices_path / f"{split_name}_indices.npy").exists() else None
+                     for split_name in DatasetSplits.SPLIT_NAMES}
+    return DatasetSplits(dataset, split_indices["training"], split_indices["testing"], split_indices["validation"])
+
+
+def __to_json_value(value: Any) -> Any:
+    if hasattr(value, "item"):
+        return value.item()
+    return str(value)
+
+
+def __get_intermediary_datasets_path(working_directory_path: Path, sub_directory: str = None) -> Path:
+    datasets_path = working_directory_path / INTERMEDIARY_DATASETS_FOLDER
+    if sub_directory:
+        datasets_path = datasets_path / sub_directory
+    return datasets_path
+
+
+def __write_profiled_snapshot(dataset: pd.DataFrame, dataset_path: Path, snapshot_format: SnapshotFormat) -> None:
+    with profiler.profile(f"write_snapshot:{dataset_path.parent.name}/{dataset_path.name}", *dataset.shape):
+        __write_snapshot(dataset, dataset_path, snapshot_format)
+
+
+def __write_snapshot(dataset: pd.DataFrame, dataset_path: Path, snapshot_format: SnapshotFormat) -> None:
+    if snapshot_format == SnapshotFormat.CSV:
+        dataset.to_csv(dataset_path, index=False)
+    elif snapshot_format == SnapshotFormat.PARQUET:
+        compression = SNAPSHOT_COMPRESSION or "snappy"
+        dataset.to_parquet(dataset_path, index=False, compression=None if compression == "uncompressed" else compression)
+    elif snapshot_format == SnapshotFormat.FEATHER:
+        dataset.reset_index(drop=True).to_feather(dataset_path, compression=SNAPSHOT_COMPRESSION or "lz4")
+
+
+def __read_snapshot(dataset_path: Path, snapshot_format: SnapshotFormat) -> pd.DataFrame:
+    if snapshot_format == SnapshotFormat.PARQUET:
+        return pd.read_parquet(dataset_path)
+    if snapshot_format == SnapshotFormat.FEATHER:
+        return pd.read_feather(dataset_path)
+    return pd.read_csv(dataset_path)
@@ -0,0 +1,156 @@
+import cProfile
+import json
+import os
+import re
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+from configurations.constants import PROFILE_FILE, PROFILES_FOLDER
+from configurations.env_variables import PROFILING_ENABLED, PROFILING_TRACE_MEMORY, PROFILING_HOOK, PROFILING_HOOK_STAGES
+from helpers.logger import logger
+from models.enums import ProfilingHook
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+BYTES_IN_MB = 1024 ** 2
+
+
+class Profiler:
+    def __init__(self, enabled: bool, trace_memory: bool, hook: ProfilingHook, hook_stages: List[str]):
+        self.enabled = enabled
+        self.trace_memory = trace_memory
+        self.hook = hook
+        self.hook_stages = set(hook_stages)
+        self.records: List[Dict] = list()
+        self.__started_at = time.perf_counter()
+        self.__hooks: Dict[str, Any] = dict()
+        self.__hook_active = False
+        self.__lock = threading.Lock()
+        self.__local = threading.local()
+
+    @contextmanager
+    def profile(self, stage: str, rows: Optional[int] = None, columns: Optional[int] = None) -> Iterator[Dict]:
+        if not self.enabled:
+            yield dict()
+            return
+        stack = self.__get_stack()
+        record = {"stage": stage, "parent": stack[-1]["stage"] if stack else None, "process": os.getpid(), "rows": rows, "columns": columns}
+        is_main_thread = threading.current_thread() is threading.main_thread()
+        frame = {"stage": stage, "traced_memory": None, "traced_peak": None}
+        if self.trace_memory and is_main_thread:
+            self.__start_memory_tracing(frame, stack)
+        hook = self.__start_hook(stage) if is_main_thread else None
+        start_time, start_cpu_time, start_peak_rss = time.perf_counter(), time.process_time(), self.__get_peak_rss()
+        stack.append(frame)
+        try:
+            yield record
+        finally:
+            stack.pop()
+            peak_rss = self.__get_peak_rss()
+            record.update(start_seconds=start_time - self.__started_at,
+                          wall_seconds=time.perf_counter() - start_time,
+                          cpu_seconds=time.process_time() - start_cpu_time,
+                          peak_rss_mb=peak_rss,
+                          peak_rss_delta_mb=None if peak_rss is None else peak_rss - start_peak_rss)
+            if frame["traced_memory"] is not None:
+                record.update(self.__stop_memory_tracing(frame, stack))
+            if hook is not None:
+                record["hook_output"] = self.__stop_hook(stage, hook)
+            with self.__lock:
+                self.records.append(record)
+
+    def drain(self) -> List[Dict]:
+        with self.__lock:
+            records, self.records = self.records, list()
+        return records
+
+    def extend(self, records: List[Dict]) -> None:
+        with self.__lock:
+            self.records.extend(records)
+
+    def save(self, working_directory_path: Path) -> None:
+        if not self.enabled:
+            return
+        for file_name, hook in self.__hooks.items():
+            os.makedirs(working_directory_path / PROFILES_FOLDER, exist_ok=True)
+            if self.hook == ProfilingHook.CPROFILE:
+                hook.dump_stats(working_directory_path / PROFILES_FOLDER / file_name)
+            else:
+                with open(working_directory_path / PROFILES_FOLDER / file_name, "w") as f:
+                    f.write(hook.output_html())
+        records = sorted(self.drain(), key=lambda record: record["start_seconds"])
+        profile_path = working_directory_path / PROFILE_FILE
+        with open(profile_path, "w") as f:
+            json.dump({"total_wall_seconds": time.perf_counter() - self.__started_at, "peak_rss_mb": self.__get_peak_rss(), "stages": records}, f, indent=4)
+        logger.info(f"Profile saved at '{profile_path}'")
+        for record in sorted([record for record in records if record["parent"] is None], key=lambda record: record["wall_seconds"], reverse=True)[:5]:
+            logger.info(f"\t{record['stage']}: {record['wall_seconds']:.3f}s wall, {record['cpu_seconds']:.3f}s CPU")
+
+    def __get_stack(self) -> List[Dict]:
+        if not hasattr(self.__local, "stack"):
+            self.__local.stack = list()
+        return self.__local.stack
+
+    def __start_hook(self, stage: str) -> Any:
+        if self.hook == ProfilingHook.NONE or self.__hook_active or (self.hook_stages and stage not in self.hook_stages):
+            return None
+        if self.hook == ProfilingHook.CPROFILE:
+            hook = cProfile.Profile()
+            hook.enable()
+        else:
+            try:
+                from pyinstrument import Profiler as PyinstrumentProfiler
+            except ImportError:
+                logger.warning(f"\tProfiling hook '{self.hook.value}' is not installed, stage '{stage}' is not hooked")
+                return None
+            hook = PyinstrumentProfiler()
+            hook.start()
+        self.__hook_active = True
+        return hook
+
+    def __stop_hook(self, stage: str, hook: Any) -> str:
+        if self.hook == ProfilingHook.CPROFILE:
+            hook.disable()
+        else:
+            hook.stop()
+        self.__hook_active = False
+        stage_file_name = re.sub(r"[^\w.-]+", "_", stage)
+        file_name = f"{len(self.__hooks) + 1}_{stage_file_name}.{'prof' if self.hook == ProfilingHook.CPROFILE else 'html'}"
+        self.__hooks[file_name] = hook
+        return str(Path(PROFILES_FOLDER) / file_name)
+
+    @staticmethod
+    def __start_memory_tracing(frame: Dict, stack: List[Dict]) -> None:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+        traced_memory, traced_peak = tracemalloc.get_traced_memory()
+        if stack and stack[-1]["traced_peak"] is not None:
+            stack[-1]["traced_peak"] = max(stack[-1]["traced_peak"], traced_peak)
+        tracemalloc.reset_peak()
+        frame["traced_memory"], frame["traced_peak"] = traced_memory, traced_memory
+
+    @staticmethod
+    def __stop_memory_tracing(frame: Dict, stack: List[Dict]) -> Dict:
+        traced_memory, traced_peak = tracemalloc.get_traced_memory()
+        traced_peak = max(frame["traced_peak"], traced_peak)
+        if stack and stack[-1]["traced_peak"] is not None:
+            stack[-1]["traced_peak"] = max(stack[-1]["traced_peak"], traced_peak)
+        tracemalloc.reset_peak()
+        return {"tracemalloc_delta_mb": (traced_memory - frame["traced_memory"]) / BYTES_IN_MB,
+                "tracemalloc_peak_delta_mb": (traced_peak - frame["traced_memory"]) / BYTES_IN_MB}
+
+    @staticmethod
+    def __get_peak_rss() -> Optional[float]:
+        if resource is None:
+            return None
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+profiler = Profiler(PROFILING_ENABLED, PROFILING_TRACE_MEMORY, ProfilingHook(PROFILING_HOOK), [stage for stage in PROFILING_HOOK_STAGES.split(",") if stage])
@@ -0,0 +1,21 @@
+import argparse
+
+from helpers.logger import logger
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Invalidate cached preprocessing artifacts and model fits.")
+    parser.add_argument("--preprocessing", action="store_true", help="Invalidate cached preprocessing artifacts only.")
+    parser.add_argument("--models", action="store_true", help="Invalidate cached model fits only.")
+    arguments = parser.parse_args()
+    from helpers.artifact_cache import preprocessing_cache, model_cache
+    invalidate_all = not arguments.preprocessing and not arguments.models
+    if arguments.preprocessing or invalidate_all:
+        preprocessing_cache.invalidate()
+    if arguments.models or invalidate_all:
+        model_cache.invalidate()
+    logger.info("Cache invalidation finished.")
+
+
+if __name__ == "__main__":
+    main()
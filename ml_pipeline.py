@@ -1,5 +1,5 @@
 from configurations.constants import LINE_BREAK
-from services import read_dataset_service as read_dataset_service, dataset_preprocessing_service, model_training_service
+from services import read_dataset_service as read_dataset_service
 from helpers.logger import logger
 
 
@@ -8,9 +8,8 @@ def main():
         logger.info(LINE_BREAK)
         logger.info("*MACHINE LEARNING WORKSPACE*")
         dataset_name = read_dataset_service.pick_sample_dataset()
-        dataset, config = read_dataset_service.read_dataset(dataset_name)
-        dataset_splits = dataset_preprocessing_service.preprocess_dataset(dataset, config)
-        model_training_service.train_models(dataset_splits, config)
+        from services import pipeline_service
+        pipeline_service.run_pipeline(dataset_name)
     except Exception as exception:
         logger.error(f"\tError in workflow. Exception: {str(exception)}")
 
@@ -17,6 +17,7 @@ class CategoricalEncodingType(Enum):
     BINARY_ONEHOT = "binary_onehot"
     MULTI_ONEHOT = "multi_onehot"
     ORDINAL = "ordinal"
+    HASHING = "hashing"
 
 
 class ContinuousFeatureScalingType(Enum):
@@ -38,7 +39,67 @@ class ClassificationModels(Enum):
     SUPPORT_VECTOR_MACHINE = "Support Vector Machine"
     KNN = "K-Nearest Neighbors"
     NAIVE_BAYES = "Naive Bayes"
+    HIST_GRADIENT_BOOSTING = "Hist Gradient Boosting"
+    LINEAR_SUPPORT_VECTOR_MACHINE = "Linear Support Vector Machine"
 
 
 class RegressionModels(Enum):
     LINEAR_REGRESSION = "Linear Regression"
+    RIDGE_REGRESSION = "Ridge Regression"
+    LASSO_REGRESSION = "Lasso Regression"
+    RANDOM_FOREST = "Random Forest"
+    HIST_GRADIENT_BOOSTING = "Hist Gradient Boosting"
+
+
+class IncrementalClassificationModels(Enum):
+    SGD_CLASSIFIER = "SGD Classifier"
+    PERCEPTRON = "Perceptron"
+    NAIVE_BAYES = "Naive Bayes"
+
+
+class IncrementalRegressionModels(Enum):
+    SGD_REGRESSOR = "SGD Regressor"
+
+
+class CrossValidationType(Enum):
+    KFOLD = "kfold"
+    STRATIFIED_KFOLD = "stratified_kfold"
+
+
+class ProfilingHook(Enum):
+    NONE = "none"
+    CPROFILE = "cprofile"
+    PYINSTRUMENT = "pyinstrument"
+
+
+class ModelSelectionMode(Enum):
+    ALL = "all"
+    SUCCESSIVE_HALVING = "successive_halving"
+
+
+class SnapshotFormat(Enum):
+    NONE = "none"
+    CSV = "csv"
+    PARQUET = "parquet"
+    FEATHER = "feather"
+
+
+class PreprocessingMode(Enum):
+    STAGED = "staged"
+    FUSED = "fused"
+
+
+class ModelTrainingStatus(Enum):
+    COMPLETED = "completed"
+    SUBSAMPLED = "subsampled"
+    FAILED = "failed"
+    TIMED_OUT = "timed_out"
+    MEMORY_EXCEEDED = "memory_exceeded"
+    SKIPPED = "skipped"
+
+
+class BatchJobStatus(Enum):
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+    TIMED_OUT = "timed_out"
+    KILLED = "killed"
@@ -1,14 +1,17 @@
 from abc import ABC
 from datetime import datetime
 from pathlib import Path
-from typing import Optional, List
+from typing import Optional, List, Union, Any, Dict, Tuple
 
+import numpy as np
 import pandas as pd
 from pydantic import BaseModel
+from scipy import sparse
 import os
 
 from models.enums import FeatureType, CategoricalEncodingType, MissingValueImputationMethod, \
-    ContinuousFeatureScalingType, ProblemType, ClassificationModels
+    ContinuousFeatureScalingType, ProblemType, ClassificationModels, RegressionModels, IncrementalClassificationModels, IncrementalRegressionModels, \
+    ModelSelectionMode, CrossValidationType, BatchJobStatus, ModelTrainingStatus
 from configurations.constants import TEMP_FOLDER_PATH, SUB_FOLDERS
 from helpers.logger import logger
 
@@ -17,13 +20,22 @@ class ColumnConfig(BaseModel):
     name: str
     type: FeatureType
     drop: bool
-    missing: MissingValueImputationMethod = None
-    scale: ContinuousFeatureScalingType = None
-    encode: CategoricalEncodingType = None
-    encoding_values: dict = None
+    missing: Optional[MissingValueImputationMethod] = None
+    scale: Optional[ContinuousFeatureScalingType] = None
+    encode: Optional[CategoricalEncodingType] = None
+    encoding_values: Optional[dict] = None
+    sparse: Optional[bool] = False
+    hash_buckets: Optional[int] = None
     target: Optional[bool] = False
 
 
+class ModelSpecification(BaseModel):
+    module: str
+    class_name: str
+    parameters: Dict[str, Any] = dict()
+    scalable_parameters: Dict[str, Any] = dict()
+
+
 class DatasetSplitConfig(BaseModel):
     training: float
     testing: float
@@ -31,18 +43,56 @@ class DatasetSplitConfig(BaseModel):
     random_seed: Optional[int] = None
 
 
+class HyperparameterSearchConfig(BaseModel):
+    search_spaces: Dict[str, Dict[str, List[Any]]]
+    max_trials: Optional[int] = 20
+
+
+class CrossValidationConfig(BaseModel):
+    type: Optional[CrossValidationType] = CrossValidationType.KFOLD
+    folds: Optional[int] = 5
+
+
+class TrainingBudgetConfig(BaseModel):
+    model_time_budget_seconds: Optional[float] = None
+    model_memory_budget_mb: Optional[int] = None
+    run_time_budget_seconds: Optional[float] = None
+    subsample_over_budget: Optional[bool] = False
+
+
+class TrainingConfig(BaseModel):
+    model_selection: Optional[ModelSelectionMode] = ModelSelectionMode.ALL
+    halving_factor: Optional[int] = 3
+    min_training_samples: Optional[int] = 100
+    hyperparameter_search: Optional[HyperparameterSearchConfig] = None
+    cross_validation: Optional[CrossValidationConfig] = None
+    scalable_models_rows_threshold: Optional[int] = 50_000
+    scalable_models_features_threshold: Optional[int] = 1_000
+    budget: Optional[TrainingBudgetConfig] = None
+
+
 class DatasetConfig(BaseModel):
     dataset_name: str
     problem_type: ProblemType
     columns: List[ColumnConfig]
     working_directory_path: Path = None
     dataset_split_config: DatasetSplitConfig
+    training_config: Optional[TrainingConfig] = TrainingConfig()
+    dataset_fingerprint: Optional[str] = None
 
     def model_post_init(self, __context) -> None:
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         working_directory_name = f"{self.dataset_name}_{timestamp}"
         self.working_directory_path = TEMP_FOLDER_PATH / working_directory_name
-        os.makedirs(self.working_directory_path, exist_ok=True)
+        os.makedirs(TEMP_FOLDER_PATH, exist_ok=True)
+        attempt = 1
+        while True:
+            try:
+                os.makedirs(self.working_directory_path, exist_ok=False)
+                break
+            except FileExistsError:
+                attempt += 1
+                self.working_directory_path = TEMP_FOLDER_PATH / f"{working_directory_name}_{attempt}"
         logger.info(f"Working directory '{self.working_directory_path}' created")
         for sub_folder in SUB_FOLDERS:
             sub_folder_path = self.working_directory_path / sub_folder
@@ -63,6 +113,8 @@ class BinaryOneHotEncodingConfig(EncodingConfig):
 class MultiOneHotEncodingConfig(EncodingConfig):
     encoding_type: CategoricalEncodingType = CategoricalEncodingType.MULTI_ONEHOT
     resulting_columns: list[str]
+    categories: Optional[list[str]] = None
+    sparse: Optional[bool] = False
 
 
 class OrdinalEncodingConfig(EncodingConfig):
@@ -70,33 +122,87 @@ class OrdinalEncodingConfig(EncodingConfig):
     mappings: dict
 
 
+class HashingEncodingConfig(EncodingConfig):
+    encoding_type: CategoricalEncodingType = CategoricalEncodingType.HASHING
+    hash_buckets: int
+
+
 class ScalerConfig(BaseModel):
     scaler_type: ContinuousFeatureScalingType
     feature_names: list[str]
     file_path: str
 
 
+class ColumnStatistics(BaseModel):
+    count: int
+    null_count: int
+    mean: Optional[float] = None
+    median: Optional[float] = None
+    exact_median: Optional[bool] = None
+    mode: Optional[Any] = None
+    top_values: Optional[list] = None
+
+
 class DatasetSplits:
+    SPLIT_NAMES = ["training", "testing", "validation"]
+
     def __init__(
         self,
-        training_dataset: pd.DataFrame,
-        testing_dataset: pd.DataFrame,
-        validation_dataset: Optional[pd.DataFrame] = None
+        dataset: pd.DataFrame,
+        training_indices: np.ndarray,
+        testing_indices: np.ndarray,
+        validation_indices: Optional[np.ndarray] = None,
+        sparse_columns: Optional[List[str]] = None
     ):
-        self.training_dataset = training_dataset
-        self.testing_dataset = testing_dataset
-        self.validation_dataset = validation_dataset
+        self.dataset = dataset
+        self.training_indices = training_indices
+        self.testing_indices = testing_indices
+        self.validation_indices = validation_indices
+        self.sparse_columns = sparse_columns or list()
+
+    @classmethod
+    def from_labels(cls, dataset: pd.DataFrame, split_labels: Dict[str, Optional[np.ndarray]], sparse_columns: Optional[List[str]] = None) -> "DatasetSplits":
+        split_indices = {split_name: None if split_labels.get(split_name) is None else dataset.index.get_indexer(split_labels[split_name]) for split_name in cls.SPLIT_NAMES}
+        return cls(dataset, split_indices["training"], split_indices["testing"], split_indices["validation"], sparse_columns)
+
+    @property
+    def training_dataset(self) -> pd.DataFrame:
+        return self.get_split("training")
+
+    @property
+    def testing_dataset(self) -> pd.DataFrame:
+        return self.get_split("testing")
+
+    @property
+    def validation_dataset(self) -> Optional[pd.DataFrame]:
+        return self.get_split("validation")
+
+    def get_indices(self, split_name: str) -> Optional[np.ndarray]:
+        return getattr(self, f"{split_name}_indices")
+
+    def get_split(self, split_name: str, columns: Optional[List[str]] = None) -> Optional[pd.DataFrame]:
+        split_indices = self.get_indices(split_name)
+        if split_indices is None:
+            return None
+        return (self.dataset if columns is None else self.dataset[columns]).iloc[split_indices]
+
+    def get_shape(self, split_name: str) -> Tuple[int, int]:
+        return len(self.get_indices(split_name)), self.dataset.shape[1]
 
 
 class DatasetsPredictorsAndTargets:
+    MATRIX_NAMES = ["training_x", "training_y", "testing_x", "testing_y", "validation_x", "validation_y"]
+    SPARSE_COMPONENT_NAMES = ["data", "indices", "indptr"]
+
     def __init__(
         self,
-        training_x: pd.DataFrame,
-        training_y: pd.DataFrame,
-        testing_x: pd.DataFrame,
-        testing_y: pd.DataFrame,
-        validation_x: Optional[pd.DataFrame] = None,
-        validation_y: Optional[pd.DataFrame] = None
+        training_x: Union[pd.DataFrame, np.ndarray],
+        training_y: Union[pd.DataFrame, np.ndarray],
+        testing_x: Union[pd.DataFrame, np.ndarray],
+        testing_y: Union[pd.DataFrame, np.ndarray],
+        validation_x: Optional[Union[pd.DataFrame, np.ndarray]] = None,
+        validation_y: Optional[Union[pd.DataFrame, np.ndarray]] = None,
+        feature_names: Optional[List[str]] = None
     ):
         self.training_x = training_x
         self.training_y = training_y
@@ -104,11 +210,76 @@ class DatasetsPredictorsAndTargets:
         self.testing_y = testing_y
         self.validation_x = validation_x
         self.validation_y = validation_y
+        self.feature_names = feature_names
+        self.fingerprint = None
+        self.memory_mapped_paths = dict()
+
+    def to_memory_mapped_arrays(self, arrays_directory_path: Path) -> None:
+        os.makedirs(arrays_directory_path, exist_ok=True)
+        for matrix_name in self.MATRIX_NAMES:
+            matrix = getattr(self, matrix_name)
+            if matrix is None:
+                continue
+            array = self.__to_contiguous_array(matrix, matrix_name.endswith("_y"))
+            if array.dtype.kind == "O":
+                array.flags.writeable = False
+                setattr(self, matrix_name, array)
+                continue
+            if sparse.issparse(array):
+                array_path = arrays_directory_path / matrix_name
+                for component_name in self.SPARSE_COMPONENT_NAMES:
+                    np.save(f"{array_path}.{component_name}.npy", getattr(array, component_name))
+                np.save(f"{array_path}.shape.npy", np.array(array.shape))
+            else:
+                array_path = arrays_directory_path / f"{matrix_name}.npy"
+                np.save(array_path, array)
+            self.memory_mapped_paths[matrix_name] = str(array_path)
+            setattr(self, matrix_name, self.__load_memory_mapped_array(str(array_path)))
+
+    def __getstate__(self) -> dict:
+        state = self.__dict__.copy()
+        for matrix_name in self.memory_mapped_paths:
+            state[matrix_name] = None
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        for matrix_name, array_path in self.memory_mapped_paths.items():
+            setattr(self, matrix_name, self.__load_memory_mapped_array(array_path))
+
+    @classmethod
+    def __load_memory_mapped_array(cls, array_path: str) -> Union[np.ndarray, sparse.csr_matrix]:
+        if array_path.endswith(".npy"):
+            return np.load(array_path, mmap_mode="r")
+        data, indices, indptr = [np.load(f"{array_path}.{component_name}.npy", mmap_mode="r") for component_name in cls.SPARSE_COMPONENT_NAMES]
+        return sparse.csr_matrix((data, indices, indptr), shape=tuple(np.load(f"{array_path}.shape.npy")), copy=False)
+
+    @staticmethod
+    def __to_contiguous_array(matrix: Union[pd.DataFrame, np.ndarray, sparse.spmatrix], is_target: bool) -> Union[np.ndarray, sparse.csr_matrix]:
+        if isinstance(matrix, pd.DataFrame):
+            if is_target and matrix.shape[1] == 1:
+                matrix = np.asarray(matrix.iloc[:, 0])
+            else:
+                matrix = matrix.to_numpy(dtype=np.result_type(*matrix.dtypes))
+        if sparse.issparse(matrix):
+            return sparse.csr_matrix(matrix)
+        return np.ascontiguousarray(matrix)
 
 
 class ModelPerformance(BaseModel, ABC):
-    model: ClassificationModels
+    model: Union[ClassificationModels, RegressionModels, IncrementalClassificationModels, IncrementalRegressionModels]
     model_path: str
+    fit_seconds: Optional[float] = None
+    predict_seconds: Optional[float] = None
+    training_samples: Optional[int] = None
+    training_status: Optional[ModelTrainingStatus] = ModelTrainingStatus.COMPLETED
+
+
+class UnfinishedModelTraining(BaseModel):
+    model: Union[ClassificationModels, RegressionModels]
+    training_status: ModelTrainingStatus
+    elapsed_seconds: float
+    reason: str
 
 
 class ClassificationModelPerformance(ModelPerformance):
@@ -137,3 +308,15 @@ class RegressionModelPerformance(ModelPerformance):
         logger.info(f"\t\t\tMean Squared Error: {self.mean_squared_error}")
         logger.info(f"\t\t\tRoot Mean Squared Error: {self.root_mean_squared_error}")
         logger.info(f"\t\t\tR2 Score: {self.r2_score}")
+
+
+class BatchJobResult(BaseModel):
+    dataset_name: str
+    dataset_path: str
+    status: BatchJobStatus
+    wall_seconds: float
+    working_directory_path: Optional[str] = None
+    best_model: Optional[str] = None
+    best_metric: Optional[str] = None
+    best_score: Optional[float] = None
+    error: Optional[str] = None
@@ -0,0 +1,26 @@
+import argparse
+from pathlib import Path
+
+from configurations.constants import PREDICTIONS_FILE
+from helpers.logger import logger
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Score a CSV or Parquet file with the artifacts of a finished pipeline run.")
+    parser.add_argument("--working-directory", required=True, type=Path, help="Working directory of the pipeline run, e.g. 'temp/titanic_20250101_120000'.")
+    parser.add_argument("--model", required=True, help="Name of the trained model, e.g. 'Random Forest'.")
+    parser.add_argument("--input", required=True, type=Path, help="CSV or Parquet file to score.")
+    parser.add_argument("--output", type=Path, help=f"CSV or Parquet file for the predictions. Defaults to '{PREDICTIONS_FILE}' in the working directory.")
+    parser.add_argument("--chunk-size", type=int, default=100_000, help="Number of rows scored at a time.")
+    parser.add_argument("--passthrough-columns", nargs="*", default=list(), help="Input columns copied to the output, e.g. an id column.")
+    arguments = parser.parse_args()
+    try:
+        from services import prediction_service
+        output_path = arguments.output or arguments.working_directory / PREDICTIONS_FILE
+        prediction_service.predict(arguments.working_directory, arguments.model, arguments.input, output_path, arguments.chunk_size, arguments.passthrough_columns)
+    except Exception as exception:
+        logger.error(f"\tError in prediction. Exception: {str(exception)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,24 @@
+import argparse
+from pathlib import Path
+
+from helpers.logger import logger
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve a trained model over HTTP with micro-batched scoring.")
+    parser.add_argument("--working-directory", required=True, type=Path, help="Working directory of the pipeline run, e.g. 'temp/titanic_20250101_120000'.")
+    parser.add_argument("--model", required=True, help="Name of the trained model, e.g. 'Random Forest'.")
+    parser.add_argument("--host", default="127.0.0.1", help="Host to listen on.")
+    parser.add_argument("--port", type=int, default=8080, help="Port to listen on (0 picks a free port).")
+    parser.add_argument("--max-batch-size", type=int, default=64, help="Maximum number of rows scored together.")
+    parser.add_argument("--max-wait-ms", type=float, default=5, help="Maximum time a request waits for a batch to fill up.")
+    arguments = parser.parse_args()
+    try:
+        from services import scoring_server_service
+        scoring_server_service.serve(arguments.working_directory, arguments.model, arguments.host, arguments.port, arguments.max_batch_size, arguments.max_wait_ms)
+    except Exception as exception:
+        logger.error(f"\tError in scoring server. Exception: {str(exception)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+import glob
+import multiprocessing
+import os
+import signal
+import time
+from datetime import datetime
+from multiprocessing.connection import Connection, wait
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from configurations.constants import LINE_BREAK, SAMPLE_CONFIG_FILE_NAME, MODELS_PERFORMANCE_FILE, BATCH_SUMMARIES_FOLDER_PATH, THREAD_LIMIT_VARIABLES
+from helpers.functions import write_json, read_json
+from helpers.logger import logger
+from models.enums import BatchJobStatus
+from models.models import BatchJobResult
+from services import pipeline_service
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+BYTES_IN_MB = 1024 ** 2
+
+
+def find_dataset_folders(patterns: List[str]) -> List[Path]:
+    dataset_folders = list()
+    for pattern in patterns:
+        matches = sorted(glob.glob(pattern)) or [pattern]
+        for match in map(Path, matches):
+            dataset_folder = match.parent if match.name == SAMPLE_CONFIG_FILE_NAME else match
+            if not (dataset_folder / SAMPLE_CONFIG_FILE_NAME).is_file():
+                logger.warning(f"\tSkipping '{match}': no '{SAMPLE_CONFIG_FILE_NAME}' found")
+            elif dataset_folder not in dataset_folders:
+                dataset_folders.append(dataset_folder)
+    if not dataset_folders:
+        raise Exception(f"No dataset folders found for {patterns}")
+    return dataset_folders
+
+
+def run_batch(dataset_folders: List[Path], workers: int, timeout_seconds: Optional[float] = None, memory_limit_mb: Optional[int] = None,
+              cpu_seconds: Optional[int] = None, threads: Optional[int] = None, summary_path: Optional[Path] = None) -> List[BatchJobResult]:
+    logger.info(LINE_BREAK)
+    logger.info(f"BATCH RUN OF {len(dataset_folders)} DATASETS")
+    logger.info(LINE_BREAK)
+    logger.info(f"Workers: {workers}, timeout: {timeout_seconds or 'none'}s, memory limit: {memory_limit_mb or 'none'} MB, "
+                f"CPU limit: {cpu_seconds or 'none'}s, threads per job: {threads or 'default'}")
+    if resource is None and (memory_limit_mb or cpu_seconds):
+        logger.warning("\tResource limits are not supported on this platform, jobs run without memory and CPU limits")
+    if threads:
+        for thread_limit_variable in THREAD_LIMIT_VARIABLES:
+            os.environ[thread_limit_variable] = str(threads)
+
+    context = multiprocessing.get_context("spawn")
+    pending_folders, running_jobs, results = list(dataset_folders), dict(), dict()
+    while pending_folders or running_jobs:
+        while pending_folders and len(running_jobs) < workers:
+            dataset_folder = pending_folders.pop(0)
+            receiver, sender = context.Pipe(duplex=False)
+            process = context.Process(target=__run_job, args=(dataset_folder, sender, memory_limit_mb, cpu_seconds), name=f"batch-{dataset_folder.name}")
+            process.start()
+            sender.close()
+            running_jobs[receiver] = (process, dataset_folder, time.perf_counter())
+            logger.info(f"\tStarted dataset '{dataset_folder}' (process {process.pid})")
+
+        wait_seconds = None
+        if timeout_seconds:
+            wait_seconds = max(0.0, min(start_time + timeout_seconds - time.perf_counter() for _, _, start_time in running_jobs.values()))
+        finished_receivers = wait(list(running_jobs), timeout=wait_seconds)
+        for receiver in list(running_jobs):
+            process, dataset_folder, start_time = running_jobs[receiver]
+            wall_seconds = time.perf_counter() - start_time
+            if receiver in finished_receivers:
+                results[dataset_folder] = __collect_job_result(dataset_folder, process, receiver, wall_seconds)
+                results[dataset_folder].wall_seconds = wall_seconds
+            elif timeout_seconds and wall_seconds >= timeout_seconds:
+                process.kill()
+                process.join()
+                results[dataset_folder] = BatchJobResult(dataset_name=dataset_folder.name, dataset_path=str(dataset_folder), status=BatchJobStatus.TIMED_OUT,
+                                                         wall_seconds=wall_seconds, error=f"Killed after exceeding the timeout of {timeout_seconds}s")
+            else:
+                continue
+            receiver.close()
+            del running_jobs[receiver]
+            logger.info(f"\tFinished dataset '{dataset_folder}' with status '{results[dataset_folder].status.value}' in {wall_seconds:.1f}s")
+
+    batch_results = [results[dataset_folder] for dataset_folder in dataset_folders]
+    __save_summary(batch_results, summary_path or BATCH_SUMMARIES_FOLDER_PATH / f"batch_summary_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    return batch_results
+
+
+def __run_job(dataset_folder: Path, connection: Connection, memory_limit_mb: Optional[int], cpu_seconds: Optional[int]) -> None:
+    start_time = time.perf_counter()
+    result = BatchJobResult(dataset_name=dataset_folder.name, dataset_path=str(dataset_folder), status=BatchJobStatus.SUCCEEDED, wall_seconds=0)
+    try:
+        __apply_resource_limits(memory_limit_mb, cpu_seconds)
+        config = pipeline_service.run_pipeline(dataset_folder.name, dataset_folder.parent)
+        result.working_directory_path = str(config.working_directory_path)
+        result.best_model, result.best_metric, result.best_score = __get_best_model(config.working_directory_path)
+        if result.best_model is None:
+            raise Exception(f"No model evaluation was produced in '{config.working_directory_path}'")
+    except Exception as exception:
+        logger.error(f"Error while running the pipeline on dataset '{dataset_folder}'. Exception: {str(exception)}")
+        result.status, result.error = BatchJobStatus.FAILED, f"{type(exception).__name__}: {str(exception)}"
+    result.wall_seconds = time.perf_counter() - start_time
+    connection.send(result.model_dump(mode="json"))
+    connection.close()
+
+
+def __apply_resource_limits(memory_limit_mb: Optional[int], cpu_seconds: Optional[int]) -> None:
+    if resource is None:
+        return
+    if memory_limit_mb:
+        resource.setrlimit(resource.RLIMIT_AS, (memory_limit_mb * BYTES_IN_MB, memory_limit_mb * BYTES_IN_MB))
+    if cpu_seconds:
+        resource.setrlimit(resource.RLIMIT_CPU, (cpu_seconds, resource.getrlimit(resource.RLIMIT_CPU)[1]))
+
+
+def __collect_job_result(dataset_folder: Path, process: multiprocessing.Process, receiver: Connection, wall_seconds: float) -> BatchJobResult:
+    try:
+        job_result = receiver.recv()
+    except EOFError:
+        job_result = None
+    process.join()
+    if job_result is not None:
+        return BatchJobResult(**job_result)
+    exit_code = process.exitcode
+    exit_reason = f"signal {signal.Signals(-exit_code).name}" if exit_code is not None and exit_code < 0 else f"exit code {exit_code}"
+    return BatchJobResult(dataset_name=dataset_folder.name, dataset_path=str(dataset_folder), status=BatchJobStatus.KILLED,
+                          wall_seconds=wall_seconds, error=f"Process ended by {exit_reason} without reporting a result")
+
+
+def __get_best_model(working_directory_path: Path) -> Tuple[Optional[str], Optional[str], Optional[float]]:
+    models_performance_path = working_directory_path / MODELS_PERFORMANCE_FILE
+    if not models_performance_path.is_file():
+        return None, None, None
+    models_performance = read_json(models_performance_path)
+    metric = "accuracy" if any("accuracy" in model_performance for model_performance in models_performance) else "r2_score"
+    models_performance = [model_performance for model_performance in models_performance if metric in model_performance]
+    if not models_performance:
+        return None, None, None
+    best_model_performance = max(models_performance, key=lambda model_performance: model_performance[metric])
+    return best_model_performance["model"], metric, best_model_performance[metric]
+
+
+def __save_summary(batch_results: List[BatchJobResult], summary_path: Path) -> None:
+    logger.info(LINE_BREAK)
+    logger.info("BATCH RUN SUMMARY")
+    for status in BatchJobStatus:
+        logger.info(f"\t{status.value}: {sum(1 for batch_result in batch_results if batch_result.status == status)}")
+    for batch_result in batch_results:
+        best_model = f", best model '{batch_result.best_model}' ({batch_result.best_metric} {batch_result.best_score:.4f})" if batch_result.best_model else ""
+        logger.info(f"\t[{batch_result.status.value}] {batch_result.dataset_name} in {batch_result.wall_seconds:.1f}s{best_model}")
+        if batch_result.error:
+            logger.info(f"\t\t{batch_result.error}")
+    os.makedirs(summary_path.parent, exist_ok=True)
+    write_json(summary_path, [batch_result.model_dump(mode="json") for batch_result in batch_results])
+    logger.info(f"Batch summary saved at '{summary_path}'")
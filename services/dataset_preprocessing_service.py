@@ -1,27 +1,255 @@
+import os
+import time
+from typing import List, Dict, Iterable, Iterator, Optional, Tuple, Union
+
+import numpy as np
 import pandas as pd
+from scipy import sparse
 
-from helpers.functions import save_intermediary_dataset
-from models.models import DatasetConfig, DatasetSplits
+from configurations.env_variables import PREPROCESSING_MODE, DTYPE_COMPACTION_ENABLED
+from helpers.artifact_cache import preprocessing_cache, fingerprint_dataset, fingerprint
+from helpers.artifact_writer import artifact_writer
+from helpers.functions import save_intermediary_dataset, write_json, save_dataset_splits
+from helpers.profiler import profiler
+from models.enums import FeatureType, PreprocessingMode, ProblemType
+from models.models import DatasetConfig, DatasetSplits, EncodingConfig, ColumnConfig
 from helpers.logger import logger
-from configurations.constants import LINE_BREAK
-from services.preprocessing_services.missing_values_handler import handle_missing_values
-from services.preprocessing_services.feature_encoding_service import encode_categorical_features
-from services.preprocessing_services.dataset_spliting_service import split_training_testing_validation_datasets
-from services.preprocessing_services.feature_scaling_service import scale_continuous_features
+from configurations.constants import LINE_BREAK, DATASET_CONFIG_FILE, CROSS_VALIDATION_FOLDER, SCALERS_FOLDER
+from services.preprocessing_services.missing_values_handler import handle_missing_values, fit_column_statistics, fit_imputation_statistics, \
+    apply_imputation_statistics
+from services.preprocessing_services.feature_encoding_service import encode_categorical_features, fit_encodings_config, apply_encoding_config
+from services.preprocessing_services.dataset_spliting_service import split_training_testing_validation_datasets, split_dataset_indices, \
+    split_chunk_numbers, split_dataset_folds, log_dataset_splits
+from services.preprocessing_services.feature_scaling_service import scale_continuous_features, fit_scalers, fit_scalers_incrementally
+from services.preprocessing_services.preprocessing_plan_service import compile_preprocessing_plan, get_feature_names, fill_missing_values, \
+    get_sparse_columns, PreprocessingPlan
+from services.preprocessing_services.column_statistics_service import ColumnStatisticsAccumulator, save_column_statistics
+from services.preprocessing_services.dtype_compaction_service import compact_dataset_splits
 
 
-def preprocess_dataset(dataset: pd.DataFrame, config: DatasetConfig) -> DatasetSplits:
+def preprocess_dataset(dataset: pd.DataFrame, config: DatasetConfig, preprocessing_mode: Optional[PreprocessingMode] = None) -> DatasetSplits:
+    preprocessing_mode = preprocessing_mode or PreprocessingMode(PREPROCESSING_MODE)
     logger.info(LINE_BREAK)
     logger.info("DATASET PREPROCESSING")
-    __drop_unused_columns(dataset, config)
-    handle_missing_values(dataset, config)
-    encode_categorical_features(dataset, config)
-    dataset_splits = split_training_testing_validation_datasets(dataset, config)
-    scale_continuous_features(dataset_splits, config)
+    with profiler.profile("drop_unused_columns", *dataset.shape):
+        __drop_unused_columns(dataset, config)
+    if preprocessing_cache.enabled:
+        with profiler.profile("fingerprint_dataset", *dataset.shape):
+            config.dataset_fingerprint = fingerprint_dataset(dataset)
+        logger.info(f"Dataset fingerprint: '{config.dataset_fingerprint}'")
+    if preprocessing_mode == PreprocessingMode.FUSED:
+        dataset_splits, encodings_config = __preprocess_dataset_with_plan(dataset, config)
+    else:
+        with profiler.profile("handle_missing_values", *dataset.shape):
+            handle_missing_values(dataset, config)
+        with profiler.profile("encode_categorical_features", *dataset.shape):
+            encodings_config = encode_categorical_features(dataset, config)
+        with profiler.profile("split_dataset", *dataset.shape):
+            dataset_splits = split_training_testing_validation_datasets(dataset, config)
+        with profiler.profile("scale_continuous_features", *dataset.shape):
+            scale_continuous_features(dataset_splits, config)
+    dataset_splits.sparse_columns = get_sparse_columns(encodings_config)
+    if DTYPE_COMPACTION_ENABLED:
+        with profiler.profile("compact_dtypes", *dataset.shape):
+            compact_dataset_splits(dataset_splits, config, encodings_config)
     logger.info("Dataset preprocessing finished.")
     return dataset_splits
 
 
+def __preprocess_dataset_with_plan(dataset: pd.DataFrame, config: DatasetConfig) -> Tuple[DatasetSplits, List[EncodingConfig]]:
+    try:
+        logger.info(LINE_BREAK)
+        logger.info("Fit preprocessing plan")
+        with profiler.profile("fit_preprocessing_plan", *dataset.shape):
+            split_indices = split_dataset_indices(dataset, config)
+            fitted_preprocessing = __fit_preprocessing(dataset, dataset, split_indices["training"], config)
+
+        logger.info("Apply preprocessing plan")
+        with profiler.profile("apply_preprocessing_plan", *dataset.shape):
+            transformed_dataset = __apply_preprocessing(dataset, config, *fitted_preprocessing)
+
+        dataset_splits = DatasetSplits.from_labels(transformed_dataset, split_indices)
+        logger.info("Dataset split into datasets:")
+        log_dataset_splits(dataset_splits)
+        save_dataset_splits(dataset_splits, config.working_directory_path)
+        save_intermediary_dataset(transformed_dataset, config.working_directory_path, "continuous_features_scaled")
+        return dataset_splits, fitted_preprocessing[2]
+    except Exception as exception:
+        logger.error(f"Error while preprocessing dataset with preprocessing plan. Exception: {str(exception)}")
+        raise
+
+
+def preprocess_dataset_folds(dataset: pd.DataFrame, config: DatasetConfig) -> Iterator[Tuple[DatasetSplits, float]]:
+    try:
+        logger.info(LINE_BREAK)
+        logger.info("Preprocess cross validation folds")
+        columns = [column for column in config.columns if not column.drop]
+        dataset = dataset[[column.name for column in columns]]
+        cross_validation_config = config.model_copy(update={"columns": columns})
+        if preprocessing_cache.enabled:
+            cross_validation_config.dataset_fingerprint = fingerprint_dataset(dataset)
+        fold_indices = split_dataset_folds(dataset, cross_validation_config)
+        logger.info(f"\t{config.training_config.cross_validation.type.value} with {len(fold_indices)} folds")
+
+        for fold_number, split_indices in enumerate(fold_indices, 1):
+            start_time = time.perf_counter()
+            fold_config = cross_validation_config.model_copy(update={
+                "working_directory_path": config.working_directory_path / CROSS_VALIDATION_FOLDER / f"fold_{fold_number}",
+                "dataset_fingerprint": fingerprint(cross_validation_config.dataset_fingerprint, "cross_validation_fold", config.training_config.cross_validation.model_dump(mode="json"), fold_number)
+            })
+            os.makedirs(fold_config.working_directory_path / SCALERS_FOLDER, exist_ok=True)
+            training_dataset = dataset.loc[split_indices["training"]]
+            fitted_preprocessing = __fit_preprocessing(dataset, training_dataset, split_indices["training"], fold_config)
+            transformed_dataset = __apply_preprocessing(dataset, fold_config, *fitted_preprocessing)
+            preprocessing_seconds = time.perf_counter() - start_time
+            logger.info(f"\tFold {fold_number}: training ({len(split_indices['training'])} rows), testing ({len(split_indices['testing'])} rows), preprocessed in {preprocessing_seconds:.2f}s")
+            yield DatasetSplits.from_labels(transformed_dataset, split_indices, get_sparse_columns(fitted_preprocessing[2])), preprocessing_seconds
+    except Exception as exception:
+        logger.error(f"Error while preprocessing cross validation folds. Exception: {str(exception)}")
+        raise
+
+
+def __fit_preprocessing(dataset: pd.DataFrame, statistics_dataset: pd.DataFrame, training_indices: np.ndarray, config: DatasetConfig) -> Tuple[PreprocessingPlan, Dict, List[EncodingConfig], List]:
+    column_statistics = fit_column_statistics(statistics_dataset, config)
+    missing_values = {column_name: statistics.null_count for column_name, statistics in column_statistics.items()}
+    imputation_statistics = fit_imputation_statistics(config, column_statistics)
+
+    categorical_columns = [column.name for column in config.columns if column.type == FeatureType.CATEGORICAL]
+    categorical_dataset = statistics_dataset[categorical_columns].copy()
+    apply_imputation_statistics(categorical_dataset, {column_name: imputation_statistics[column_name] for column_name in categorical_columns if column_name in imputation_statistics}, missing_values)
+    encodings_config = fit_encodings_config(categorical_dataset, config)
+
+    continuous_columns = [column.name for column in config.columns if column.type == FeatureType.CONTINUOUS]
+    training_continuous_values = dataset.loc[training_indices, continuous_columns].to_numpy(dtype=np.float64, na_value=np.nan)
+    fill_missing_values(training_continuous_values, np.array([imputation_statistics.get(column_name, np.nan) for column_name in continuous_columns], dtype=np.float64))
+    fitted_scalers = fit_scalers(pd.DataFrame(training_continuous_values, columns=continuous_columns), config)
+
+    feature_names = get_feature_names(dataset.columns, [column.name for column in config.columns if column.target], encodings_config)
+    preprocessing_plan = compile_preprocessing_plan([column for column in config.columns if not column.target],
+                                                    imputation_statistics, encodings_config, fitted_scalers, feature_names)
+    return preprocessing_plan, imputation_statistics, encodings_config, fitted_scalers
+
+
+def __apply_preprocessing(dataset: pd.DataFrame, config: DatasetConfig, preprocessing_plan: PreprocessingPlan, imputation_statistics: Dict,
+                          encodings_config: List[EncodingConfig], fitted_scalers: List) -> pd.DataFrame:
+    dense_predictors, sparse_codes = preprocessing_plan.transform_blocks(dataset)
+    if np.isnan(dense_predictors).any():
+        logger.warning("\tMissing values still exist in the dataset.")
+    transformed_datasets = [pd.DataFrame(dense_predictors, index=dataset.index, columns=preprocessing_plan.dense_feature_names)]
+    if sparse_codes:
+        transformed_datasets.append(pd.DataFrame({sparse_step.column_name: pd.Categorical.from_codes(codes, categories=sparse_step.output_names)
+                                                  for sparse_step, codes in zip(preprocessing_plan.sparse_steps, sparse_codes)}, index=dataset.index))
+    target_columns = [column for column in config.columns if column.target]
+    if target_columns:
+        transformed_datasets.append(transform_targets(dataset, target_columns, imputation_statistics, encodings_config, fitted_scalers))
+    return pd.concat(transformed_datasets, axis=1) if len(transformed_datasets) > 1 else transformed_datasets[0]
+
+
+class ChunkedDatasetPreprocessing:
+    def __init__(self, dataset_chunks: Iterable[pd.DataFrame], chunk_splits: Dict[str, Optional[np.ndarray]], preprocessing_plan: PreprocessingPlan,
+                 target_columns: List[ColumnConfig], imputation_statistics: Dict, encodings_config: List[EncodingConfig], fitted_scalers: List, target_classes: Optional[np.ndarray]):
+        self.dataset_chunks = dataset_chunks
+        self.chunk_splits = chunk_splits
+        self.preprocessing_plan = preprocessing_plan
+        self.target_columns = target_columns
+        self.imputation_statistics = imputation_statistics
+        self.encodings_config = encodings_config
+        self.fitted_scalers = fitted_scalers
+        self.target_classes = target_classes
+
+    @property
+    def feature_names(self) -> List[str]:
+        return self.preprocessing_plan.feature_names
+
+    def iterate_split(self, split_name: str) -> Iterator[Tuple[Union[np.ndarray, sparse.csr_matrix], pd.DataFrame]]:
+        split_chunk_numbers = set(self.chunk_splits[split_name].tolist()) if self.chunk_splits[split_name] is not None else set()
+        for chunk_number, dataset_chunk in enumerate(self.dataset_chunks):
+            if chunk_number in split_chunk_numbers:
+                yield self.transform(dataset_chunk)
+
+    def transform(self, dataset_chunk: pd.DataFrame) -> Tuple[Union[np.ndarray, sparse.csr_matrix], pd.DataFrame]:
+        targets = transform_targets(dataset_chunk, self.target_columns, self.imputation_statistics, self.encodings_config, self.fitted_scalers)
+        return self.preprocessing_plan.transform(dataset_chunk), targets
+
+
+def preprocess_dataset_chunks(dataset_chunks: Iterable[pd.DataFrame], config: DatasetConfig) -> ChunkedDatasetPreprocessing:
+    try:
+        logger.info(LINE_BREAK)
+        logger.info("DATASET PREPROCESSING (OUT OF CORE)")
+        config.columns = [column for column in config.columns if not column.drop]
+        __save_dataset_config(config)
+
+        logger.info("Compute column statistics chunk by chunk")
+        column_statistics_accumulator = ColumnStatisticsAccumulator(config.columns)
+        chunk_fingerprints = list()
+        for dataset_chunk in dataset_chunks:
+            column_statistics_accumulator.update(dataset_chunk)
+            if preprocessing_cache.enabled:
+                chunk_fingerprints.append(fingerprint_dataset(dataset_chunk))
+        chunks_count = column_statistics_accumulator.chunks_count
+        logger.info(f"\tRead {column_statistics_accumulator.rows_count} rows in {chunks_count} chunks")
+        if preprocessing_cache.enabled:
+            config.dataset_fingerprint = fingerprint(*chunk_fingerprints)
+            logger.info(f"Dataset fingerprint: '{config.dataset_fingerprint}'")
+        column_statistics = column_statistics_accumulator.finalize()
+        save_column_statistics(config.working_directory_path, column_statistics)
+        imputation_statistics = fit_imputation_statistics(config, column_statistics)
+
+        vocabulary_dataset = __get_vocabulary_dataset(column_statistics_accumulator.value_counts)
+        categorical_columns = [column.name for column in config.columns if column.type == FeatureType.CATEGORICAL]
+        apply_imputation_statistics(vocabulary_dataset, {column_name: imputation_statistics[column_name] for column_name in categorical_columns if column_name in imputation_statistics})
+        encodings_config = fit_encodings_config(vocabulary_dataset, config)
+
+        chunk_splits = split_chunk_numbers(chunks_count, config)
+        continuous_columns = [column.name for column in config.columns if column.type == FeatureType.CONTINUOUS]
+        continuous_imputation_statistics = {column_name: imputation_statistics[column_name] for column_name in continuous_columns if column_name in imputation_statistics}
+        training_chunk_numbers = set(chunk_splits["training"].tolist())
+        training_continuous_chunks = (__fill_continuous_values(dataset_chunk, continuous_columns, continuous_imputation_statistics)
+                                      for chunk_number, dataset_chunk in enumerate(dataset_chunks) if chunk_number in training_chunk_numbers)
+        fitted_scalers = fit_scalers_incrementally(training_continuous_chunks, config)
+
+        target_columns = [column for column in config.columns if column.target]
+        feature_names = get_feature_names([column.name for column in config.columns], [column.name for column in target_columns], encodings_config)
+        preprocessing_plan = compile_preprocessing_plan([column for column in config.columns if not column.target],
+                                                        imputation_statistics, encodings_config, fitted_scalers, feature_names)
+        target_classes = None
+        if config.problem_type == ProblemType.CLASSIFICATION and target_columns:
+            target_values = pd.DataFrame({target_columns[0].name: column_statistics_accumulator.value_counts[target_columns[0].name].index})
+            target_classes = np.unique(transform_targets(target_values, target_columns[:1], imputation_statistics, encodings_config, fitted_scalers).iloc[:, 0].dropna())
+            logger.info(f"\tTarget classes: {target_classes.tolist()}")
+        logger.info("Dataset preprocessing finished.")
+        return ChunkedDatasetPreprocessing(dataset_chunks, chunk_splits, preprocessing_plan, target_columns, imputation_statistics, encodings_config, fitted_scalers, target_classes)
+    except Exception as exception:
+        logger.error(f"Error while preprocessing dataset chunks. Exception: {str(exception)}")
+        raise
+
+
+def transform_targets(dataset: pd.DataFrame, target_columns: List[ColumnConfig], imputation_statistics: Dict, encodings_config: List[EncodingConfig], fitted_scalers: List) -> pd.DataFrame:
+    target_names = [target_column.name for target_column in target_columns]
+    targets_dataset = dataset[target_names].copy()
+    apply_imputation_statistics(targets_dataset, {target_name: imputation_statistics[target_name] for target_name in target_names if target_name in imputation_statistics})
+    for target_column in target_columns:
+        if target_column.type == FeatureType.CONTINUOUS:
+            target_plan = compile_preprocessing_plan([target_column], imputation_statistics, list(), fitted_scalers, [target_column.name])
+            targets_dataset[target_column.name] = target_plan.transform(dataset)[:, 0]
+    for encoding_config in encodings_config:
+        if encoding_config.original_feature_name in target_names:
+            apply_encoding_config(targets_dataset, encoding_config)
+    return targets_dataset
+
+
+def __get_vocabulary_dataset(value_counts: Dict[str, pd.Series]) -> pd.DataFrame:
+    vocabulary_size = max([len(column_value_counts) for column_value_counts in value_counts.values()], default=0)
+    return pd.DataFrame({column_name: pd.Categorical(list(column_value_counts.index) + [None] * (vocabulary_size - len(column_value_counts)))
+                         for column_name, column_value_counts in value_counts.items()})
+
+
+def __fill_continuous_values(dataset_chunk: pd.DataFrame, continuous_columns: List[str], imputation_statistics: Dict) -> pd.DataFrame:
+    continuous_dataset = dataset_chunk[continuous_columns].copy()
+    apply_imputation_statistics(continuous_dataset, imputation_statistics)
+    return continuous_dataset
+
+
 def __drop_unused_columns(dataset: pd.DataFrame, config: DatasetConfig) -> None:
     try:
         logger.info(LINE_BREAK)
@@ -34,7 +262,15 @@ def __drop_unused_columns(dataset: pd.DataFrame, config: DatasetConfig) -> None:
         dataset.drop(columns=columns_to_drop, inplace=True)
         config.columns = [column for column in config.columns if not column.drop]
         logger.info("Unused columns dropped successfully")
+        __save_dataset_config(config)
         save_intermediary_dataset(dataset, config.working_directory_path, "dropped_unused_columns")
     except Exception as exception:
         logger.error(f"Error while dropping unused columns. Exception: {str(exception)}")
         raise
+
+
+def __save_dataset_config(config: DatasetConfig) -> None:
+    dataset_config_file_path = config.working_directory_path / DATASET_CONFIG_FILE
+    dataset_config_json = config.model_dump(mode="json")
+    artifact_writer.submit(dataset_config_file_path, lambda path: write_json(path, dataset_config_json))
+    logger.info(f"Dataset configuration saved at '{dataset_config_file_path}'")
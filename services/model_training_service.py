@@ -1,17 +1,40 @@
 import json
+import math
+import multiprocessing
 import os
+import signal
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.connection import wait
 from pathlib import Path
-from typing import List, Tuple, Union, Any
+from typing import List, Tuple, Union, Any, Optional, Dict
 
 import joblib
+import numpy as np
 import pandas as pd
+import sklearn
+from scipy import sparse
 
-from configurations.constants import LINE_BREAK, MODELS_FOLDER, MODELS_PERFORMANCE_FILE
+from configurations.constants import LINE_BREAK, MODELS_CACHE_VERSION, MODELS_FOLDER, MODELS_PERFORMANCE_FILE, FEATURE_MATRICES_FOLDER, FEATURES_CONFIG_FILE, \
+    MODEL_RACE_FILE, CROSS_VALIDATION_FOLDER, CROSS_VALIDATION_FILE, BUDGET_MEMORY_POLL_SECONDS, BUDGET_ESTIMATION_ROWS, BUDGET_SAFETY_FRACTION
+from configurations.env_variables import TRAINING_WORKERS
+from helpers.artifact_cache import model_cache, fingerprint, fingerprint_arrays
+from helpers.artifact_writer import artifact_writer
+from helpers.functions import write_json, to_model_input
 from helpers.logger import logger
-from models.enums import ProblemType, ClassificationModels, RegressionModels
-from models.models import DatasetSplits, DatasetConfig, DatasetsPredictorsAndTargets, ModelPerformance
-from services.model_training_services.regression_models import get_regression_model, evaluate_regression_model
-from services.model_training_services.classification_models import get_classification_model, evaluate_classification_model
+from helpers.profiler import profiler
+from models.enums import ProblemType, ClassificationModels, RegressionModels, IncrementalClassificationModels, IncrementalRegressionModels, \
+    ModelSelectionMode, ModelTrainingStatus
+from models.models import DatasetSplits, DatasetConfig, DatasetsPredictorsAndTargets, ModelPerformance, UnfinishedModelTraining
+from services.dataset_preprocessing_service import ChunkedDatasetPreprocessing, preprocess_dataset_folds
+from services.model_training_services.regression_models import get_regression_model, evaluate_regression_model, get_incremental_regression_model, \
+    get_regression_metrics, REGRESSION_MODELS, SCALABLE_REGRESSION_MODELS
+from services.model_training_services.classification_models import get_classification_model, evaluate_classification_model, \
+    get_incremental_classification_model, get_classification_metrics, CLASSIFICATION_MODELS, SCALABLE_CLASSIFICATION_MODELS
+from services.model_training_services.hyperparameter_search_service import search_hyperparameters
+from services.preprocessing_services.feature_encoding_service import to_one_hot_matrix
+
+BYTES_IN_MB = 1024 ** 2
 
 
 def train_models(dataset_splits: DatasetSplits, dataset_config: DatasetConfig) -> None:
@@ -22,61 +45,537 @@ def train_models(dataset_splits: DatasetSplits, dataset_config: DatasetConfig) -
         if dataset_config.problem_type == ProblemType.UNSUPERVISED:
             raise NotImplementedError("Unsupervised training automation not implemented yet!")
 
-        dataset_predictors_and_targets = __split_datasets_into_predictors_and_targets(dataset_splits, dataset_config)
+        with profiler.profile("split_predictors_and_targets", *dataset_splits.get_shape("training")):
+            dataset_predictors_and_targets = __split_datasets_into_predictors_and_targets(dataset_splits, dataset_config)
 
-        models_to_train = __get_models_to_train(dataset_config)
+        models_to_train = __get_models_to_train(dataset_config, dataset_predictors_and_targets.training_x.shape)
+        if dataset_config.training_config.model_selection == ModelSelectionMode.SUCCESSIVE_HALVING:
+            with profiler.profile("select_models_by_successive_halving", *dataset_predictors_and_targets.training_x.shape):
+                models_to_train = __select_models_by_successive_halving(dataset_predictors_and_targets, models_to_train, dataset_config)
+        models_parameters = dict()
+        if dataset_config.training_config.hyperparameter_search is not None:
+            models = {model_name: __get_model(dataset_config.problem_type, model_name) for model_name in models_to_train}
+            with profiler.profile("search_hyperparameters", *dataset_predictors_and_targets.training_x.shape):
+                models_parameters = search_hyperparameters(dataset_predictors_and_targets, models, dataset_config)
         logger.info(f"Training models ({len(models_to_train)}): {[model.value for model in models_to_train]}")
 
+        training_workers = __get_training_workers(len(models_to_train))
+        if __uses_scalable_models(dataset_config, dataset_predictors_and_targets.training_x.shape):
+            models_parameters = __add_scalable_parameters(dataset_config.problem_type, models_to_train, models_parameters, training_workers)
+        if dataset_config.training_config.budget is not None:
+            model_evaluations = __train_models_with_budget(dataset_predictors_and_targets, models_to_train, dataset_config, training_workers, models_parameters)
+        elif training_workers > 1:
+            model_evaluations = __train_models_in_parallel(dataset_predictors_and_targets, models_to_train, dataset_config, training_workers, models_parameters)
+        else:
+            model_evaluations = __train_models_sequentially(dataset_predictors_and_targets, models_to_train, dataset_config, models_parameters)
+
+        logger.info("Model training finished")
+        __save_model_evaluations(dataset_config.working_directory_path, model_evaluations)
+    except Exception as exception:
+        logger.error(f"Error while training models. Exception: {str(exception)}")
+        raise
+
+
+def train_models_incrementally(chunked_preprocessing: ChunkedDatasetPreprocessing, dataset_config: DatasetConfig) -> None:
+    try:
+        logger.info(LINE_BREAK)
+        logger.info("INCREMENTAL MODEL TRAINING")
+        logger.info(f"\tProblem type: '{dataset_config.problem_type}'")
+        if dataset_config.problem_type == ProblemType.UNSUPERVISED:
+            raise NotImplementedError("Unsupervised training automation not implemented yet!")
+
+        targets = [feature.name for feature in dataset_config.columns if feature.target]
+        __save_features_config(dataset_config.working_directory_path, chunked_preprocessing.feature_names, targets)
+        models_to_train = __get_incremental_models_to_train(dataset_config)
+        models = {model_name: __get_incremental_model(dataset_config.problem_type, model_name) for model_name in models_to_train}
+        logger.info(f"Training models ({len(models_to_train)}) chunk by chunk: {[model.value for model in models_to_train]}")
+        partial_fit_arguments = {"classes": chunked_preprocessing.target_classes} if dataset_config.problem_type == ProblemType.CLASSIFICATION else dict()
+        fit_seconds, predict_seconds = {model_name: 0.0 for model_name in models}, {model_name: 0.0 for model_name in models}
+        for chunk_number, (training_x, training_y) in enumerate(chunked_preprocessing.iterate_split("training"), 1):
+            for model_name, model in models.items():
+                start_time = time.perf_counter()
+                with profiler.profile(f"partial_fit:{model_name.value}", *training_x.shape):
+                    model.partial_fit(to_model_input(model, training_x), training_y.iloc[:, 0], **partial_fit_arguments)
+                fit_seconds[model_name] += time.perf_counter() - start_time
+            logger.info(f"\tTraining chunk {chunk_number}: {training_x.shape[0]} rows")
+
+        testing_targets, testing_predictions = list(), {model_name: list() for model_name in models}
+        for testing_x, testing_y in chunked_preprocessing.iterate_split("testing"):
+            testing_targets.append(testing_y)
+            for model_name, model in models.items():
+                start_time = time.perf_counter()
+                with profiler.profile(f"predict:{model_name.value}", *testing_x.shape):
+                    testing_predictions[model_name].append(model.predict(to_model_input(model, testing_x)))
+                predict_seconds[model_name] += time.perf_counter() - start_time
+        testing_y = pd.concat(testing_targets)
+        logger.info(f"\tEvaluating models on {len(testing_targets)} testing chunks ({testing_y.shape[0]} rows)")
+
         model_evaluations = list()
+        for i, (model_name, model) in enumerate(models.items(), 1):
+            logger.info(f"\t[{i}/{len(models)}] Model '{model_name.value}'")
+            model_path = __save_model(model, model_name.value, dataset_config.working_directory_path, dataset_config.problem_type)
+            model_evaluation = __evaluate_model(model_name, model_path, dataset_config.problem_type, testing_y, np.concatenate(testing_predictions[model_name]))
+            model_evaluation.fit_seconds, model_evaluation.predict_seconds = fit_seconds[model_name], predict_seconds[model_name]
+            logger.info(f"\t\tFit time: {fit_seconds[model_name]:.3f}s, predict time: {predict_seconds[model_name]:.3f}s ({testing_y.shape[0]} rows)")
+            model_evaluations.append(model_evaluation)
+        logger.info("Model training finished")
+        __save_model_evaluations(dataset_config.working_directory_path, model_evaluations)
+    except Exception as exception:
+        logger.error(f"Error while training models incrementally. Exception: {str(exception)}")
+        raise
+
+
+def cross_validate_models(dataset: pd.DataFrame, dataset_config: DatasetConfig) -> None:
+    try:
+        logger.info(LINE_BREAK)
+        logger.info("CROSS VALIDATION")
+        if dataset_config.problem_type == ProblemType.UNSUPERVISED:
+            raise NotImplementedError("Unsupervised cross validation not implemented yet!")
+
+        targets = [feature.name for feature in dataset_config.columns if feature.target and not feature.drop]
+        folds = list()
+        for fold_number, (fold_splits, preprocessing_seconds) in enumerate(preprocess_dataset_folds(dataset, dataset_config), 1):
+            fold_predictors_and_targets = __to_predictors_and_targets(fold_splits, targets)
+            fold_predictors_and_targets.to_memory_mapped_arrays(dataset_config.working_directory_path / CROSS_VALIDATION_FOLDER / f"fold_{fold_number}" / FEATURE_MATRICES_FOLDER)
+            folds.append((fold_predictors_and_targets, preprocessing_seconds))
+
+        models_to_validate = __get_models_to_train(dataset_config, folds[0][0].training_x.shape)
+        fits = [(model_name, fold_number) for model_name in models_to_validate for fold_number in range(len(folds))]
+        training_workers = __get_training_workers(len(fits))
+        logger.info(f"Cross validating models ({len(models_to_validate)}) on {len(folds)} folds using {training_workers} workers")
+        if training_workers > 1:
+            with ProcessPoolExecutor(max_workers=training_workers) as executor:
+                futures = [executor.submit(__cross_validate_model, folds[fold_number][0], model_name, dataset_config.problem_type) for model_name, fold_number in fits]
+                fit_results = [future.result() for future in futures]
+        else:
+            fit_results = [__cross_validate_model(folds[fold_number][0], model_name, dataset_config.problem_type) for model_name, fold_number in fits]
 
+        fold_results = {model_name: [None] * len(folds) for model_name in models_to_validate}
+        for (model_name, fold_number), fit_result in zip(fits, fit_results):
+            fold_results[model_name][fold_number] = fit_result
+        cross_validation_results = {
+            "type": dataset_config.training_config.cross_validation.type.value,
+            "folds": [{"fold": fold_number,
+                       "training_rows": fold_predictors_and_targets.training_x.shape[0],
+                       "testing_rows": fold_predictors_and_targets.testing_x.shape[0],
+                       "preprocessing_seconds": preprocessing_seconds,
+                       "fit_seconds": sum(fold_results[model_name][fold_number - 1]["fit_seconds"] for model_name in models_to_validate),
+                       "predict_seconds": sum(fold_results[model_name][fold_number - 1]["predict_seconds"] or 0 for model_name in models_to_validate)}
+                      for fold_number, (fold_predictors_and_targets, preprocessing_seconds) in enumerate(folds, 1)],
+            "models": {model_name.value: __summarize_fold_results(model_name, fold_results[model_name]) for model_name in models_to_validate}
+        }
+        logger.info("Cross validation finished")
+        __save_cross_validation_results(dataset_config.working_directory_path, cross_validation_results)
+    except Exception as exception:
+        logger.error(f"Error while cross validating models. Exception: {str(exception)}")
+        raise
+
+
+def __cross_validate_model(fold_predictors_and_targets: DatasetsPredictorsAndTargets, model_name: Union[ClassificationModels, RegressionModels], problem_type: ProblemType) -> dict:
+    model = __get_model(problem_type, model_name)
+    fit_seconds, predict_seconds = None, None
+    start_time = time.perf_counter()
+    try:
+        model.fit(to_model_input(model, fold_predictors_and_targets.training_x), fold_predictors_and_targets.training_y.squeeze())
+        fit_seconds = time.perf_counter() - start_time
+        start_time = time.perf_counter()
+        testing_predictions = model.predict(to_model_input(model, fold_predictors_and_targets.testing_x))
+        predict_seconds = time.perf_counter() - start_time
+        metrics = __get_metrics(problem_type, fold_predictors_and_targets.testing_y, testing_predictions)
+        return {"metrics": {metric_name: float(metric_value) for metric_name, metric_value in metrics.items()}, "fit_seconds": fit_seconds, "predict_seconds": predict_seconds}
+    except Exception as exception:
+        logger.warning(f"\tModel '{model_name.value}' failed on a cross validation fold. Exception: {str(exception)}")
+        if fit_seconds is None:
+            fit_seconds = time.perf_counter() - start_time
+        return {"metrics": None, "error": str(exception), "fit_seconds": fit_seconds, "predict_seconds": predict_seconds}
+
+
+def __summarize_fold_results(model_name: Union[ClassificationModels, RegressionModels], fold_results: List[dict]) -> dict:
+    fold_metrics = [fold_result["metrics"] for fold_result in fold_results if fold_result["metrics"] is not None]
+    metric_names = list(fold_metrics[0]) if fold_metrics else list()
+    summary = {"folds_failed": len(fold_results) - len(fold_metrics),
+               "fit_seconds": [fold_result["fit_seconds"] for fold_result in fold_results],
+               "predict_seconds": [fold_result["predict_seconds"] for fold_result in fold_results]}
+    for metric_name in metric_names:
+        metric_values = np.array([metrics[metric_name] for metrics in fold_metrics])
+        summary[metric_name] = {"mean": float(metric_values.mean()), "std": float(metric_values.std()), "folds": metric_values.tolist()}
+    logger.info(f"\t{model_name.value}: " + ", ".join(f"{metric_name} {summary[metric_name]['mean']:.4f} ± {summary[metric_name]['std']:.4f}" for metric_name in metric_names)
+                + (f" ({summary['folds_failed']} folds failed)" if summary["folds_failed"] else ""))
+    return summary
+
+
+def __get_training_workers(models_count: int) -> int:
+    training_workers = TRAINING_WORKERS if TRAINING_WORKERS > 0 else os.cpu_count()
+    return max(1, min(training_workers, models_count))
+
+
+def __train_models_sequentially(dataset_predictors_and_targets: DatasetsPredictorsAndTargets, models_to_train: List[Union[ClassificationModels, RegressionModels]], dataset_config: DatasetConfig,
+                                models_parameters: Dict[Union[ClassificationModels, RegressionModels], Dict[str, Any]]) -> List[ModelPerformance]:
+    model_evaluations = list()
+    for i, model_name in enumerate(models_to_train, 1):
+        logger.info(f"\t[{i}/{len(models_to_train)}] Training Model '{model_name.value}'")
+        model_evaluation = __train_model(dataset_predictors_and_targets, model_name, dataset_config, models_parameters.get(model_name))
+        model_evaluations.append(model_evaluation)
+    return model_evaluations
+
+
+def __train_models_in_parallel(dataset_predictors_and_targets: DatasetsPredictorsAndTargets, models_to_train: List[Union[ClassificationModels, RegressionModels]], dataset_config: DatasetConfig, training_workers: int,
+                               models_parameters: Dict[Union[ClassificationModels, RegressionModels], Dict[str, Any]]) -> List[ModelPerformance]:
+    logger.info(f"\tTraining models in parallel using {training_workers} workers")
+    with ProcessPoolExecutor(max_workers=training_workers) as executor:
+        futures = list()
         for i, model_name in enumerate(models_to_train, 1):
-            logger.info(f"\t[{i}/{len(models_to_train)}] Training Model '{model_name.value}'")
-            model_evaluation = __train_model(dataset_predictors_and_targets, model_name, dataset_config)
+            logger.info(f"\t[{i}/{len(models_to_train)}] Submitting Model '{model_name.value}' for training")
+            futures.append(executor.submit(__train_model_in_worker, dataset_predictors_and_targets, model_name, dataset_config, models_parameters.get(model_name)))
+        model_evaluations = list()
+        for model_name, future in zip(models_to_train, futures):
+            model_evaluation, profile_records = future.result()
+            profiler.extend(profile_records)
+            logger.info(f"\tModel '{model_name.value}' trained")
             model_evaluations.append(model_evaluation)
+    return model_evaluations
 
-        logger.info("Model training finished")
-        __save_model_evaluations(dataset_config.working_directory_path, model_evaluations)
+
+def __train_model_in_worker(dataset_predictors_and_targets: DatasetsPredictorsAndTargets, model_name: Union[ClassificationModels, RegressionModels], dataset_config: DatasetConfig,
+                            model_parameters: Optional[Dict[str, Any]]) -> Tuple[ModelPerformance, List[Dict]]:
+    profiler.drain()
+    model_evaluation = __train_model(dataset_predictors_and_targets, model_name, dataset_config, model_parameters)
+    return model_evaluation, profiler.drain()
+
+
+def __train_models_with_budget(dataset_predictors_and_targets: DatasetsPredictorsAndTargets, models_to_train: List[Union[ClassificationModels, RegressionModels]], dataset_config: DatasetConfig, training_workers: int,
+                               models_parameters: Dict[Union[ClassificationModels, RegressionModels], Dict[str, Any]]) -> List[Union[ModelPerformance, UnfinishedModelTraining]]:
+    budget = dataset_config.training_config.budget
+    logger.info(f"\tTraining models in killable workers using {training_workers} workers (model time budget: {budget.model_time_budget_seconds or 'none'}s, "
+                f"model memory budget: {budget.model_memory_budget_mb or 'none'} MB, run time budget: {budget.run_time_budget_seconds or 'none'}s, "
+                f"subsample over budget: {budget.subsample_over_budget})")
+    memory_budget_mb = budget.model_memory_budget_mb
+    if memory_budget_mb and __get_process_memory_mb(os.getpid()) is None:
+        logger.warning("\tProcess memory can not be read on this platform, models are trained without memory budget")
+        memory_budget_mb = None
+    run_deadline = time.perf_counter() + budget.run_time_budget_seconds if budget.run_time_budget_seconds else None
+    pending_models, running_models, model_evaluations = list(models_to_train), dict(), dict()
+    while pending_models or running_models:
+        while pending_models and len(running_models) < training_workers:
+            model_name = pending_models.pop(0)
+            start_time = time.perf_counter()
+            if run_deadline is not None and start_time >= run_deadline:
+                model_evaluations[model_name] = __unfinished_model_training(model_name, ModelTrainingStatus.SKIPPED, 0.0,
+                                                                            f"Run time budget of {budget.run_time_budget_seconds}s spent before training started")
+                continue
+            deadline, deadline_reason = __get_model_deadline(start_time, run_deadline, budget.model_time_budget_seconds, budget.run_time_budget_seconds)
+            receiver, sender = multiprocessing.Pipe(duplex=False)
+            process = multiprocessing.Process(target=__train_model_in_budget_worker, name=f"train-{model_name.name.lower()}",
+                                              args=(dataset_predictors_and_targets, model_name, dataset_config, models_parameters.get(model_name),
+                                                    None if deadline is None else deadline - start_time, sender))
+            process.start()
+            sender.close()
+            running_models[receiver] = (process, model_name, start_time, deadline, deadline_reason)
+            logger.info(f"\t[{len(model_evaluations) + len(running_models)}/{len(models_to_train)}] Training Model '{model_name.value}' (process {process.pid})")
+        if not running_models:
+            continue
+
+        wait_seconds = min([deadline - time.perf_counter() for _, _, _, deadline, _ in running_models.values() if deadline is not None], default=None)
+        if memory_budget_mb:
+            wait_seconds = BUDGET_MEMORY_POLL_SECONDS if wait_seconds is None else min(wait_seconds, BUDGET_MEMORY_POLL_SECONDS)
+        finished_receivers = wait(list(running_models), timeout=None if wait_seconds is None else max(0.0, wait_seconds))
+        for receiver in list(running_models):
+            process, model_name, start_time, deadline, deadline_reason = running_models[receiver]
+            elapsed_seconds = time.perf_counter() - start_time
+            process_memory_mb = __get_process_memory_mb(process.pid) if memory_budget_mb and receiver not in finished_receivers else None
+            if receiver in finished_receivers:
+                model_evaluations[model_name] = __collect_budgeted_model_training(model_name, process, receiver, elapsed_seconds)
+            elif deadline is not None and time.perf_counter() >= deadline:
+                process.kill()
+                model_evaluations[model_name] = __unfinished_model_training(model_name, ModelTrainingStatus.TIMED_OUT, elapsed_seconds, f"Killed after exceeding the {deadline_reason}")
+            elif process_memory_mb is not None and process_memory_mb > memory_budget_mb:
+                process.kill()
+                model_evaluations[model_name] = __unfinished_model_training(model_name, ModelTrainingStatus.MEMORY_EXCEEDED, elapsed_seconds,
+                                                                            f"Killed at {process_memory_mb:.0f} MB, exceeding the model memory budget of {memory_budget_mb} MB")
+            else:
+                continue
+            process.join()
+            receiver.close()
+            del running_models[receiver]
+    return [model_evaluations[model_name] for model_name in models_to_train]
+
+
+def __get_model_deadline(start_time: float, run_deadline: Optional[float], model_time_budget_seconds: Optional[float], run_time_budget_seconds: Optional[float]) -> Tuple[Optional[float], Optional[str]]:
+    deadlines = list()
+    if model_time_budget_seconds:
+        deadlines.append((start_time + model_time_budget_seconds, f"model time budget of {model_time_budget_seconds}s"))
+    if run_deadline is not None:
+        deadlines.append((run_deadline, f"run time budget of {run_time_budget_seconds}s"))
+    return min(deadlines, default=(None, None), key=lambda deadline: deadline[0])
+
+
+def __collect_budgeted_model_training(model_name: Union[ClassificationModels, RegressionModels], process: multiprocessing.Process, receiver: Any,
+                                      elapsed_seconds: float) -> Union[ModelPerformance, UnfinishedModelTraining]:
+    try:
+        model_evaluation, profile_records = receiver.recv()
+    except EOFError:
+        process.join()
+        exit_code = process.exitcode
+        exit_reason = f"signal {signal.Signals(-exit_code).name}" if exit_code is not None and exit_code < 0 else f"exit code {exit_code}"
+        return __unfinished_model_training(model_name, ModelTrainingStatus.FAILED, elapsed_seconds, f"Process ended by {exit_reason} without reporting a result")
+    profiler.extend(profile_records)
+    if not isinstance(model_evaluation, ModelPerformance):
+        return __unfinished_model_training(model_name, ModelTrainingStatus.FAILED, elapsed_seconds, model_evaluation)
+    logger.info(f"\tModel '{model_name.value}' trained with status '{model_evaluation.training_status.value}' in {elapsed_seconds:.1f}s")
+    return model_evaluation
+
+
+def __unfinished_model_training(model_name: Union[ClassificationModels, RegressionModels], training_status: ModelTrainingStatus, elapsed_seconds: float, reason: str) -> UnfinishedModelTraining:
+    logger.warning(f"\tModel '{model_name.value}' {training_status.value} after {elapsed_seconds:.1f}s: {reason}")
+    return UnfinishedModelTraining(model=model_name, training_status=training_status, elapsed_seconds=elapsed_seconds, reason=reason)
+
+
+def __get_process_memory_mb(pid: int) -> Optional[float]:
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as f:
+            memory_kb = {line.split(":")[0]: int(line.split()[1]) for line in f if line.startswith(("Private_Clean:", "Private_Dirty:"))}
+        return (memory_kb["Private_Clean"] + memory_kb["Private_Dirty"]) * 1024 / BYTES_IN_MB
+    except (OSError, ValueError, IndexError, KeyError):
+        return None
+
+
+def __train_model_in_budget_worker(dataset_predictors_and_targets: DatasetsPredictorsAndTargets, model_name: Union[ClassificationModels, RegressionModels], dataset_config: DatasetConfig,
+                                   model_parameters: Optional[Dict[str, Any]], time_budget_seconds: Optional[float], connection: Any) -> None:
+    profiler.drain()
+    try:
+        training_rows = None
+        if dataset_config.training_config.budget.subsample_over_budget and time_budget_seconds is not None:
+            training_rows = __get_affordable_training_rows(dataset_predictors_and_targets, model_name, dataset_config, model_parameters, time_budget_seconds)
+        model_evaluation = __train_model(dataset_predictors_and_targets, model_name, dataset_config, model_parameters, training_rows)
     except Exception as exception:
-        logger.error(f"Error while training models. Exception: {str(exception)}")
+        logger.error(f"Error while training model '{model_name.value}'. Exception: {str(exception)}")
+        model_evaluation = f"{type(exception).__name__}: {str(exception)}"
+    connection.send((model_evaluation, profiler.drain()))
+    connection.close()
+
+
+def __get_affordable_training_rows(dataset_predictors_and_targets: DatasetsPredictorsAndTargets, model_name: Union[ClassificationModels, RegressionModels], dataset_config: DatasetConfig,
+                                   model_parameters: Optional[Dict[str, Any]], time_budget_seconds: float) -> Optional[np.ndarray]:
+    start_time = time.perf_counter()
+    training_samples = dataset_predictors_and_targets.training_x.shape[0]
+    if training_samples <= 2 * BUDGET_ESTIMATION_ROWS:
+        return None
+    training_rows = np.random.default_rng(dataset_config.dataset_split_config.random_seed).permutation(training_samples)
+    try:
+        with profiler.profile(f"estimate_fit_time:{model_name.value}", 3 * BUDGET_ESTIMATION_ROWS, dataset_predictors_and_targets.training_x.shape[1]):
+            fit_seconds = [__time_model_fit(dataset_predictors_and_targets, model_name, dataset_config.problem_type, model_parameters, np.sort(training_rows[:samples_count]))
+                           for samples_count in (BUDGET_ESTIMATION_ROWS, 2 * BUDGET_ESTIMATION_ROWS)]
+    except Exception as exception:
+        logger.warning(f"\t\tFit time of model '{model_name.value}' could not be estimated, training on all samples. Exception: {str(exception)}")
+        return None
+    growth_exponent = float(np.clip(np.log2(max(fit_seconds[1], 1e-6) / max(fit_seconds[0], 1e-6)), 1, 3))
+    predicted_fit_seconds = fit_seconds[1] * (training_samples / (2 * BUDGET_ESTIMATION_ROWS)) ** growth_exponent
+    affordable_fit_seconds = max(0.0, time_budget_seconds - (time.perf_counter() - start_time)) * BUDGET_SAFETY_FRACTION
+    logger.info(f"\t\tPredicted fit time on {training_samples} samples: {predicted_fit_seconds:.1f}s (affordable: {affordable_fit_seconds:.1f}s)")
+    if predicted_fit_seconds <= affordable_fit_seconds:
+        return None
+    affordable_samples = int(2 * BUDGET_ESTIMATION_ROWS * (affordable_fit_seconds / max(fit_seconds[1], 1e-6)) ** (1 / growth_exponent))
+    affordable_samples = max(2 * BUDGET_ESTIMATION_ROWS, min(affordable_samples, training_samples))
+    logger.warning(f"\t\tModel '{model_name.value}' is predicted to exceed its time budget, training on {affordable_samples} of {training_samples} samples")
+    return np.sort(training_rows[:affordable_samples])
+
+
+def __time_model_fit(dataset_predictors_and_targets: DatasetsPredictorsAndTargets, model_name: Union[ClassificationModels, RegressionModels], problem_type: ProblemType,
+                     model_parameters: Optional[Dict[str, Any]], sample_rows: np.ndarray) -> float:
+    model = __get_model(problem_type, model_name)
+    if model_parameters:
+        model.set_params(**model_parameters)
+    start_time = time.perf_counter()
+    model.fit(to_model_input(model, dataset_predictors_and_targets.training_x[sample_rows]), dataset_predictors_and_targets.training_y[sample_rows].squeeze())
+    return time.perf_counter() - start_time
+
+
+def __select_models_by_successive_halving(dataset_predictors_and_targets: DatasetsPredictorsAndTargets, models_to_train: List[Union[ClassificationModels, RegressionModels]], dataset_config: DatasetConfig) -> List[Union[ClassificationModels, RegressionModels]]:
+    if dataset_predictors_and_targets.validation_x is None:
+        logger.warning("\tSuccessive halving needs a validation dataset, training all models instead")
+        return models_to_train
+    halving_factor, min_training_samples = dataset_config.training_config.halving_factor, dataset_config.training_config.min_training_samples
+    logger.info(f"Selecting models by successive halving (halving factor: {halving_factor}, minimum training samples: {min_training_samples})")
+    training_rows = np.random.default_rng(dataset_config.dataset_split_config.random_seed).permutation(dataset_predictors_and_targets.training_x.shape[0])
+    candidates, samples_count, race_rounds = list(models_to_train), min_training_samples, list()
+    while len(candidates) > 1 and samples_count < len(training_rows):
+        start_time = time.perf_counter()
+        sample_rows = np.sort(training_rows[:samples_count])
+        validation_scores = __score_models_on_sample(dataset_predictors_and_targets, candidates, dataset_config, sample_rows)
+        ranked_candidates = sorted(candidates, key=lambda model_name: -np.inf if validation_scores[model_name] is None else validation_scores[model_name], reverse=True)
+        survivors = ranked_candidates[:max(1, math.ceil(len(candidates) / halving_factor))]
+        logger.info(f"\tRound {len(race_rounds) + 1}: {len(candidates)} models on {samples_count} training samples in {time.perf_counter() - start_time:.2f}s")
+        for model_name in ranked_candidates:
+            logger.info(f"\t\t{model_name.value}: validation score {validation_scores[model_name]}{'' if model_name in survivors else ' (dropped)'}")
+        race_rounds.append({"training_samples": samples_count,
+                            "validation_scores": {model_name.value: validation_scores[model_name] for model_name in ranked_candidates},
+                            "survivors": [model_name.value for model_name in survivors]})
+        candidates, samples_count = survivors, samples_count * halving_factor
+    __save_model_race(dataset_config.working_directory_path, race_rounds)
+    return candidates
+
+
+def __score_models_on_sample(dataset_predictors_and_targets: DatasetsPredictorsAndTargets, models_to_score: List[Union[ClassificationModels, RegressionModels]], dataset_config: DatasetConfig, sample_rows: np.ndarray) -> dict:
+    training_workers = __get_training_workers(len(models_to_score))
+    if training_workers == 1:
+        return {model_name: __score_model_on_sample(dataset_predictors_and_targets, model_name, dataset_config, sample_rows) for model_name in models_to_score}
+    with ProcessPoolExecutor(max_workers=training_workers) as executor:
+        futures = {model_name: executor.submit(__score_model_on_sample, dataset_predictors_and_targets, model_name, dataset_config, sample_rows) for model_name in models_to_score}
+        return {model_name: future.result() for model_name, future in futures.items()}
+
+
+def __score_model_on_sample(dataset_predictors_and_targets: DatasetsPredictorsAndTargets, model_name: Union[ClassificationModels, RegressionModels], dataset_config: DatasetConfig, sample_rows: np.ndarray) -> Optional[float]:
+    model = __get_model(dataset_config.problem_type, model_name)
+    try:
+        model.fit(to_model_input(model, dataset_predictors_and_targets.training_x[sample_rows]), dataset_predictors_and_targets.training_y[sample_rows].squeeze())
+        return float(model.score(to_model_input(model, dataset_predictors_and_targets.validation_x), dataset_predictors_and_targets.validation_y.squeeze()))
+    except Exception as exception:
+        logger.warning(f"\t\tModel '{model_name.value}' failed on {len(sample_rows)} training samples. Exception: {str(exception)}")
+        return None
 
 
 def __split_datasets_into_predictors_and_targets(dataset_splits: DatasetSplits, dataset_config: DatasetConfig) -> DatasetsPredictorsAndTargets:
     targets = [feature.name for feature in dataset_config.columns if feature.target]
-    predictors = list(set(dataset_splits.training_dataset.columns) - set(targets))
+    predictors = list(set(dataset_splits.dataset.columns) - set(targets))
     logger.info(f"\tPredictors ({len(predictors)}): '{predictors}'")
     logger.info(f"\tTargets ({len(targets)}): '{targets}'")
 
-    training_x, training_y = __split_predictors_and_targets(dataset_splits.training_dataset, targets)
-    testing_x, testing_y = __split_predictors_and_targets(dataset_splits.testing_dataset, targets)
-    validation_x, validation_y = None, None
-    if dataset_splits.validation_dataset is not None:
-        validation_x, validation_y = __split_predictors_and_targets(dataset_splits.validation_dataset, targets)
+    dataset_predictors_and_targets = __to_predictors_and_targets(dataset_splits, targets)
+    __save_features_config(dataset_config.working_directory_path, dataset_predictors_and_targets.feature_names, targets)
+    feature_matrices_path = dataset_config.working_directory_path / FEATURE_MATRICES_FOLDER
+    dataset_predictors_and_targets.to_memory_mapped_arrays(feature_matrices_path)
+    logger.info(f"\tPredictors and targets stored as memory mapped arrays in '{feature_matrices_path}'")
+    if model_cache.enabled:
+        dataset_predictors_and_targets.fingerprint = fingerprint_arrays(*[getattr(dataset_predictors_and_targets, matrix_name) for matrix_name in DatasetsPredictorsAndTargets.MATRIX_NAMES])
+    return dataset_predictors_and_targets
+
+
+def __save_features_config(working_directory_path: Path, predictors: List[str], targets: List[str]) -> None:
+    features_config_path = working_directory_path / FEATURES_CONFIG_FILE
+    features_config_json = {"predictors": predictors, "targets": targets}
+    artifact_writer.submit(features_config_path, lambda path: write_json(path, features_config_json))
+    logger.info(f"\tFeatures configuration saved at '{features_config_path}'")
+
 
-    return DatasetsPredictorsAndTargets(training_x, training_y, testing_x, testing_y, validation_x, validation_y)
+def __to_predictors_and_targets(dataset_splits: DatasetSplits, targets: List[str]) -> DatasetsPredictorsAndTargets:
+    split_rows = {split_name: dataset_splits.get_indices(split_name) for split_name in DatasetSplits.SPLIT_NAMES if dataset_splits.get_indices(split_name) is not None}
+    predictors_x, targets_y, feature_names = __split_predictors_and_targets(dataset_splits.dataset, targets, np.concatenate(list(split_rows.values())), dataset_splits.sparse_columns)
+    split_matrices, start = dict(), 0
+    for split_name, rows in split_rows.items():
+        split_matrices[f"{split_name}_x"], split_matrices[f"{split_name}_y"] = predictors_x[start:start + len(rows)], targets_y.iloc[start:start + len(rows)]
+        start += len(rows)
+    return DatasetsPredictorsAndTargets(**split_matrices, feature_names=feature_names)
 
 
-def __split_predictors_and_targets(dataset: pd.DataFrame, target_features: List[str]) -> Tuple[pd.DataFrame, pd.DataFrame]:
-    predictors = dataset.drop(columns=target_features)
-    targets = dataset[target_features].copy()
-    return predictors, targets
+def __split_predictors_and_targets(dataset: pd.DataFrame, target_features: List[str], rows: np.ndarray, sparse_columns: List[str]) -> Tuple[Union[np.ndarray, sparse.csr_matrix], pd.DataFrame, List[str]]:
+    targets = dataset[target_features].iloc[rows]
+    predictors = [column for column in dataset.columns if column not in target_features]
+    sparse_predictors = [column for column in predictors if column in sparse_columns]
+    dense_predictors = [column for column in predictors if column not in sparse_predictors]
+    unencoded_predictors = [column for column in dense_predictors if not (pd.api.types.is_numeric_dtype(dataset[column].dtype) or pd.api.types.is_bool_dtype(dataset[column].dtype))]
+    if unencoded_predictors:
+        raise ValueError(f"Predictors {unencoded_predictors} are not numeric, set an 'encode' method for them in the dataset config or drop them")
+    if not sparse_predictors:
+        return __take_rows(dataset, dense_predictors, rows, np.result_type(*dataset[dense_predictors].dtypes)), targets, dense_predictors
+    sparse_blocks = [sparse.csr_matrix(__take_rows(dataset, dense_predictors, rows, np.float64))]
+    feature_names = list(dense_predictors)
+    for sparse_predictor in sparse_predictors:
+        categories = dataset[sparse_predictor].cat.categories
+        sparse_blocks.append(to_one_hot_matrix(dataset[sparse_predictor].cat.codes.to_numpy()[rows], len(categories)))
+        feature_names.extend(categories)
+    return sparse.hstack(sparse_blocks, format="csr", dtype=np.float64), targets, feature_names
 
 
-def __get_models_to_train(dataset_config: DatasetConfig) -> List[Union[ClassificationModels, RegressionModels]]:
+def __take_rows(dataset: pd.DataFrame, columns: List[str], rows: np.ndarray, dtype: np.dtype) -> np.ndarray:
+    matrix = np.empty((len(rows), len(columns)), dtype=dtype)
+    for column_index, column in enumerate(columns):
+        matrix[:, column_index] = dataset[column].to_numpy()[rows]
+    return matrix
+
+
+def __get_models_to_train(dataset_config: DatasetConfig, training_shape: Tuple[int, int]) -> List[Union[ClassificationModels, RegressionModels]]:
     if dataset_config.problem_type == ProblemType.REGRESSION:
-        return [model for model in RegressionModels]
+        models, scalable_models = list(RegressionModels), SCALABLE_REGRESSION_MODELS
     elif dataset_config.problem_type == ProblemType.CLASSIFICATION:
-        return [model for model in ClassificationModels]
+        models, scalable_models = list(ClassificationModels), SCALABLE_CLASSIFICATION_MODELS
+    models = [model for model in models if model not in scalable_models.values()]
+    if not __uses_scalable_models(dataset_config, training_shape):
+        return models
+    logger.info(f"\tTraining dataset of {training_shape[0]} rows and {training_shape[1]} features is above the scalable models thresholds "
+                f"({dataset_config.training_config.scalable_models_rows_threshold} rows or {dataset_config.training_config.scalable_models_features_threshold} features)")
+    for model in models:
+        if model in scalable_models:
+            logger.info(f"\t\tReplacing model '{model.value}' with '{scalable_models[model].value}'")
+    return [scalable_models.get(model, model) for model in models]
+
+
+def __uses_scalable_models(dataset_config: DatasetConfig, training_shape: Tuple[int, int]) -> bool:
+    rows_threshold, features_threshold = dataset_config.training_config.scalable_models_rows_threshold, dataset_config.training_config.scalable_models_features_threshold
+    return (rows_threshold is not None and training_shape[0] >= rows_threshold) or (features_threshold is not None and training_shape[1] >= features_threshold)
 
 
-def __train_model(dataset_predictors_and_targets: DatasetsPredictorsAndTargets, model_name: Union[ClassificationModels, RegressionModels], dataset_config: DatasetConfig):
+def __add_scalable_parameters(problem_type: ProblemType, models_to_train: List[Union[ClassificationModels, RegressionModels]],
+                              models_parameters: Dict[Union[ClassificationModels, RegressionModels], Dict[str, Any]], training_workers: int) -> Dict[Union[ClassificationModels, RegressionModels], Dict[str, Any]]:
+    model_specifications = REGRESSION_MODELS if problem_type == ProblemType.REGRESSION else CLASSIFICATION_MODELS
+    model_jobs = max(1, os.cpu_count() // training_workers)
+    scalable_models_parameters = dict(models_parameters)
+    for model_name in models_to_train:
+        scalable_parameters = {name: model_jobs if name == "n_jobs" else value for name, value in model_specifications[model_name].scalable_parameters.items()}
+        if scalable_parameters:
+            scalable_models_parameters[model_name] = {**scalable_parameters, **models_parameters.get(model_name, dict())}
+            logger.info(f"\tModel '{model_name.value}' uses scalable parameters {scalable_parameters}")
+    return scalable_models_parameters
+
+
+def __get_incremental_models_to_train(dataset_config: DatasetConfig) -> List[Union[IncrementalClassificationModels, IncrementalRegressionModels]]:
+    if dataset_config.problem_type == ProblemType.REGRESSION:
+        return [model for model in IncrementalRegressionModels]
+    elif dataset_config.problem_type == ProblemType.CLASSIFICATION:
+        return [model for model in IncrementalClassificationModels]
+
+
+def __train_model(dataset_predictors_and_targets: DatasetsPredictorsAndTargets, model_name: Union[ClassificationModels, RegressionModels], dataset_config: DatasetConfig,
+                  model_parameters: Optional[Dict[str, Any]] = None, training_rows: Optional[np.ndarray] = None):
     model = __get_model(dataset_config.problem_type, model_name)
-    model.fit(dataset_predictors_and_targets.training_x, dataset_predictors_and_targets.training_y.squeeze())
+    if model_parameters:
+        model.set_params(**model_parameters)
+        logger.info(f"\t\tUsing parameters {model_parameters}")
+    cache_key = __get_model_cache_key(dataset_predictors_and_targets, model, dataset_config.problem_type, training_rows)
+    cached_model = model_cache.get(cache_key)
+    if cached_model is not None:
+        logger.info(f"\t\tReusing cached fit of model '{model_name.value}'")
+        model, cached_model_evaluation = cached_model
+        model_path = __save_model(model, model_name.value, dataset_config.working_directory_path, dataset_config.problem_type)
+        model_evaluation = cached_model_evaluation.model_copy(update={"model_path": model_path})
+        model_evaluation.pretty_print()
+        return model_evaluation
+    training_x, training_y = dataset_predictors_and_targets.training_x, dataset_predictors_and_targets.training_y
+    if training_rows is not None:
+        training_x, training_y = training_x[training_rows], training_y[training_rows]
+    start_time = time.perf_counter()
+    with profiler.profile(f"fit:{model_name.value}", *training_x.shape):
+        model.fit(to_model_input(model, training_x), training_y.squeeze())
+    fit_seconds = time.perf_counter() - start_time
     model_path = __save_model(model, model_name.value, dataset_config.working_directory_path, dataset_config.problem_type)
-    testing_predictions = model.predict(dataset_predictors_and_targets.testing_x)
-    model_evaluation = __evaluate_model(model_name.value, model_path, dataset_config.problem_type, dataset_predictors_and_targets.testing_y, testing_predictions)
+    start_time = time.perf_counter()
+    with profiler.profile(f"predict:{model_name.value}", *dataset_predictors_and_targets.testing_x.shape):
+        testing_predictions = model.predict(to_model_input(model, dataset_predictors_and_targets.testing_x))
+    predict_seconds = time.perf_counter() - start_time
+    model_evaluation = __evaluate_model(model_name, model_path, dataset_config.problem_type, dataset_predictors_and_targets.testing_y, testing_predictions)
+    model_evaluation.fit_seconds, model_evaluation.predict_seconds, model_evaluation.training_samples = fit_seconds, predict_seconds, training_x.shape[0]
+    if training_rows is not None:
+        model_evaluation.training_status = ModelTrainingStatus.SUBSAMPLED
+    logger.info(f"\t\tFit time: {fit_seconds:.3f}s, predict time: {predict_seconds:.3f}s ({dataset_predictors_and_targets.testing_x.shape[0]} rows)")
+    model_cache.put(cache_key, (model, model_evaluation))
     return model_evaluation
 
 
+def __get_model_cache_key(dataset_predictors_and_targets: DatasetsPredictorsAndTargets, model: Any, problem_type: ProblemType, training_rows: Optional[np.ndarray] = None) -> str:
+    model_class = f"{model.__class__.__module__}.{model.__class__.__qualname__}"
+    training_rows_fingerprint = [] if training_rows is None else [fingerprint_arrays(training_rows)]
+    return fingerprint("model", MODELS_CACHE_VERSION, sklearn.__version__, dataset_predictors_and_targets.fingerprint, problem_type.value, model_class, model.get_params(), *training_rows_fingerprint)
+
+
 def __get_model(problem_type: ProblemType, model_name: Union[ClassificationModels, RegressionModels]) -> Any:
     if problem_type == ProblemType.REGRESSION:
         return get_regression_model(model_name)
@@ -84,7 +583,21 @@ def __get_model(problem_type: ProblemType, model_name: Union[ClassificationModel
         return get_classification_model(model_name)
 
 
-def __evaluate_model(model_name: str, model_path: str, problem_type: ProblemType, expected_values: pd.DataFrame, predicted_values: pd.DataFrame) -> ModelPerformance:
+def __get_incremental_model(problem_type: ProblemType, model_name: Union[IncrementalClassificationModels, IncrementalRegressionModels]) -> Any:
+    if problem_type == ProblemType.REGRESSION:
+        return get_incremental_regression_model(model_name)
+    elif problem_type == ProblemType.CLASSIFICATION:
+        return get_incremental_classification_model(model_name)
+
+
+def __get_metrics(problem_type: ProblemType, expected_values: pd.DataFrame, predicted_values: pd.DataFrame) -> Dict[str, float]:
+    if problem_type == ProblemType.REGRESSION:
+        return get_regression_metrics(expected_values, predicted_values)
+    elif problem_type == ProblemType.CLASSIFICATION:
+        return get_classification_metrics(expected_values, predicted_values)
+
+
+def __evaluate_model(model_name: Union[ClassificationModels, RegressionModels, IncrementalClassificationModels, IncrementalRegressionModels], model_path: str, problem_type: ProblemType, expected_values: pd.DataFrame, predicted_values: pd.DataFrame) -> ModelPerformance:
     if problem_type == ProblemType.REGRESSION:
         return evaluate_regression_model(model_name, model_path, expected_values, predicted_values)
     elif problem_type == ProblemType.CLASSIFICATION:
@@ -96,14 +609,30 @@ def __save_model(model: Any, model_name: str, working_directory_path: Path, prob
     model_path = working_directory_path / MODELS_FOLDER / problem_type.value
     os.makedirs(model_path, exist_ok=True)
     model_path = model_path / f"{model_name}.pkl"
-    joblib.dump(model, model_path)
+    artifact_writer.submit(model_path, lambda path: __dump_model(model, model_name, path))
     logger.info(f"\t\tModel '{model_name}' saved successfully at '{model_path}'.")
     return str(model_path)
 
 
-def __save_model_evaluations(working_directory_path: Path, model_evaluations: List[ModelPerformance]):
+def __dump_model(model: Any, model_name: str, model_path: Path) -> None:
+    with profiler.profile(f"save_model:{model_name}"):
+        joblib.dump(model, model_path)
+
+
+def __save_model_race(working_directory_path: Path, race_rounds: List[dict]) -> None:
+    model_race_path = working_directory_path / MODEL_RACE_FILE
+    artifact_writer.submit(model_race_path, lambda path: write_json(path, race_rounds))
+    logger.info(f"Model race saved at '{model_race_path}'")
+
+
+def __save_cross_validation_results(working_directory_path: Path, cross_validation_results: dict) -> None:
+    cross_validation_path = working_directory_path / CROSS_VALIDATION_FILE
+    artifact_writer.submit(cross_validation_path, lambda path: write_json(path, cross_validation_results))
+    logger.info(f"Cross validation results saved at '{cross_validation_path}'")
+
+
+def __save_model_evaluations(working_directory_path: Path, model_evaluations: List[Union[ModelPerformance, UnfinishedModelTraining]]):
     models_performance_path = working_directory_path / MODELS_PERFORMANCE_FILE
     models_performance_json = [json.loads(model_performance.json()) for model_performance in model_evaluations]
-    with open(models_performance_path, 'w') as f:
-        json.dump(models_performance_json, f, indent=4)
+    artifact_writer.submit(models_performance_path, lambda path: write_json(path, models_performance_json))
     logger.info(f"Models performance evaluations saved at '{models_performance_path}'")
@@ -1,45 +1,59 @@
-from typing import Any
+from typing import Any, Dict, Union
 
 import pandas as pd
-from sklearn.ensemble import RandomForestClassifier, GradientBoostingClassifier
-from sklearn.linear_model import LogisticRegression
-from sklearn.metrics import accuracy_score, precision_score, recall_score, f1_score
-from sklearn.naive_bayes import GaussianNB
-from sklearn.neighbors import KNeighborsClassifier
-from sklearn.svm import SVC
-from sklearn.tree import DecisionTreeClassifier
 
-from models.enums import ClassificationModels
-from models.models import ClassificationModelPerformance
+from models.enums import ClassificationModels, IncrementalClassificationModels
+from models.models import ClassificationModelPerformance, ModelSpecification
+from services.model_training_services.model_registry import create_model
+
+CLASSIFICATION_MODELS = {
+    ClassificationModels.LOGISTIC_REGRESSION: ModelSpecification(module="sklearn.linear_model", class_name="LogisticRegression", parameters={"max_iter": 1000}),
+    ClassificationModels.RANDOM_FOREST: ModelSpecification(module="sklearn.ensemble", class_name="RandomForestClassifier", parameters={"n_estimators": 100, "random_state": 42},
+                                                           scalable_parameters={"n_jobs": -1}),
+    ClassificationModels.GRADIENT_BOOSTING: ModelSpecification(module="sklearn.ensemble", class_name="GradientBoostingClassifier", parameters={"n_estimators": 100, "random_state": 42}),
+    ClassificationModels.DECISION_TREE: ModelSpecification(module="sklearn.tree", class_name="DecisionTreeClassifier", parameters={"random_state": 42}),
+    ClassificationModels.SUPPORT_VECTOR_MACHINE: ModelSpecification(module="sklearn.svm", class_name="SVC", parameters={"probability": True, "random_state": 42}),
+    ClassificationModels.KNN: ModelSpecification(module="sklearn.neighbors", class_name="KNeighborsClassifier", scalable_parameters={"n_jobs": -1}),
+    ClassificationModels.NAIVE_BAYES: ModelSpecification(module="sklearn.naive_bayes", class_name="GaussianNB"),
+    ClassificationModels.HIST_GRADIENT_BOOSTING: ModelSpecification(module="sklearn.ensemble", class_name="HistGradientBoostingClassifier", parameters={"random_state": 42}),
+    ClassificationModels.LINEAR_SUPPORT_VECTOR_MACHINE: ModelSpecification(module="sklearn.svm", class_name="LinearSVC", parameters={"random_state": 42}),
+}
+SCALABLE_CLASSIFICATION_MODELS = {
+    ClassificationModels.GRADIENT_BOOSTING: ClassificationModels.HIST_GRADIENT_BOOSTING,
+    ClassificationModels.SUPPORT_VECTOR_MACHINE: ClassificationModels.LINEAR_SUPPORT_VECTOR_MACHINE,
+}
+INCREMENTAL_CLASSIFICATION_MODELS = {
+    IncrementalClassificationModels.SGD_CLASSIFIER: ModelSpecification(module="sklearn.linear_model", class_name="SGDClassifier", parameters={"loss": "log_loss", "random_state": 42}),
+    IncrementalClassificationModels.PERCEPTRON: ModelSpecification(module="sklearn.linear_model", class_name="Perceptron", parameters={"random_state": 42}),
+    IncrementalClassificationModels.NAIVE_BAYES: ModelSpecification(module="sklearn.naive_bayes", class_name="GaussianNB"),
+}
 
 
 def get_classification_model(model_name: ClassificationModels) -> Any:
-    if model_name == ClassificationModels.LOGISTIC_REGRESSION:
-        model = LogisticRegression(max_iter=1000)
-    elif model_name == ClassificationModels.RANDOM_FOREST:
-        model = RandomForestClassifier(n_estimators=100, random_state=42)
-    elif model_name == ClassificationModels.GRADIENT_BOOSTING:
-        model = GradientBoostingClassifier(n_estimators=100, random_state=42)
-    elif model_name == ClassificationModels.DECISION_TREE:
-        model = DecisionTreeClassifier(random_state=42)
-    elif model_name == ClassificationModels.SUPPORT_VECTOR_MACHINE:
-        model = SVC(probability=True, random_state=42)
-    elif model_name == ClassificationModels.KNN:
-        model = KNeighborsClassifier()
-    elif model_name == ClassificationModels.NAIVE_BAYES:
-        model = GaussianNB()
-    else:
+    if model_name not in CLASSIFICATION_MODELS:
         raise ValueError(f"Unsupported model: {model_name}")
+    return create_model(CLASSIFICATION_MODELS[model_name])
+
 
-    return model
+def get_incremental_classification_model(model_name: IncrementalClassificationModels) -> Any:
+    if model_name not in INCREMENTAL_CLASSIFICATION_MODELS:
+        raise ValueError(f"Unsupported incremental model: {model_name}")
+    return create_model(INCREMENTAL_CLASSIFICATION_MODELS[model_name])
 
 
-def evaluate_classification_model(model_name: str, model_path: str, expected_values: pd.DataFrame, predicted_values: pd.DataFrame) -> ClassificationModelPerformance:
+def evaluate_classification_model(model_name: Union[ClassificationModels, IncrementalClassificationModels], model_path: str, expected_values: pd.DataFrame, predicted_values: pd.DataFrame) -> ClassificationModelPerformance:
     performance = ClassificationModelPerformance(model=model_name,
                                           model_path=model_path,
-                                          accuracy=accuracy_score(expected_values, predicted_values),
-                                          precision=precision_score(expected_values, predicted_values, average="weighted", zero_division=0),
-                                          recall=recall_score(expected_values, predicted_values, average="weighted", zero_division=0),
-                                          f1=f1_score(expected_values, predicted_values, average="weighted", zero_division=0))
+                                          **get_classification_metrics(expected_values, predicted_values))
     performance.pretty_print()
     return performance
+
+
+def get_classification_metrics(expected_values: pd.DataFrame, predicted_values: pd.DataFrame) -> Dict[str, float]:
+    from sklearn.metrics import accuracy_score, precision_score, recall_score, f1_score
+    return {
+        "accuracy": accuracy_score(expected_values, predicted_values),
+        "precision": precision_score(expected_values, predicted_values, average="weighted", zero_division=0),
+        "recall": recall_score(expected_values, predicted_values, average="weighted", zero_division=0),
+        "f1": f1_score(expected_values, predicted_values, average="weighted", zero_division=0)
+    }
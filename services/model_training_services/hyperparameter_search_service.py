@@ -0,0 +1,155 @@
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import numpy as np
+from sklearn.base import clone
+from sklearn.model_selection import ParameterGrid, ParameterSampler
+
+from configurations.constants import HYPERPARAMETER_SEARCH_FILE, SEARCH_HOLDOUT_FRACTION, EARLY_STOPPING_ITERATIONS, WARM_START_STEPS, \
+    WARM_START_PATIENCE
+from configurations.env_variables import TRAINING_WORKERS
+from helpers.artifact_writer import artifact_writer
+from helpers.functions import write_json, to_model_input
+from helpers.logger import logger
+from models.enums import ClassificationModels, RegressionModels
+from models.models import DatasetsPredictorsAndTargets, DatasetConfig, TrainingConfig
+
+
+def search_hyperparameters(dataset_predictors_and_targets: DatasetsPredictorsAndTargets, models: Dict[Union[ClassificationModels, RegressionModels], Any],
+                           dataset_config: DatasetConfig) -> Dict[Union[ClassificationModels, RegressionModels], Dict[str, Any]]:
+    training_config = dataset_config.training_config
+    search_config = training_config.hyperparameter_search
+    ignored_search_spaces = set(search_config.search_spaces) - {model_name.value for model_name in models}
+    if ignored_search_spaces:
+        logger.warning(f"\tSearch spaces of models that are not trained are ignored: {sorted(ignored_search_spaces)}")
+    models = {model_name: model for model_name, model in models.items() if search_config.search_spaces.get(model_name.value)}
+    search_workers = __get_search_workers()
+    logger.info(f"Searching hyperparameters of {len(models)} models (maximum trials: {search_config.max_trials}, workers: {search_workers})")
+    training_rows, validation_rows = __get_search_rows(dataset_predictors_and_targets, dataset_config.dataset_split_config.random_seed)
+    if validation_rows is not None:
+        logger.info(f"\tNo validation dataset, holding out {len(validation_rows)} training samples to score the trials")
+
+    models_parameters, search_results = dict(), dict()
+    executor = ProcessPoolExecutor(max_workers=search_workers) if search_workers > 1 else None
+    try:
+        for model_name, model in models.items():
+            start_time = time.perf_counter()
+            search_space = search_config.search_spaces[model_name.value]
+            trials = list(ParameterSampler(search_space, n_iter=min(search_config.max_trials, len(ParameterGrid(search_space))),
+                                           random_state=dataset_config.dataset_split_config.random_seed))
+            logger.info(f"\tModel '{model_name.value}': {len(trials)} trials")
+            best_evaluation, evaluations = __search_model(dataset_predictors_and_targets, model, trials, training_rows, validation_rows, training_config, executor)
+            search_seconds = time.perf_counter() - start_time
+            if best_evaluation is None:
+                logger.warning(f"\t\tAll trials of model '{model_name.value}' failed, keeping its default parameters")
+            else:
+                models_parameters[model_name] = best_evaluation["fitted_parameters"]
+                logger.info(f"\t\tBest parameters: {best_evaluation['fitted_parameters']} (validation score {best_evaluation['score']}) in {search_seconds:.2f}s")
+            search_results[model_name.value] = {"best_parameters": None if best_evaluation is None else best_evaluation["fitted_parameters"],
+                                                "best_score": None if best_evaluation is None else best_evaluation["score"],
+                                                "search_seconds": search_seconds,
+                                                "trials": evaluations}
+    finally:
+        if executor is not None:
+            executor.shutdown()
+    __save_search_results(dataset_config.working_directory_path, search_results)
+    return models_parameters
+
+
+def __search_model(dataset_predictors_and_targets: DatasetsPredictorsAndTargets, model: Any, trials: List[Dict[str, Any]], training_rows: np.ndarray,
+                   validation_rows: Optional[np.ndarray], training_config: TrainingConfig, executor: Optional[ProcessPoolExecutor]) -> Tuple[Optional[Dict], List[Dict]]:
+    candidates, evaluations, rung = list(range(len(trials))), list(), 1
+    samples_count = min(training_config.min_training_samples, len(training_rows))
+    while True:
+        start_time = time.perf_counter()
+        sample_rows = np.sort(training_rows[:samples_count])
+        arguments = [(dataset_predictors_and_targets, model, trials[trial_index], sample_rows, validation_rows) for trial_index in candidates]
+        rung_evaluations = list(executor.map(__evaluate_trial, *zip(*arguments))) if executor is not None else [__evaluate_trial(*trial_arguments) for trial_arguments in arguments]
+        for trial_index, evaluation in zip(candidates, rung_evaluations):
+            evaluation.update(trial=trial_index, rung=rung, pruned=False)
+        evaluations.extend(rung_evaluations)
+        ranked_evaluations = sorted(rung_evaluations, key=lambda evaluation: -np.inf if evaluation["score"] is None else evaluation["score"], reverse=True)
+        logger.info(f"\t\tRung {rung}: {len(candidates)} trials on {samples_count} training samples in {time.perf_counter() - start_time:.2f}s, "
+                    f"best validation score {ranked_evaluations[0]['score']}")
+        if samples_count >= len(training_rows):
+            return (ranked_evaluations[0] if ranked_evaluations[0]["score"] is not None else None), evaluations
+        survivors = ranked_evaluations[:max(1, math.ceil(len(candidates) / training_config.halving_factor))]
+        for evaluation in ranked_evaluations[len(survivors):]:
+            evaluation["pruned"] = True
+        candidates = [evaluation["trial"] for evaluation in survivors if evaluation["score"] is not None]
+        if not candidates:
+            return None, evaluations
+        samples_count = len(training_rows) if len(candidates) == 1 else min(samples_count * training_config.halving_factor, len(training_rows))
+        rung += 1
+
+
+def __evaluate_trial(dataset_predictors_and_targets: DatasetsPredictorsAndTargets, model: Any, parameters: Dict[str, Any], training_rows: np.ndarray,
+                     validation_rows: Optional[np.ndarray]) -> Dict:
+    start_time = time.perf_counter()
+    evaluation = {"parameters": parameters, "training_samples": len(training_rows)}
+    try:
+        model = clone(model).set_params(**parameters)
+        training_x, training_y = dataset_predictors_and_targets.training_x[training_rows], dataset_predictors_and_targets.training_y[training_rows].squeeze()
+        if validation_rows is None:
+            validation_x, validation_y = dataset_predictors_and_targets.validation_x, dataset_predictors_and_targets.validation_y.squeeze()
+        else:
+            validation_x, validation_y = dataset_predictors_and_targets.training_x[validation_rows], dataset_predictors_and_targets.training_y[validation_rows].squeeze()
+        training_x, validation_x = to_model_input(model, training_x), to_model_input(model, validation_x)
+        model_parameters = model.get_params()
+        if "n_iter_no_change" in model_parameters and "n_estimators" in model_parameters:
+            if model_parameters["n_iter_no_change"] is None:
+                model.set_params(n_iter_no_change=EARLY_STOPPING_ITERATIONS)
+            model.fit(training_x, training_y)
+            evaluation["fitted_parameters"] = {**parameters, "n_estimators": int(model.n_estimators_)}
+            evaluation["score"] = float(model.score(validation_x, validation_y))
+        elif "warm_start" in model_parameters and "n_estimators" in model_parameters:
+            evaluation["fitted_parameters"], evaluation["intermediate_scores"] = __fit_with_warm_start(model, parameters, training_x, training_y, validation_x, validation_y)
+            evaluation["score"] = max(evaluation["intermediate_scores"])
+        else:
+            model.fit(training_x, training_y)
+            evaluation["fitted_parameters"] = parameters
+            evaluation["score"] = float(model.score(validation_x, validation_y))
+    except Exception as exception:
+        logger.warning(f"\t\tTrial {parameters} failed on {len(training_rows)} training samples. Exception: {str(exception)}")
+        evaluation.update(score=None, error=str(exception))
+    evaluation["fit_seconds"] = time.perf_counter() - start_time
+    return evaluation
+
+
+def __fit_with_warm_start(model: Any, parameters: Dict[str, Any], training_x: Any, training_y: np.ndarray, validation_x: Any, validation_y: np.ndarray) -> Tuple[Dict[str, Any], List[float]]:
+    maximum_estimators = model.get_params()["n_estimators"]
+    estimators_step = max(1, math.ceil(maximum_estimators / WARM_START_STEPS))
+    model.set_params(warm_start=True)
+    scores, estimators_counts, best_index = list(), list(), 0
+    for estimators_count in range(estimators_step, maximum_estimators + estimators_step, estimators_step):
+        estimators_counts.append(min(estimators_count, maximum_estimators))
+        model.set_params(n_estimators=estimators_counts[-1])
+        model.fit(training_x, training_y)
+        scores.append(float(model.score(validation_x, validation_y)))
+        if scores[-1] > scores[best_index]:
+            best_index = len(scores) - 1
+        elif len(scores) - 1 - best_index >= WARM_START_PATIENCE:
+            break
+    return {**parameters, "n_estimators": estimators_counts[best_index]}, scores
+
+
+def __get_search_rows(dataset_predictors_and_targets: DatasetsPredictorsAndTargets, random_seed: Optional[int]) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+    training_rows = np.random.default_rng(random_seed).permutation(dataset_predictors_and_targets.training_x.shape[0])
+    if dataset_predictors_and_targets.validation_x is not None:
+        return training_rows, None
+    holdout_count = max(1, int(len(training_rows) * SEARCH_HOLDOUT_FRACTION))
+    return training_rows[holdout_count:], np.sort(training_rows[:holdout_count])
+
+
+def __get_search_workers() -> int:
+    return max(1, TRAINING_WORKERS if TRAINING_WORKERS > 0 else os.cpu_count())
+
+
+def __save_search_results(working_directory_path: Path, search_results: Dict[str, Dict]) -> None:
+    search_results_path = working_directory_path / HYPERPARAMETER_SEARCH_FILE
+    artifact_writer.submit(search_results_path, lambda path: write_json(path, search_results))
+    logger.info(f"Hyperparameter search results saved at '{search_results_path}'")
@@ -0,0 +1,9 @@
+from importlib import import_module
+from typing import Any
+
+from models.models import ModelSpecification
+
+
+def create_model(model_specification: ModelSpecification) -> Any:
+    model_class = getattr(import_module(model_specification.module), model_specification.class_name)
+    return model_class(**model_specification.parameters)
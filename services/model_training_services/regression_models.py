@@ -1,28 +1,50 @@
+from typing import Any, Dict, Union
+
 import pandas as pd
-from sklearn.linear_model import LinearRegression
-from typing import Any
 
-from sklearn.metrics import mean_absolute_error, mean_squared_error, root_mean_squared_error, r2_score
+from models.enums import RegressionModels, IncrementalRegressionModels
+from models.models import RegressionModelPerformance, ModelSpecification
+from services.model_training_services.model_registry import create_model
 
-from models.enums import RegressionModels
-from models.models import RegressionModelPerformance
+REGRESSION_MODELS = {
+    RegressionModels.LINEAR_REGRESSION: ModelSpecification(module="sklearn.linear_model", class_name="LinearRegression"),
+    RegressionModels.RIDGE_REGRESSION: ModelSpecification(module="sklearn.linear_model", class_name="Ridge", parameters={"random_state": 42}),
+    RegressionModels.LASSO_REGRESSION: ModelSpecification(module="sklearn.linear_model", class_name="Lasso", parameters={"random_state": 42}),
+    RegressionModels.RANDOM_FOREST: ModelSpecification(module="sklearn.ensemble", class_name="RandomForestRegressor", parameters={"n_estimators": 100, "random_state": 42},
+                                                       scalable_parameters={"n_jobs": -1}),
+    RegressionModels.HIST_GRADIENT_BOOSTING: ModelSpecification(module="sklearn.ensemble", class_name="HistGradientBoostingRegressor", parameters={"random_state": 42}),
+}
+SCALABLE_REGRESSION_MODELS = dict()
+INCREMENTAL_REGRESSION_MODELS = {
+    IncrementalRegressionModels.SGD_REGRESSOR: ModelSpecification(module="sklearn.linear_model", class_name="SGDRegressor", parameters={"random_state": 42}),
+}
 
 
 def get_regression_model(model_name: RegressionModels) -> Any:
-    if model_name == RegressionModels.LINEAR_REGRESSION:
-        model = LinearRegression()
-    else:
+    if model_name not in REGRESSION_MODELS:
         raise ValueError(f"Unsupported model: {model_name}")
+    return create_model(REGRESSION_MODELS[model_name])
+
 
-    return model
+def get_incremental_regression_model(model_name: IncrementalRegressionModels) -> Any:
+    if model_name not in INCREMENTAL_REGRESSION_MODELS:
+        raise ValueError(f"Unsupported incremental model: {model_name}")
+    return create_model(INCREMENTAL_REGRESSION_MODELS[model_name])
 
 
-def evaluate_regression_model(model_name: str, model_path: str, expected_values: pd.DataFrame, predicted_values: pd.DataFrame) -> RegressionModelPerformance:
+def evaluate_regression_model(model_name: Union[RegressionModels, IncrementalRegressionModels], model_path: str, expected_values: pd.DataFrame, predicted_values: pd.DataFrame) -> RegressionModelPerformance:
     performance = RegressionModelPerformance(model=model_name,
                                       model_path=model_path,
-                                      mean_absolute_error=mean_absolute_error(expected_values, predicted_values),
-                                      mean_squared_error=mean_squared_error(expected_values, predicted_values),
-                                      root_mean_squared_error=root_mean_squared_error(expected_values, predicted_values),
-                                      r2_score=r2_score(expected_values, predicted_values))
+                                      **get_regression_metrics(expected_values, predicted_values))
     performance.pretty_print()
     return performance
+
+
+def get_regression_metrics(expected_values: pd.DataFrame, predicted_values: pd.DataFrame) -> Dict[str, float]:
+    from sklearn.metrics import mean_absolute_error, mean_squared_error, root_mean_squared_error, r2_score
+    return {
+        "mean_absolute_error": mean_absolute_error(expected_values, predicted_values),
+        "mean_squared_error": mean_squared_error(expected_values, predicted_values),
+        "root_mean_squared_error": root_mean_squared_error(expected_values, predicted_values),
+        "r2_score": r2_score(expected_values, predicted_values)
+    }
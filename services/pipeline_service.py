@@ -0,0 +1,34 @@
+from pathlib import Path
+
+from configurations.constants import SAMPLE_DATASETS_PATH
+from configurations.env_variables import WORKING_DIRECTORIES_MAX_AGE_DAYS, OUT_OF_CORE_CHUNK_SIZE
+from helpers.artifact_cache import evict_working_directories
+from helpers.artifact_writer import artifact_writer
+from helpers.logger import logger
+from helpers.profiler import profiler
+from models.models import DatasetConfig
+from services import read_dataset_service, dataset_preprocessing_service, model_training_service
+
+
+def run_pipeline(dataset_name: str, datasets_path: Path = SAMPLE_DATASETS_PATH) -> DatasetConfig:
+    if OUT_OF_CORE_CHUNK_SIZE:
+        dataset_chunks, config = read_dataset_service.read_dataset_chunks(dataset_name, OUT_OF_CORE_CHUNK_SIZE, datasets_path)
+        evict_working_directories(config.working_directory_path, WORKING_DIRECTORIES_MAX_AGE_DAYS)
+        with profiler.profile("preprocess_dataset_chunks"):
+            chunked_preprocessing = dataset_preprocessing_service.preprocess_dataset_chunks(dataset_chunks, config)
+        with profiler.profile("train_models_incrementally"):
+            model_training_service.train_models_incrementally(chunked_preprocessing, config)
+    else:
+        dataset, config = read_dataset_service.read_dataset(dataset_name, datasets_path)
+        evict_working_directories(config.working_directory_path, WORKING_DIRECTORIES_MAX_AGE_DAYS)
+        if config.training_config.cross_validation is not None:
+            with profiler.profile("cross_validate_models", *dataset.shape):
+                model_training_service.cross_validate_models(dataset, config)
+        with profiler.profile("preprocess_dataset", *dataset.shape):
+            dataset_splits = dataset_preprocessing_service.preprocess_dataset(dataset, config)
+        with profiler.profile("train_models", *dataset_splits.get_shape("training")):
+            model_training_service.train_models(dataset_splits, config)
+    artifact_writer.flush()
+    logger.info("All artifacts written to disk.")
+    profiler.save(config.working_directory_path)
+    return config
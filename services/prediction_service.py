@@ -0,0 +1,116 @@
+import os
+import time
+from pathlib import Path
+from typing import Any, List, Union
+
+import joblib
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from scipy import sparse
+
+from configurations.constants import LINE_BREAK, DATASET_CONFIG_FILE, IMPUTATION_STATISTICS_FILE, ENCODINGS_CONFIG_FILE, \
+    FEATURES_CONFIG_FILE, MODELS_FOLDER
+from helpers.functions import read_json, to_model_input
+from helpers.logger import logger
+from models.enums import ProblemType
+from models.models import ColumnConfig
+from services.preprocessing_services.feature_encoding_service import load_encodings_config
+from services.preprocessing_services.feature_scaling_service import load_scalers
+from services.preprocessing_services.preprocessing_plan_service import compile_preprocessing_plan
+from services.read_dataset_service import read_file_chunks
+
+
+class PredictionPlan:
+    def __init__(self, working_directory_path: Path, model_name: str):
+        dataset_config_json = read_json(working_directory_path / DATASET_CONFIG_FILE)
+        features_config_json = read_json(working_directory_path / FEATURES_CONFIG_FILE)
+        self.problem_type = ProblemType(dataset_config_json["problem_type"])
+        self.target_names = features_config_json["targets"]
+        self.feature_names = features_config_json["predictors"]
+        self.input_columns = [ColumnConfig(**column) for column in dataset_config_json["columns"] if column["name"] not in self.target_names]
+        self.imputation_statistics = {column_name: value
+                                      for column_name, value in read_json(working_directory_path / IMPUTATION_STATISTICS_FILE).items()
+                                      if column_name not in self.target_names}
+        self.encodings_config = [encoding_config
+                                 for encoding_config in load_encodings_config(working_directory_path / ENCODINGS_CONFIG_FILE)
+                                 if encoding_config.original_feature_name not in self.target_names]
+        self.scalers = load_scalers(working_directory_path)
+        self.preprocessing_plan = compile_preprocessing_plan(self.input_columns, self.imputation_statistics, self.encodings_config,
+                                                             [(scaler_config.scaler_type, scaler_config.feature_names, scaler) for scaler_config, scaler in self.scalers],
+                                                             self.feature_names)
+        self.model_name = model_name
+        self.model = joblib.load(working_directory_path / MODELS_FOLDER / self.problem_type.value / f"{model_name}.pkl")
+
+    def transform(self, dataset: pd.DataFrame) -> Union[np.ndarray, sparse.csr_matrix]:
+        return self.preprocessing_plan.transform(dataset)
+
+    def predict(self, dataset: pd.DataFrame) -> pd.DataFrame:
+        predictors = to_model_input(self.model, self.transform(dataset))
+        predictions = pd.DataFrame({"prediction": self.model.predict(predictors)}, index=dataset.index)
+        if hasattr(self.model, "predict_proba"):
+            probabilities = self.model.predict_proba(predictors)
+            for class_index, class_label in enumerate(self.model.classes_):
+                predictions[f"probability_{class_label}"] = probabilities[:, class_index]
+        return predictions
+
+    def get_prediction_fields(self) -> List[pa.Field]:
+        classes = getattr(self.model, "classes_", None)
+        prediction_type = pa.float64() if classes is None else pa.string() if classes.dtype == object else pa.from_numpy_dtype(classes.dtype)
+        prediction_fields = [pa.field("prediction", prediction_type)]
+        if hasattr(self.model, "predict_proba"):
+            prediction_fields.extend(pa.field(f"probability_{class_label}", pa.float64()) for class_label in classes)
+        return prediction_fields
+
+
+def predict(working_directory_path: Path, model_name: str, input_path: Path, output_path: Path, chunk_size: int, passthrough_columns: List[str] = None) -> None:
+    try:
+        logger.info(LINE_BREAK)
+        logger.info("BATCH PREDICTION")
+        prediction_plan = PredictionPlan(working_directory_path, model_name)
+        logger.info(f"\tLoaded model '{model_name}' and preprocessing artifacts from '{working_directory_path}'")
+        passthrough_columns = passthrough_columns or list()
+        input_columns = prediction_plan.input_columns + [ColumnConfig(name=column_name, type="str", drop=False) for column_name in passthrough_columns]
+
+        if os.path.exists(output_path):
+            os.remove(output_path)
+        output_schema = pa.schema(__get_passthrough_fields(input_path, passthrough_columns) + prediction_plan.get_prediction_fields())
+        output_writer = None
+        total_rows = 0
+        start_time = time.perf_counter()
+        for chunk_number, dataset_chunk in enumerate(read_file_chunks(input_path, input_columns, chunk_size), 1):
+            predictions = prediction_plan.predict(dataset_chunk)
+            passthrough_chunk = dataset_chunk[passthrough_columns] if input_path.suffix == ".parquet" else dataset_chunk[passthrough_columns].astype("string")
+            predictions = pd.concat([passthrough_chunk, predictions], axis=1)
+            output_writer = __write_predictions(predictions, output_path, output_writer, output_schema)
+            total_rows += len(predictions)
+            elapsed_time = time.perf_counter() - start_time
+            logger.info(f"\tChunk {chunk_number}: {total_rows} rows scored ({total_rows / elapsed_time:.0f} rows/s)")
+        if output_writer is not None:
+            output_writer.close()
+
+        elapsed_time = time.perf_counter() - start_time
+        logger.info(f"Predictions for {total_rows} rows saved at '{output_path}' in {elapsed_time:.2f}s ({total_rows / max(elapsed_time, 1e-9):.0f} rows/s).")
+    except Exception as exception:
+        logger.error(f"Error while predicting with model '{model_name}'. Exception: {str(exception)}")
+        raise
+
+
+def __get_passthrough_fields(input_path: Path, passthrough_columns: List[str]) -> List[pa.Field]:
+    if input_path.suffix != ".parquet":
+        return [pa.field(column_name, pa.string()) for column_name in passthrough_columns]
+    input_schema = pq.read_schema(input_path)
+    passthrough_fields = [input_schema.field(column_name) for column_name in passthrough_columns]
+    return [pa.field(field.name, pa.string()) if pa.types.is_null(field.type) else field for field in passthrough_fields]
+
+
+def __write_predictions(predictions: pd.DataFrame, output_path: Path, output_writer: Any, output_schema: pa.Schema) -> Any:
+    if output_path.suffix == ".parquet":
+        predictions_table = pa.Table.from_pandas(predictions, schema=output_schema, preserve_index=False)
+        if output_writer is None:
+            output_writer = pq.ParquetWriter(output_path, output_schema)
+        output_writer.write_table(predictions_table)
+        return output_writer
+    predictions.to_csv(output_path, mode="a", header=not os.path.exists(output_path), index=False)
+    return None
@@ -0,0 +1,171 @@
+from pathlib import Path
+from typing import List, Dict, Iterable, Any
+
+import numpy as np
+import pandas as pd
+
+from configurations.constants import QUANTILE_SKETCH_SIZE, TOP_VALUES_COUNT, COLUMN_STATISTICS_FILE
+from helpers.artifact_writer import artifact_writer
+from helpers.functions import write_json, read_json
+from helpers.logger import logger
+from models.enums import FeatureType, MissingValueImputationMethod
+from models.models import ColumnConfig, ColumnStatistics
+
+
+class QuantileSketch:
+    def __init__(self, size: int = QUANTILE_SKETCH_SIZE):
+        self.size = size
+        self.means = np.empty(0, dtype=np.float64)
+        self.weights = np.empty(0, dtype=np.float64)
+        self.exact_median = None
+
+    @property
+    def is_exact(self) -> bool:
+        return self.exact_median is not None or bool((self.weights == 1).all())
+
+    def update(self, values: np.ndarray) -> None:
+        values = np.sort(values[~np.isnan(values)])
+        if not len(values):
+            return
+        self.exact_median = self.__get_sorted_median(values) if not len(self.means) and len(values) > self.size else None
+        self.__add(values, np.ones(len(values), dtype=np.float64))
+
+    def merge(self, other: "QuantileSketch") -> None:
+        if not len(other.means):
+            return
+        self.exact_median = other.exact_median if not len(self.means) else None
+        self.__add(other.means, other.weights)
+
+    def median(self) -> Any:
+        if self.exact_median is not None:
+            return self.exact_median
+        if not len(self.means):
+            return None
+        if (self.weights == 1).all():
+            return self.__get_sorted_median(self.means)
+        cumulative_weights = np.cumsum(self.weights)
+        return float(np.interp(cumulative_weights[-1] / 2, cumulative_weights - self.weights / 2, self.means))
+
+    def __add(self, means: np.ndarray, weights: np.ndarray) -> None:
+        means, weights = np.concatenate([self.means, means]), np.concatenate([self.weights, weights])
+        order = np.argsort(means, kind="stable")
+        self.means, self.weights = means[order], weights[order]
+        if len(self.means) > self.size:
+            self.__compress()
+
+    def __compress(self) -> None:
+        cumulative_weights = np.cumsum(self.weights)
+        groups = np.minimum(((cumulative_weights - self.weights / 2) / cumulative_weights[-1] * self.size).astype(np.intp), self.size - 1)
+        group_weights = np.bincount(groups, self.weights, minlength=self.size)
+        group_sums = np.bincount(groups, self.weights * self.means, minlength=self.size)
+        non_empty_groups = group_weights > 0
+        self.means, self.weights = group_sums[non_empty_groups] / group_weights[non_empty_groups], group_weights[non_empty_groups]
+
+    @staticmethod
+    def __get_sorted_median(sorted_values: np.ndarray) -> float:
+        middle = len(sorted_values) // 2
+        if len(sorted_values) % 2:
+            return float(sorted_values[middle])
+        return float((sorted_values[middle - 1] + sorted_values[middle]) / 2)
+
+
+class ColumnStatisticsAccumulator:
+    def __init__(self, columns: List[ColumnConfig], sketch_size: int = QUANTILE_SKETCH_SIZE):
+        self.numeric_columns = [column.name for column in columns
+                                if column.type == FeatureType.CONTINUOUS or column.missing in (MissingValueImputationMethod.MEAN, MissingValueImputationMethod.MEDIAN)]
+        self.counted_columns = [column.name for column in columns
+                                if column.type == FeatureType.CATEGORICAL or column.missing == MissingValueImputationMethod.MODE]
+        self.rows_count = 0
+        self.chunks_count = 0
+        self.null_counts = dict()
+        self.sums = np.zeros(len(self.numeric_columns), dtype=np.float64)
+        self.non_null_counts = np.zeros(len(self.numeric_columns), dtype=np.int64)
+        self.sketches = [QuantileSketch(sketch_size) for _ in self.numeric_columns]
+        self.value_counts = {column_name: pd.Series(dtype=np.int64) for column_name in self.counted_columns}
+
+    def update(self, dataset: pd.DataFrame) -> "ColumnStatisticsAccumulator":
+        self.rows_count += len(dataset)
+        self.chunks_count += 1
+        for column_name, null_count in dataset.isnull().sum().items():
+            self.null_counts[column_name] = self.null_counts.get(column_name, 0) + int(null_count)
+        if self.numeric_columns:
+            numeric_values = dataset[self.numeric_columns].to_numpy(dtype=np.float64, na_value=np.nan)
+            self.sums += np.nansum(numeric_values, axis=0)
+            self.non_null_counts += (~np.isnan(numeric_values)).sum(axis=0)
+            for column_index, sketch in enumerate(self.sketches):
+                sketch.update(numeric_values[:, column_index])
+        for column_name in self.counted_columns:
+            value_counts = dataset[column_name].value_counts(sort=False)
+            value_counts = value_counts[value_counts > 0]
+            value_counts.index = pd.Index(np.asarray(value_counts.index))
+            self.value_counts[column_name] = self.value_counts[column_name].add(value_counts, fill_value=0).astype(np.int64) if len(self.value_counts[column_name]) else value_counts
+        return self
+
+    def merge(self, other: "ColumnStatisticsAccumulator") -> "ColumnStatisticsAccumulator":
+        self.rows_count += other.rows_count
+        self.chunks_count += other.chunks_count
+        for column_name, null_count in other.null_counts.items():
+            self.null_counts[column_name] = self.null_counts.get(column_name, 0) + null_count
+        self.sums += other.sums
+        self.non_null_counts += other.non_null_counts
+        for sketch, other_sketch in zip(self.sketches, other.sketches):
+            sketch.merge(other_sketch)
+        for column_name, value_counts in other.value_counts.items():
+            self.value_counts[column_name] = self.value_counts[column_name].add(value_counts, fill_value=0).astype(np.int64) if len(self.value_counts[column_name]) else value_counts
+        return self
+
+    def finalize(self) -> Dict[str, ColumnStatistics]:
+        column_statistics = {column_name: ColumnStatistics(count=self.rows_count - null_count, null_count=null_count)
+                             for column_name, null_count in self.null_counts.items()}
+        for column_index, column_name in enumerate(self.numeric_columns):
+            statistics = column_statistics[column_name]
+            if self.non_null_counts[column_index]:
+                statistics.mean = float(self.sums[column_index] / self.non_null_counts[column_index])
+                statistics.median = self.sketches[column_index].median()
+                statistics.exact_median = self.sketches[column_index].is_exact
+        for column_name, value_counts in self.value_counts.items():
+            if not len(value_counts):
+                continue
+            statistics = column_statistics[column_name]
+            statistics.mode = self.__to_python_value(self.__sort_by_value(value_counts[value_counts == value_counts.max()]).index[0])
+            top_values = value_counts.sort_values(ascending=False, kind="stable").head(TOP_VALUES_COUNT)
+            statistics.top_values = [[self.__to_python_value(value), int(count)] for value, count in top_values.items()]
+        return column_statistics
+
+    @staticmethod
+    def __sort_by_value(value_counts: pd.Series) -> pd.Series:
+        try:
+            return value_counts.sort_index()
+        except TypeError:
+            return value_counts.sort_index(key=lambda index: index.astype(str))
+
+    @staticmethod
+    def __to_python_value(value: Any) -> Any:
+        return value.item() if isinstance(value, np.generic) else value
+
+
+def compute_column_statistics(dataset_chunks: Iterable[pd.DataFrame], columns: List[ColumnConfig]) -> Dict[str, ColumnStatistics]:
+    accumulator = ColumnStatisticsAccumulator(columns)
+    for dataset_chunk in dataset_chunks:
+        accumulator.update(dataset_chunk)
+    return accumulator.finalize()
+
+
+def get_imputation_value(column_statistics: ColumnStatistics, method: MissingValueImputationMethod) -> Any:
+    if method == MissingValueImputationMethod.MEAN:
+        return np.nan if column_statistics.mean is None else column_statistics.mean
+    if method == MissingValueImputationMethod.MEDIAN:
+        return np.nan if column_statistics.median is None else column_statistics.median
+    if method == MissingValueImputationMethod.MODE:
+        return column_statistics.mode
+
+
+def save_column_statistics(working_directory_path: Path, column_statistics: Dict[str, ColumnStatistics]) -> None:
+    column_statistics_file_path = working_directory_path / COLUMN_STATISTICS_FILE
+    column_statistics_json = {column_name: statistics.model_dump() for column_name, statistics in column_statistics.items()}
+    artifact_writer.submit(column_statistics_file_path, lambda path: write_json(path, column_statistics_json))
+    logger.info(f"Column statistics saved at '{column_statistics_file_path}'")
+
+
+def load_column_statistics(column_statistics_file_path: Path) -> Dict[str, ColumnStatistics]:
+    return {column_name: ColumnStatistics(**statistics) for column_name, statistics in read_json(column_statistics_file_path).items()}
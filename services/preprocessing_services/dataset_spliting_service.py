@@ -1,11 +1,14 @@
-from typing import Tuple
+from typing import Tuple, Optional, Dict, List
 
+import numpy as np
 import pandas as pd
-from sklearn.model_selection import train_test_split
+from sklearn.model_selection import train_test_split, KFold, StratifiedKFold
 
 from configurations.constants import LINE_BREAK
-from helpers.functions import save_dataset_splits
+from helpers.artifact_cache import preprocessing_cache, fingerprint
+from helpers.functions import save_dataset_splits, get_preprocessing_cache_key
 from helpers.logger import logger
+from models.enums import CrossValidationType, ProblemType
 from models.models import DatasetConfig, DatasetSplits, DatasetSplitConfig
 
 
@@ -16,28 +19,10 @@ def split_training_testing_validation_datasets(dataset: pd.DataFrame, config: Da
         dataset_split_config = config.dataset_split_config
         __print_dataset_split_configuration_info(dataset_split_config)
 
-        training_dataset, testing_and_validation_dataset = train_test_split(
-            dataset,
-            train_size=dataset_split_config.training,
-            random_state=dataset_split_config.random_seed
-        )
-
-        testing_dataset = testing_and_validation_dataset
-        validation_dataset = None
-
-        if dataset_split_config.validation:
-            testing_dataset, validation_dataset = __split_testing_validation_dataset(dataset_split_config, testing_and_validation_dataset)
-
+        dataset_splits = DatasetSplits.from_labels(dataset, split_dataset_indices(dataset, config))
         logger.info("Original dataset split into datasets:")
-        logger.info(f"\tTraining ({training_dataset.shape[0]} rows)")
-        logger.info(f"\tTesting ({testing_dataset.shape[0]} rows)")
-        if validation_dataset is not None:
-            logger.info(f"\tValidation ({validation_dataset.shape[0]} rows)")
-
-        dataset_splits = DatasetSplits(training_dataset=training_dataset,
-                                       testing_dataset=testing_dataset,
-                                       validation_dataset=validation_dataset)
-        save_dataset_splits(dataset_splits, config.working_directory_path, "dataset_splits")
+        log_dataset_splits(dataset_splits)
+        save_dataset_splits(dataset_splits, config.working_directory_path)
         logger.info("Dataset splitting finished.")
         return dataset_splits
     except Exception as exception:
@@ -45,22 +30,105 @@ def split_training_testing_validation_datasets(dataset: pd.DataFrame, config: Da
         raise
 
 
+def log_dataset_splits(dataset_splits: DatasetSplits) -> None:
+    logger.info(f"\tTraining ({len(dataset_splits.training_indices)} rows)")
+    logger.info(f"\tTesting ({len(dataset_splits.testing_indices)} rows)")
+    if dataset_splits.validation_indices is not None:
+        logger.info(f"\tValidation ({len(dataset_splits.validation_indices)} rows)")
+
+
+def split_dataset_indices(dataset: pd.DataFrame, config: DatasetConfig) -> Dict[str, Optional[np.ndarray]]:
+    __validate_dataset_split_configuration(config.dataset_split_config)
+    cache_key = get_preprocessing_cache_key(config, "dataset_splitting")
+    split_indices = preprocessing_cache.get(cache_key)
+    if split_indices is None:
+        training_indices, testing_indices, validation_indices = __split_dataset(dataset.index.to_numpy(), config.dataset_split_config)
+        split_indices = {
+            "training": training_indices,
+            "testing": testing_indices,
+            "validation": validation_indices
+        }
+        preprocessing_cache.put(cache_key, split_indices)
+    return split_indices
+
+
+def split_dataset_folds(dataset: pd.DataFrame, config: DatasetConfig) -> List[Dict[str, np.ndarray]]:
+    cross_validation_config = config.training_config.cross_validation
+    __validate_cross_validation_configuration(config)
+    cache_key = fingerprint("cross_validation_folds", get_preprocessing_cache_key(config, "dataset_splitting"), cross_validation_config.model_dump(mode="json"))
+    fold_indices = preprocessing_cache.get(cache_key)
+    if fold_indices is None:
+        if cross_validation_config.type == CrossValidationType.STRATIFIED_KFOLD:
+            target_name = next(column.name for column in config.columns if column.target)
+            splitter = StratifiedKFold(n_splits=cross_validation_config.folds, shuffle=True, random_state=config.dataset_split_config.random_seed)
+            folds = splitter.split(dataset.index, dataset[target_name].astype(str))
+        else:
+            splitter = KFold(n_splits=cross_validation_config.folds, shuffle=True, random_state=config.dataset_split_config.random_seed)
+            folds = splitter.split(dataset.index)
+        fold_indices = [{"training": dataset.index.to_numpy()[training_positions], "testing": dataset.index.to_numpy()[testing_positions]}
+                        for training_positions, testing_positions in folds]
+        preprocessing_cache.put(cache_key, fold_indices)
+    return fold_indices
+
+
+def split_chunk_numbers(chunks_count: int, config: DatasetConfig) -> Dict[str, Optional[np.ndarray]]:
+    __validate_dataset_split_configuration(config.dataset_split_config)
+    if chunks_count < 2:
+        raise Exception(f"At least 2 chunks are needed to hold out testing chunks, got {chunks_count}. Use a smaller chunk size.")
+    training_chunks, testing_chunks, validation_chunks = __split_dataset(np.arange(chunks_count), config.dataset_split_config)
+    logger.info(f"\tChunks split into training {sorted(training_chunks.tolist())}, testing {sorted(testing_chunks.tolist())}"
+                f"{f', validation {sorted(validation_chunks.tolist())}' if validation_chunks is not None else ''}")
+    return {
+        "training": training_chunks,
+        "testing": testing_chunks,
+        "validation": validation_chunks
+    }
+
+
+def __split_dataset(dataset_indices: np.ndarray, dataset_split_config: DatasetSplitConfig) -> Tuple[np.ndarray, np.ndarray, Optional[np.ndarray]]:
+    training_indices, testing_and_validation_indices = train_test_split(
+        dataset_indices,
+        train_size=dataset_split_config.training,
+        random_state=dataset_split_config.random_seed
+    )
+
+    testing_indices = testing_and_validation_indices
+    validation_indices = None
+
+    if dataset_split_config.validation:
+        testing_indices, validation_indices = __split_testing_validation_dataset(dataset_split_config, testing_and_validation_indices)
+    return training_indices, testing_indices, validation_indices
+
+
 def __print_dataset_split_configuration_info(dataset_split_config: DatasetSplitConfig) -> None:
     logger.info(f"\tTraining: {dataset_split_config.training * 100}%")
     logger.info(f"\tTesting: {dataset_split_config.testing * 100}%")
     logger.info(f"\tValidation: {dataset_split_config.validation * 100}%")
     logger.info(f"\tRandom Seed: {dataset_split_config.random_seed}")
 
+
+def __validate_dataset_split_configuration(dataset_split_config: DatasetSplitConfig) -> None:
     total = dataset_split_config.training + dataset_split_config.testing + dataset_split_config.validation
     if total != 1:
         raise Exception("The percentage split of the training, testing and validation datasets must add up to 100%")
 
 
-def __split_testing_validation_dataset(dataset_split_config: DatasetSplitConfig, testing_and_validation_dataset: pd.DataFrame) -> Tuple[pd.DataFrame, pd.DataFrame]:
+def __validate_cross_validation_configuration(config: DatasetConfig) -> None:
+    cross_validation_config = config.training_config.cross_validation
+    if cross_validation_config.folds < 2:
+        raise Exception(f"Cross validation needs at least 2 folds, got {cross_validation_config.folds}")
+    if cross_validation_config.type == CrossValidationType.STRATIFIED_KFOLD:
+        if config.problem_type != ProblemType.CLASSIFICATION:
+            raise Exception("Stratified k-fold cross validation is only supported for classification problems")
+        if not any(column.target for column in config.columns):
+            raise Exception("Stratified k-fold cross validation needs a target column")
+
+
+def __split_testing_validation_dataset(dataset_split_config: DatasetSplitConfig, testing_and_validation_indices: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
     validation_relative_fraction = dataset_split_config.validation / (dataset_split_config.testing + dataset_split_config.validation)
-    testing_dataset, validation_dataset = train_test_split(
-        testing_and_validation_dataset,
+    testing_indices, validation_indices = train_test_split(
+        testing_and_validation_indices,
         test_size=validation_relative_fraction,
         random_state=dataset_split_config.random_seed
     )
-    return testing_dataset, validation_dataset
+    return testing_indices, validation_indices
@@ -0,0 +1,79 @@
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+
+from configurations.constants import LINE_BREAK
+from configurations.env_variables import SCALED_FEATURES_AS_FLOAT32
+from helpers.logger import logger
+from models.enums import FeatureType
+from models.models import DatasetConfig, DatasetSplits, EncodingConfig, BinaryOneHotEncodingConfig, MultiOneHotEncodingConfig, OrdinalEncodingConfig
+
+BYTES_IN_MB = 1024 ** 2
+
+
+def compact_dataset_splits(dataset_splits: DatasetSplits, config: DatasetConfig, encodings_config: List[EncodingConfig],
+                           scaled_features_as_float32: bool = SCALED_FEATURES_AS_FLOAT32) -> None:
+    try:
+        logger.info(LINE_BREAK)
+        logger.info("Compact feature dtypes")
+        compact_dtypes = get_compact_dtypes(config, encodings_config, scaled_features_as_float32)
+        for dtype in sorted(set(compact_dtypes.values()), key=str):
+            logger.info(f"\t{dtype}: {[column_name for column_name, column_dtype in compact_dtypes.items() if column_dtype == dtype]}")
+        memory_before = __get_memory_usage_mb(dataset_splits.dataset)
+        dataset_splits.dataset = compact_dataset(dataset_splits.dataset, compact_dtypes)
+        memory_after = __get_memory_usage_mb(dataset_splits.dataset)
+        logger.info(f"\tMemory usage of the dataset shared by the splits: {memory_before:.2f} MB before, {memory_after:.2f} MB after compaction "
+                    f"({1 - memory_after / memory_before if memory_before else 0:.1%} saved)")
+    except Exception as exception:
+        logger.error(f"Error while compacting feature dtypes. Exception: {str(exception)}")
+        raise
+
+
+def get_compact_dtypes(config: DatasetConfig, encodings_config: List[EncodingConfig], scaled_features_as_float32: bool) -> Dict[str, np.dtype]:
+    target_names = [column.name for column in config.columns if column.target]
+    compact_dtypes = dict()
+    for encoding_config in encodings_config:
+        if encoding_config.original_feature_name in target_names:
+            continue
+        if isinstance(encoding_config, BinaryOneHotEncodingConfig):
+            compact_dtypes[encoding_config.renamed_feature_name] = np.dtype(np.uint8)
+        elif isinstance(encoding_config, MultiOneHotEncodingConfig) and not encoding_config.sparse:
+            compact_dtypes.update({resulting_column: np.dtype(np.uint8) for resulting_column in encoding_config.resulting_columns})
+        elif isinstance(encoding_config, OrdinalEncodingConfig) and __has_integer_codes(encoding_config.mappings):
+            codes = list(encoding_config.mappings.values())
+            compact_dtypes[encoding_config.original_feature_name] = np.result_type(np.min_scalar_type(min(codes)), np.min_scalar_type(max(codes)))
+    if scaled_features_as_float32:
+        compact_dtypes.update({column.name: np.dtype(np.float32) for column in config.columns
+                               if column.type == FeatureType.CONTINUOUS and column.scale is not None and not column.target})
+    return compact_dtypes
+
+
+def compact_dataset(dataset: pd.DataFrame, compact_dtypes: Dict[str, np.dtype]) -> pd.DataFrame:
+    column_dtypes = dict()
+    for column_name, dtype in compact_dtypes.items():
+        if column_name not in dataset.columns or dataset[column_name].dtype == dtype:
+            continue
+        if dtype.kind in "iu" and not __fits_integer_dtype(dataset[column_name], dtype):
+            logger.warning(f"\tColumn '{column_name}' has missing or out of range values, keeping dtype '{dataset[column_name].dtype}'")
+            continue
+        column_dtypes[column_name] = dtype
+    return dataset.astype(column_dtypes) if column_dtypes else dataset
+
+
+def __has_integer_codes(mappings: dict) -> bool:
+    return bool(mappings) and all(isinstance(code, (int, np.integer)) and not isinstance(code, bool) for code in mappings.values())
+
+
+def __fits_integer_dtype(column: pd.Series, dtype: np.dtype) -> bool:
+    values = column.to_numpy()
+    if values.dtype == bool:
+        return True
+    if not np.issubdtype(values.dtype, np.number) or np.isnan(values.astype(np.float64)).any():
+        return False
+    dtype_info = np.iinfo(dtype)
+    return bool(len(values) == 0 or (np.all(np.mod(values, 1) == 0) and values.min() >= dtype_info.min and values.max() <= dtype_info.max))
+
+
+def __get_memory_usage_mb(dataset: pd.DataFrame) -> float:
+    return dataset.memory_usage(index=False, deep=True).sum() / BYTES_IN_MB
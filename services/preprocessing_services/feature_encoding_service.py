@@ -2,102 +2,199 @@ import json
 from pathlib import Path
 from typing import List, Union
 
+import numpy as np
 import pandas as pd
+from scipy import sparse
 
-from configurations.constants import LINE_BREAK, ENCODINGS_CONFIG_FILE
-from helpers.functions import save_intermediary_dataset
+from configurations.constants import LINE_BREAK, ENCODINGS_CONFIG_FILE, DEFAULT_HASH_BUCKETS
+from helpers.artifact_cache import preprocessing_cache
+from helpers.artifact_writer import artifact_writer
+from helpers.functions import save_intermediary_dataset, write_json, read_json, get_preprocessing_cache_key
 from helpers.logger import logger
 from models.models import DatasetConfig, ColumnConfig, BinaryOneHotEncodingConfig, MultiOneHotEncodingConfig, \
-    OrdinalEncodingConfig, EncodingConfig
+    OrdinalEncodingConfig, EncodingConfig, HashingEncodingConfig
 from models.enums import FeatureType, CategoricalEncodingType
 
 
-def encode_categorical_features(dataset: pd.DataFrame, config: DatasetConfig) -> None:
+def encode_categorical_features(dataset: pd.DataFrame, config: DatasetConfig) -> List[EncodingConfig]:
     try:
         logger.info(LINE_BREAK)
         logger.info("Encode categorical features")
-        encoded_features = list()
-        skipped_features = list()
-        encodings_config = list()
-        for feature in config.columns:
-            if feature.type != FeatureType.CATEGORICAL:
-                continue
-            encoding_config = __encode_feature(dataset, feature)
-            if encoding_config:
-                encoded_features.append(feature.name)
-                encodings_config.append(encoding_config)
-            else:
-                skipped_features.append(feature.name)
+        encodings_config = fit_encodings_config(dataset, config)
+        for encoding_config in encodings_config:
+            apply_encoding_config(dataset, encoding_config)
+        encoded_features = [encoding_config.original_feature_name for encoding_config in encodings_config]
+        skipped_features = [feature.name for feature in config.columns if feature.type == FeatureType.CATEGORICAL and feature.name not in encoded_features]
         if encoded_features:
             logger.info(f"Categorical features '{encoded_features}' encoded successfully")
         if skipped_features:
             logger.info(f"Skipped encodings for categorical features '{skipped_features}'")
-        __save_encodings_config(config.working_directory_path, encodings_config)
         save_intermediary_dataset(dataset, config.working_directory_path, "categorical_features_encoded")
+        return encodings_config
     except Exception as exception:
         logger.error(f"Error while encoding categorical features. Exception: {str(exception)}")
         raise
 
 
-def __encode_feature(dataset: pd.DataFrame, feature: ColumnConfig) -> Union[EncodingConfig, None]:
+def fit_encodings_config(dataset: pd.DataFrame, config: DatasetConfig) -> List[EncodingConfig]:
+    cache_key = get_preprocessing_cache_key(config, "categorical_encoding")
+    encodings_config = preprocessing_cache.get(cache_key)
+    if encodings_config is None:
+        encodings_config = __fit_features_encodings(dataset, config)
+        preprocessing_cache.put(cache_key, encodings_config)
+    __save_encodings_config(config.working_directory_path, encodings_config)
+    return encodings_config
+
+
+def load_encodings_config(encodings_config_file_path: Path) -> List[EncodingConfig]:
+    encoding_config_types = {
+        CategoricalEncodingType.BINARY_ONEHOT.value: BinaryOneHotEncodingConfig,
+        CategoricalEncodingType.MULTI_ONEHOT.value: MultiOneHotEncodingConfig,
+        CategoricalEncodingType.ORDINAL.value: OrdinalEncodingConfig,
+        CategoricalEncodingType.HASHING.value: HashingEncodingConfig,
+    }
+    encodings_config_json = read_json(encodings_config_file_path)
+    return [encoding_config_types[encoding_config["encoding_type"]](**encoding_config) for encoding_config in encodings_config_json]
+
+
+def apply_encoding_config(dataset: pd.DataFrame, encoding_config: EncodingConfig) -> None:
+    feature_name = encoding_config.original_feature_name
+    if isinstance(encoding_config, BinaryOneHotEncodingConfig):
+        dataset[feature_name] = __map_categories(dataset[feature_name], encoding_config.mappings)
+        dataset.rename(columns={feature_name: encoding_config.renamed_feature_name}, inplace=True)
+    elif isinstance(encoding_config, MultiOneHotEncodingConfig) and encoding_config.sparse:
+        category_codes = get_category_codes(dataset[feature_name], pd.Index(get_multi_onehot_categories(encoding_config)))
+        dataset[feature_name] = pd.Categorical.from_codes(category_codes, categories=encoding_config.resulting_columns)
+    elif isinstance(encoding_config, HashingEncodingConfig):
+        hash_codes = get_hash_codes(dataset[feature_name], encoding_config.hash_buckets)
+        dataset[feature_name] = pd.Categorical.from_codes(hash_codes, categories=get_hashing_feature_names(encoding_config))
+    elif isinstance(encoding_config, MultiOneHotEncodingConfig):
+        one_hot = pd.get_dummies(dataset[feature_name], prefix=feature_name)
+        one_hot = one_hot.reindex(columns=encoding_config.resulting_columns, fill_value=False)
+        dataset.drop(columns=[feature_name], inplace=True)
+        dataset[one_hot.columns] = one_hot
+    elif isinstance(encoding_config, OrdinalEncodingConfig):
+        dataset[feature_name] = __map_categories(dataset[feature_name], encoding_config.mappings)
+    logger.debug(f"\tCategorical feature '{feature_name}' encoded using stored '{encoding_config.encoding_type.value}' encoding.")
+
+
+def get_multi_onehot_categories(encoding_config: MultiOneHotEncodingConfig) -> List[str]:
+    if encoding_config.categories is not None:
+        return encoding_config.categories
+    return [resulting_column[len(encoding_config.original_feature_name) + 1:] for resulting_column in encoding_config.resulting_columns]
+
+
+def get_category_codes(feature: pd.Series, categories: pd.Index, missing_code: int = -1) -> np.ndarray:
+    codes, unique_values = pd.factorize(feature)
+    unique_codes = categories.get_indexer(pd.Index(unique_values).astype(str))
+    return np.append(unique_codes, missing_code)[codes]
+
+
+def get_hash_codes(feature: pd.Series, hash_buckets: int, missing_code: int = -1) -> np.ndarray:
+    codes, unique_values = pd.factorize(feature)
+    unique_hashes = pd.util.hash_array(pd.Index(unique_values).astype(str).to_numpy(dtype=object), categorize=False)
+    return np.append((unique_hashes % np.uint64(hash_buckets)).astype(np.intp), missing_code)[codes]
+
+
+def get_hashing_feature_names(encoding_config: HashingEncodingConfig) -> List[str]:
+    return [f"{encoding_config.original_feature_name}_hash_{bucket}" for bucket in range(encoding_config.hash_buckets)]
+
+
+def to_one_hot_matrix(category_codes: np.ndarray, categories_count: int) -> sparse.csr_matrix:
+    known_categories = category_codes >= 0
+    row_pointers = np.concatenate([[0], np.cumsum(known_categories)])
+    return sparse.csr_matrix((np.ones(known_categories.sum(), dtype=bool), category_codes[known_categories], row_pointers),
+                             shape=(len(category_codes), categories_count))
+
+
+def __fit_features_encodings(dataset: pd.DataFrame, config: DatasetConfig) -> List[EncodingConfig]:
+    encodings_config = list()
+    for feature in config.columns:
+        if feature.type != FeatureType.CATEGORICAL:
+            continue
+        encoding_config = __fit_feature_encoding(dataset[feature.name], feature)
+        if encoding_config:
+            encodings_config.append(encoding_config)
+    return encodings_config
+
+
+def __fit_feature_encoding(feature: pd.Series, feature_config: ColumnConfig) -> Union[EncodingConfig, None]:
     try:
-        if feature.encode == CategoricalEncodingType.BINARY_ONEHOT:
-            return __binary_onehot_encode_feature(dataset, feature.name)
-        if feature.encode == CategoricalEncodingType.MULTI_ONEHOT:
-            return __multi_onehot_encode_feature(dataset, feature.name)
-        if feature.encode == CategoricalEncodingType.ORDINAL:
-            category_mapping = feature.encoding_values
-            return __ordinal_encode_feature(dataset, feature.name, category_mapping)
-        logger.warning(f"\tSkipping encoding for categorical feature '{feature.name}' because no encoding type is specified.")
+        if feature_config.encode == CategoricalEncodingType.BINARY_ONEHOT:
+            return __fit_binary_onehot_encoding(feature)
+        if feature_config.encode == CategoricalEncodingType.MULTI_ONEHOT:
+            return __fit_multi_onehot_encoding(feature, feature_config.sparse)
+        if feature_config.encode == CategoricalEncodingType.ORDINAL:
+            category_mapping = feature_config.encoding_values
+            return __fit_ordinal_encoding(feature, category_mapping)
+        if feature_config.encode == CategoricalEncodingType.HASHING:
+            return __fit_hashing_encoding(feature, feature_config.hash_buckets or DEFAULT_HASH_BUCKETS)
+        logger.warning(f"\tSkipping encoding for categorical feature '{feature_config.name}' because no encoding type is specified.")
         return None
     except Exception as exception:
-        logger.error(f"Error while encoding categorical feature '{feature.name}' using '{feature.encode.value}' method. Exception: {str(exception)}")
+        logger.error(f"Error while encoding categorical feature '{feature_config.name}' using '{feature_config.encode.value}' method. Exception: {str(exception)}")
         raise
 
 
-def __binary_onehot_encode_feature(dataset: pd.DataFrame, feature_name: str) -> BinaryOneHotEncodingConfig:
-    logger.info(f"\tEncoding categorical feature '{feature_name}' using binary onehot encoding.")
-    unique_vals = dataset[feature_name].dropna().unique().tolist()
+def __fit_binary_onehot_encoding(feature: pd.Series) -> BinaryOneHotEncodingConfig:
+    unique_vals = feature.dropna().unique().tolist()
     unique_vals = sorted(unique_vals, key=lambda x: str(x))
     mappings = {unique_vals[0]: 0, unique_vals[1]: 1}
-    renamed_column = f"{feature_name}_{unique_vals[1]}"
-    dataset[feature_name] = dataset[feature_name].map(mappings)
-    dataset.rename(columns={feature_name: renamed_column}, inplace=True)
-    logger.info(f"\tCategorical feature '{feature_name}' encoded successfully using binary onehot encoding and renamed to '{renamed_column}'.")
-    encoding_config = BinaryOneHotEncodingConfig(original_feature_name=feature_name,
+    renamed_column = f"{feature.name}_{unique_vals[1]}"
+    logger.info(f"\tCategorical feature '{feature.name}' fitted for binary onehot encoding and renamed to '{renamed_column}'.")
+    encoding_config = BinaryOneHotEncodingConfig(original_feature_name=feature.name,
                                                  renamed_feature_name=renamed_column,
                                                  mappings=mappings)
     return encoding_config
 
 
-def __multi_onehot_encode_feature(dataset: pd.DataFrame, feature_name: str) -> MultiOneHotEncodingConfig:
-    logger.info(f"\tEncoding categorical feature '{feature_name}' using multi onehot encoding.")
-    one_hot = pd.get_dummies(dataset[feature_name], prefix=feature_name)
-    dataset.drop(columns=[feature_name], inplace=True)
-    dataset[one_hot.columns] = one_hot
-    logger.info(f"\tCategorical feature '{feature_name}' encoded successfully using multi onehot encoding.")
-    resulting_columns = one_hot.columns.tolist()
-    encoding_config = MultiOneHotEncodingConfig(original_feature_name=feature_name,
-                                                resulting_columns=resulting_columns)
+def __fit_multi_onehot_encoding(feature: pd.Series, sparse_output: bool) -> MultiOneHotEncodingConfig:
+    categories = feature.cat.categories if isinstance(feature.dtype, pd.CategoricalDtype) else pd.Categorical(feature.dropna().unique()).categories
+    resulting_columns = [f"{feature.name}_{category}" for category in categories]
+    logger.info(f"\tCategorical feature '{feature.name}' fitted for {'sparse ' if sparse_output else ''}multi onehot encoding into {len(resulting_columns)} columns.")
+    encoding_config = MultiOneHotEncodingConfig(original_feature_name=feature.name,
+                                                resulting_columns=resulting_columns,
+                                                categories=[str(category) for category in categories],
+                                                sparse=sparse_output)
     return encoding_config
 
 
-def __ordinal_encode_feature(dataset: pd.DataFrame, feature_name: str, category_mapping: dict) -> OrdinalEncodingConfig:
-    logger.info(f"\tEncoding categorical feature '{feature_name}' using ordinal encoding with mapping: '{category_mapping}'.")
-    unique_vals = dataset[feature_name].dropna().unique().tolist()
+def __fit_ordinal_encoding(feature: pd.Series, category_mapping: dict) -> OrdinalEncodingConfig:
+    unique_vals = feature.dropna().unique().tolist()
     missing_mappings = [value for value in unique_vals if value not in category_mapping.keys()]
     if missing_mappings:
         raise Exception(f"Missing mappings for ordinal encoding values: '{missing_mappings}'")
-    dataset[feature_name] = dataset[feature_name].map(category_mapping)
-    logger.info(f"\tCategorical feature '{feature_name}' encoded successfully using ordinal encoding with mapping: '{category_mapping}'.")
-    encoding_config = OrdinalEncodingConfig(original_feature_name=feature_name,
+    logger.info(f"\tCategorical feature '{feature.name}' fitted for ordinal encoding with mapping: '{category_mapping}'.")
+    encoding_config = OrdinalEncodingConfig(original_feature_name=feature.name,
                                             mappings=category_mapping)
     return encoding_config
 
 
+def __fit_hashing_encoding(feature: pd.Series, hash_buckets: int) -> HashingEncodingConfig:
+    if hash_buckets < 1:
+        raise ValueError(f"Number of hash buckets must be positive, got '{hash_buckets}'")
+    logger.info(f"\tCategorical feature '{feature.name}' fitted for hashing encoding into {hash_buckets} buckets.")
+    encoding_config = HashingEncodingConfig(original_feature_name=feature.name,
+                                            hash_buckets=hash_buckets)
+    return encoding_config
+
+
+def __map_categories(feature: pd.Series, mappings: dict) -> pd.Series:
+    if all(isinstance(value, str) for value in mappings) and not __has_string_values(feature):
+        feature = feature.astype(str)
+    mapped_feature = feature.map(mappings)
+    if isinstance(mapped_feature.dtype, pd.CategoricalDtype):
+        mapped_feature = pd.Series(np.asarray(mapped_feature), index=mapped_feature.index, name=mapped_feature.name)
+    return mapped_feature
+
+
+def __has_string_values(feature: pd.Series) -> bool:
+    values_dtype = feature.cat.categories.dtype if isinstance(feature.dtype, pd.CategoricalDtype) else feature.dtype
+    return pd.api.types.is_object_dtype(values_dtype) or pd.api.types.is_string_dtype(values_dtype)
+
+
 def __save_encodings_config(working_directory_path: Path, encodings_config: list) -> None:
     encodings_config_file_path = working_directory_path / ENCODINGS_CONFIG_FILE
     encodings_config_json = [json.loads(config.json()) for config in encodings_config]
-    with open(encodings_config_file_path, 'w') as f:
-        json.dump(encodings_config_json, f, indent=4)
+    artifact_writer.submit(encodings_config_file_path, lambda path: write_json(path, encodings_config_json))
     logger.info(f"Encoding configurations saved at '{encodings_config_file_path}'")
@@ -1,13 +1,15 @@
 import json
 from pathlib import Path
-from typing import Tuple, List, Union
+from typing import Tuple, List, Union, Iterable
 
 import joblib
 import pandas as pd
 from sklearn.preprocessing import StandardScaler, MinMaxScaler
 
 from configurations.constants import LINE_BREAK, SCALERS_CONFIG_FILE, SCALERS_FOLDER
-from helpers.functions import save_dataset_splits
+from helpers.artifact_cache import preprocessing_cache
+from helpers.artifact_writer import artifact_writer
+from helpers.functions import save_intermediary_dataset, write_json, read_json, get_preprocessing_cache_key
 from helpers.logger import logger
 from models.enums import FeatureType, ContinuousFeatureScalingType
 from models.models import DatasetConfig, DatasetSplits, ColumnConfig, ScalerConfig
@@ -18,33 +20,59 @@ def scale_continuous_features(dataset_splits: DatasetSplits, config: DatasetConf
         logger.info(LINE_BREAK)
         logger.info("Scale continuous features")
 
-        all_continuous_features = [feature for feature in config.columns if feature.type == FeatureType.CONTINUOUS]
-
-        all_continuous_features_names = [feature.name for feature in all_continuous_features]
-        standard_scaler_features_names = [feature.name for feature in all_continuous_features if feature.scale == ContinuousFeatureScalingType.STANDARD]
-        minmax_scaler_features_names = [feature.name for feature in all_continuous_features if feature.scale == ContinuousFeatureScalingType.MINMAX]
+        continuous_features_names = [feature.name for feature in config.columns if feature.type == FeatureType.CONTINUOUS]
+        fitted_scalers = fit_scalers(dataset_splits.get_split("training", continuous_features_names), config)
+        for _, feature_names, scaler in fitted_scalers:
+            __apply_scaler_to_datasets(dataset_splits, scaler, feature_names)
+        save_intermediary_dataset(dataset_splits.dataset, config.working_directory_path, "continuous_features_scaled")
+    except Exception as exception:
+        logger.error(f"Error while scaling continuous features. Exception: {str(exception)}")
+        raise
 
-        __print_scaling_configurations(all_continuous_features_names, standard_scaler_features_names, minmax_scaler_features_names)
 
-        scaler_configs = list()
+def fit_scalers(training_dataset: pd.DataFrame, config: DatasetConfig) -> List[Tuple[ContinuousFeatureScalingType, List[str], Union[StandardScaler, MinMaxScaler]]]:
+    standard_scaler_features_names, minmax_scaler_features_names = __get_scaling_features_names(config)
 
+    cache_key = get_preprocessing_cache_key(config, "feature_scaling")
+    fitted_scalers = preprocessing_cache.get(cache_key)
+    if fitted_scalers is None:
+        fitted_scalers = list()
         if standard_scaler_features_names:
-            standard_scaler = __create_standard_scaler(dataset_splits, standard_scaler_features_names)
-            __apply_scaler_to_datasets(dataset_splits, standard_scaler, standard_scaler_features_names)
-            scaler_config = __save_scaler(config.working_directory_path, ContinuousFeatureScalingType.STANDARD, standard_scaler, standard_scaler_features_names)
-            scaler_configs.append(scaler_config)
-
+            standard_scaler = __create_standard_scaler(training_dataset, standard_scaler_features_names)
+            fitted_scalers.append((ContinuousFeatureScalingType.STANDARD, standard_scaler_features_names, standard_scaler))
         if minmax_scaler_features_names:
-            minmax_scaler = __create_minmax_scaler(dataset_splits, minmax_scaler_features_names)
-            __apply_scaler_to_datasets(dataset_splits, minmax_scaler, minmax_scaler_features_names)
-            scaler_config = __save_scaler(config.working_directory_path, ContinuousFeatureScalingType.MINMAX, minmax_scaler, minmax_scaler_features_names)
-            scaler_configs.append(scaler_config)
+            minmax_scaler = __create_minmax_scaler(training_dataset, minmax_scaler_features_names)
+            fitted_scalers.append((ContinuousFeatureScalingType.MINMAX, minmax_scaler_features_names, minmax_scaler))
+        preprocessing_cache.put(cache_key, fitted_scalers)
+
+    __save_scalers(config.working_directory_path, fitted_scalers)
+    return fitted_scalers
 
-        __save_scaler_configs(config.working_directory_path, scaler_configs)
-        save_dataset_splits(dataset_splits, config.working_directory_path, "continuous_features_scaled")
-    except Exception as exception:
-        logger.error(f"Error while scaling continuous features. Exception: {str(exception)}")
-        raise
+
+def fit_scalers_incrementally(training_chunks: Iterable[pd.DataFrame], config: DatasetConfig) -> List[Tuple[ContinuousFeatureScalingType, List[str], Union[StandardScaler, MinMaxScaler]]]:
+    standard_scaler_features_names, minmax_scaler_features_names = __get_scaling_features_names(config)
+    fitted_scalers = list()
+    if standard_scaler_features_names:
+        fitted_scalers.append((ContinuousFeatureScalingType.STANDARD, standard_scaler_features_names, StandardScaler()))
+    if minmax_scaler_features_names:
+        fitted_scalers.append((ContinuousFeatureScalingType.MINMAX, minmax_scaler_features_names, MinMaxScaler()))
+    logger.info(f"\tFitting scalers chunk by chunk on training chunks: {[scaler_type.value for scaler_type, _, _ in fitted_scalers]}")
+    for training_chunk in training_chunks:
+        for _, feature_names, scaler in fitted_scalers:
+            scaler.partial_fit(training_chunk[feature_names])
+    __save_scalers(config.working_directory_path, fitted_scalers)
+    return fitted_scalers
+
+
+def __get_scaling_features_names(config: DatasetConfig) -> Tuple[List[str], List[str]]:
+    all_continuous_features = [feature for feature in config.columns if feature.type == FeatureType.CONTINUOUS]
+
+    all_continuous_features_names = [feature.name for feature in all_continuous_features]
+    standard_scaler_features_names = [feature.name for feature in all_continuous_features if feature.scale == ContinuousFeatureScalingType.STANDARD]
+    minmax_scaler_features_names = [feature.name for feature in all_continuous_features if feature.scale == ContinuousFeatureScalingType.MINMAX]
+
+    __print_scaling_configurations(all_continuous_features_names, standard_scaler_features_names, minmax_scaler_features_names)
+    return standard_scaler_features_names, minmax_scaler_features_names
 
 
 def __print_scaling_configurations(all_continuous_features_names: list[str],
@@ -60,42 +88,50 @@ def __print_scaling_configurations(all_continuous_features_names: list[str],
     logger.info(f"\tNo scaling features {len(no_scaler_feature_names)}: {no_scaler_feature_names}")
 
 
-def __create_standard_scaler(dataset_splits: DatasetSplits, columns: List[str]) -> StandardScaler:
+def __create_standard_scaler(training_dataset: pd.DataFrame, columns: List[str]) -> StandardScaler:
     logger.info(f"\tFitting Standard Scaler on training dataset on features: '{columns}'")
     scaler = StandardScaler()
-    scaler.fit(dataset_splits.training_dataset[columns])
+    scaler.fit(training_dataset[columns])
     logger.info(f"\tStandard Scaler fitted successfully on training dataset on features: '{columns}'")
     return scaler
 
 
-def __create_minmax_scaler(dataset_splits: DatasetSplits, columns: List[str]) -> MinMaxScaler:
+def __create_minmax_scaler(training_dataset: pd.DataFrame, columns: List[str]) -> MinMaxScaler:
     logger.info(f"\tFitting MinMax Scaler on training dataset on features: '{columns}'")
     scaler = MinMaxScaler()
-    scaler.fit(dataset_splits.training_dataset[columns])
+    scaler.fit(training_dataset[columns])
     logger.info(f"\tMinMax Scaler fitted successfully on training dataset on features: '{columns}'")
     return scaler
 
 
+def apply_scaler(dataset: pd.DataFrame, scaler: Union[StandardScaler, MinMaxScaler], feature_names: List[str]) -> None:
+    dataset[feature_names] = scaler.transform(dataset[feature_names])
+
+
+def load_scalers(working_directory_path: Path) -> List[Tuple[ScalerConfig, Union[StandardScaler, MinMaxScaler]]]:
+    scalers = list()
+    for scaler_config_json in read_json(working_directory_path / SCALERS_CONFIG_FILE):
+        scaler_config = ScalerConfig(**scaler_config_json)
+        scaler_path = working_directory_path / SCALERS_FOLDER / Path(scaler_config.file_path).name
+        scalers.append((scaler_config, joblib.load(scaler_path)))
+    return scalers
+
+
 def __apply_scaler_to_datasets(dataset_splits: DatasetSplits, scaler: Union[StandardScaler, MinMaxScaler], feature_names: List[str]) -> None:
     logger.info(f"\tApplying scaler to '{feature_names}'")
-    dataset_splits.training_dataset[feature_names] = \
-        scaler.transform(dataset_splits.training_dataset[feature_names])
-    logger.info(f"\t\tApplied to training dataset")
+    apply_scaler(dataset_splits.dataset, scaler, feature_names)
+    logger.info(f"\t\tApplied to the {dataset_splits.dataset.shape[0]} rows shared by the training, testing and validation datasets")
 
-    dataset_splits.testing_dataset[feature_names] = \
-        scaler.transform(dataset_splits.testing_dataset[feature_names])
-    logger.info(f"\t\tApplied to testing dataset")
 
-    if dataset_splits.validation_dataset is not None:
-        dataset_splits.validation_dataset[feature_names] = \
-            scaler.transform(dataset_splits.validation_dataset[feature_names])
-        logger.info(f"\t\tApplied to validation dataset")
+def __save_scalers(working_directory_path: Path, fitted_scalers: List[Tuple[ContinuousFeatureScalingType, List[str], Union[StandardScaler, MinMaxScaler]]]) -> None:
+    scaler_configs = [__save_scaler(working_directory_path, scaler_type, scaler, feature_names) for scaler_type, feature_names, scaler in fitted_scalers]
+    __save_scaler_configs(working_directory_path, scaler_configs)
 
 
 def __save_scaler(working_directory_path: Path, scaler_type: ContinuousFeatureScalingType, scaler: Union[StandardScaler, MinMaxScaler], feature_names: List[str]) -> ScalerConfig:
     logger.info(f"\tSaving scaler type '{scaler_type.value}'")
     scaler_path = working_directory_path / SCALERS_FOLDER / f"{scaler_type.value}.pkl"
-    joblib.dump(scaler, scaler_path)
+    artifact_writer.submit(scaler_path, lambda path: joblib.dump(scaler, path))
     scaler_config = ScalerConfig(scaler_type=scaler_type, feature_names=feature_names, file_path=str(scaler_path))
     logger.info(f"\tScaler type '{scaler_type.value}' saved successfully at '{scaler_path}'.")
     return scaler_config
@@ -104,6 +140,5 @@ def __save_scaler(working_directory_path: Path, scaler_type: ContinuousFeatureSc
 def __save_scaler_configs(working_directory_path: Path, scaler_configs: list) -> None:
     scalers_config_file_path = working_directory_path / SCALERS_CONFIG_FILE
     scalers_config_json = [json.loads(config.json()) for config in scaler_configs]
-    with open(scalers_config_file_path, 'w') as f:
-        json.dump(scalers_config_json, f, indent=4)
+    artifact_writer.submit(scalers_config_file_path, lambda path: write_json(path, scalers_config_json))
     logger.info(f"Scalers configurations saved at '{scalers_config_file_path}'")
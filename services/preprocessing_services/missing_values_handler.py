@@ -1,57 +1,94 @@
+from pathlib import Path
 from typing import Tuple, Dict
 
 import pandas as pd
 
-from configurations.constants import LINE_BREAK
-from helpers.functions import calculate_statistic, save_intermediary_dataset
+from configurations.constants import LINE_BREAK, IMPUTATION_STATISTICS_FILE
+from helpers.artifact_cache import preprocessing_cache, fingerprint
+from helpers.artifact_writer import artifact_writer
+from helpers.functions import save_intermediary_dataset, get_preprocessing_cache_key, write_json
 from helpers.logger import logger
-from models.models import DatasetConfig, ColumnConfig
+from models.models import DatasetConfig, ColumnConfig, ColumnStatistics
+from services.preprocessing_services.column_statistics_service import compute_column_statistics, get_imputation_value, save_column_statistics
 
 
-def handle_missing_values(dataset: pd.DataFrame, config: DatasetConfig) -> None:
+def handle_missing_values(dataset: pd.DataFrame, config: DatasetConfig) -> Dict:
     try:
         logger.info(LINE_BREAK)
         logger.info("Handle missing values")
-        missing_values, total_missing_values = __detect_missing_values(dataset)
+        column_statistics = fit_column_statistics(dataset, config)
+        missing_values, total_missing_values = __detect_missing_values(column_statistics)
         if not total_missing_values:
             logger.info("\tNo missing values in dataset")
 
-        for column in config.columns:
-            __handle_missing_value_for_column(dataset, missing_values, column)
+        imputation_statistics = fit_imputation_statistics(config, column_statistics)
+        apply_imputation_statistics(dataset, imputation_statistics, missing_values)
+        for column_name, imputation_value in imputation_statistics.items():
+            if missing_values[column_name]:
+                logger.info(f"\tFilled missing values in column '{column_name}' with value: {imputation_value}")
 
-        missing_values, total_missing_values = __detect_missing_values(dataset)
-        if total_missing_values:
+        if any(missing_values[column_name] and pd.isna(imputation_statistics.get(column_name)) for column_name in missing_values):
             logger.warning("\tMissing values still exist in the dataset.")
-            return
+            return imputation_statistics
         logger.info("Missing values handled successfully")
         save_intermediary_dataset(dataset, config.working_directory_path, "missing_values_handled")
+        return imputation_statistics
     except Exception as exception:
         logger.error(f"Error while handling missing values in dataset. Exception: {str(exception)}")
         raise
 
 
-def __handle_missing_value_for_column(dataset: pd.DataFrame, missing_values: dict, column_config: ColumnConfig) -> None:
-    if not missing_values[column_config.name]:
+def fit_column_statistics(dataset: pd.DataFrame, config: DatasetConfig) -> Dict[str, ColumnStatistics]:
+    cache_key = fingerprint("column_statistics", get_preprocessing_cache_key(config, "missing_values"))
+    column_statistics = preprocessing_cache.get(cache_key)
+    if column_statistics is None:
+        column_statistics = compute_column_statistics([dataset], config.columns)
+        preprocessing_cache.put(cache_key, column_statistics)
+    save_column_statistics(config.working_directory_path, column_statistics)
+    return column_statistics
+
+
+def fit_imputation_statistics(config: DatasetConfig, column_statistics: Dict[str, ColumnStatistics]) -> Dict:
+    imputation_statistics = dict()
+    for column_config in config.columns:
+        __validate_missing_value_method(column_statistics[column_config.name].null_count, column_config)
+        if not column_config.missing:
+            continue
+        logger.info(f"\tUsing {column_config.missing.value} value of column '{column_config.name}' for imputation")
+        imputation_statistics[column_config.name] = get_imputation_value(column_statistics[column_config.name], column_config.missing)
+    __save_imputation_statistics(config.working_directory_path, imputation_statistics)
+    return imputation_statistics
+
+
+def apply_imputation_statistics(dataset: pd.DataFrame, imputation_statistics: Dict, missing_values: Dict = None) -> None:
+    for column_name, imputation_value in imputation_statistics.items():
+        if missing_values is not None and not missing_values.get(column_name):
+            continue
+        with pd.option_context("future.no_silent_downcasting", True):
+            dataset[column_name] = dataset[column_name].fillna(imputation_value)
+
+
+def __validate_missing_value_method(missing_values_count: int, column_config: ColumnConfig) -> None:
+    if not missing_values_count:
         logger.debug(f"\tNo missing values in column '{column_config.name}'")
         return
     if not column_config.missing:
         error_message = f"Missing values for column '{column_config.name}' cannot be handled because the handling method is not specified."
         logger.error(f"\t{error_message}")
         raise Exception(error_message)
-    logger.info(f"\tHandling missing values for column '{column_config.name}' using '{column_config.missing.value}' method")
-    imputation_value = calculate_statistic(dataset[column_config.name], column_config.missing)
-    dataset[column_config.name] = dataset[column_config.name].fillna(imputation_value)
-    logger.info(f"\tFilled missing values in column '{column_config.name}' with {column_config.missing.value} value: {imputation_value}")
 
 
-def __detect_missing_values(dataset: pd.DataFrame) -> Tuple[Dict, int]:
-    missing_values_dict = dict()
-    total_missing_values = 0
-    missing_values = dataset.isnull().sum()
+def __save_imputation_statistics(working_directory_path: Path, imputation_statistics: Dict) -> None:
+    imputation_statistics_file_path = working_directory_path / IMPUTATION_STATISTICS_FILE
+    imputation_statistics_json = dict(imputation_statistics)
+    artifact_writer.submit(imputation_statistics_file_path, lambda path: write_json(path, imputation_statistics_json))
+    logger.info(f"Imputation statistics saved at '{imputation_statistics_file_path}'")
+
+
+def __detect_missing_values(column_statistics: Dict[str, ColumnStatistics]) -> Tuple[Dict, int]:
+    missing_values_dict = {column_name: statistics.null_count for column_name, statistics in column_statistics.items()}
     logger.info("\tMissing values:")
-    for column, missing_value in zip(dataset.columns, missing_values):
-        missing_values_dict[column] = missing_value
-        total_missing_values += missing_value
+    for column, missing_value in missing_values_dict.items():
         logger.info(f"\t\t{column}: {missing_value}")
 
-    return missing_values_dict, total_missing_values
+    return missing_values_dict, sum(missing_values_dict.values())
\ No newline at end of file
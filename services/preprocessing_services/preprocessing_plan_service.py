@@ -0,0 +1,191 @@
+from typing import List, Dict, Tuple, Union, Iterable
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from sklearn.preprocessing import StandardScaler, MinMaxScaler
+
+from helpers.logger import logger
+from models.enums import ContinuousFeatureScalingType
+from models.models import ColumnConfig, EncodingConfig, BinaryOneHotEncodingConfig, MultiOneHotEncodingConfig, \
+    OrdinalEncodingConfig, HashingEncodingConfig
+from services.preprocessing_services.feature_encoding_service import get_category_codes, get_multi_onehot_categories, to_one_hot_matrix, \
+    get_hash_codes, get_hashing_feature_names
+
+
+class CategoricalStep:
+    def __init__(self, column_name: str, categories: List[str], output_indices: np.ndarray, fill_value=None, lookup_values: np.ndarray = None, output_names: List[str] = None):
+        self.column_name = column_name
+        self.categories = pd.Index(categories)
+        self.output_indices = output_indices
+        self.fill_code = self.categories.get_indexer([str(fill_value)])[0] if fill_value is not None else -1
+        self.lookup_values = np.append(lookup_values, np.nan) if lookup_values is not None else None
+        self.output_names = output_names
+
+    def transform(self, dataset: pd.DataFrame, predictors: np.ndarray) -> None:
+        codes = self.transform_codes(dataset)
+        if self.lookup_values is not None:
+            predictors[:, self.output_indices[0]] = self.lookup_values[codes]
+            return
+        predictors[:, self.output_indices] = 0
+        known_rows = np.flatnonzero(codes >= 0)
+        predictors[known_rows, self.output_indices[codes[known_rows]]] = 1
+
+    def transform_codes(self, dataset: pd.DataFrame) -> np.ndarray:
+        return get_category_codes(dataset[self.column_name], self.categories, self.fill_code)
+
+
+class HashingStep:
+    def __init__(self, column_name: str, hash_buckets: int, output_names: List[str], fill_value=None):
+        self.column_name = column_name
+        self.hash_buckets = hash_buckets
+        self.output_names = output_names
+        self.fill_code = get_hash_codes(pd.Series([fill_value]), hash_buckets)[0] if fill_value is not None else -1
+
+    def transform_codes(self, dataset: pd.DataFrame) -> np.ndarray:
+        return get_hash_codes(dataset[self.column_name], self.hash_buckets, self.fill_code)
+
+
+class PreprocessingPlan:
+    def __init__(self, feature_names: List[str], continuous_columns: List[str], continuous_output_indices: np.ndarray,
+                 fill_values: np.ndarray, shifts: np.ndarray, divisors: np.ndarray, multipliers: np.ndarray, offsets: np.ndarray,
+                 categorical_steps: List[CategoricalStep], sparse_steps: List[Union[CategoricalStep, HashingStep]]):
+        self.feature_names = feature_names
+        self.continuous_columns = continuous_columns
+        self.continuous_output_indices = continuous_output_indices
+        self.fill_values = fill_values
+        self.shifts = shifts
+        self.divisors = divisors
+        self.multipliers = multipliers
+        self.offsets = offsets
+        self.categorical_steps = categorical_steps
+        self.sparse_steps = sparse_steps
+        self.dense_feature_names = feature_names[:len(feature_names) - sum(len(step.output_names) for step in sparse_steps)]
+
+    @property
+    def input_columns(self) -> List[str]:
+        return self.continuous_columns + [step.column_name for step in self.categorical_steps + self.sparse_steps]
+
+    def transform(self, dataset: pd.DataFrame) -> Union[np.ndarray, sparse.csr_matrix]:
+        dense_predictors, sparse_codes = self.transform_blocks(dataset)
+        if not sparse_codes:
+            return dense_predictors
+        sparse_predictors = [to_one_hot_matrix(codes, len(sparse_step.output_names)) for sparse_step, codes in zip(self.sparse_steps, sparse_codes)]
+        return sparse.hstack([sparse.csr_matrix(dense_predictors)] + sparse_predictors, format="csr", dtype=np.float64)
+
+    def transform_blocks(self, dataset: pd.DataFrame) -> Tuple[np.ndarray, List[np.ndarray]]:
+        predictors = np.empty((len(dataset), len(self.dense_feature_names)), dtype=np.float64, order="F")
+        if self.continuous_columns:
+            continuous_values = dataset[self.continuous_columns].to_numpy(dtype=np.float64, na_value=np.nan, copy=True)
+            fill_missing_values(continuous_values, self.fill_values)
+            continuous_values -= self.shifts
+            continuous_values /= self.divisors
+            continuous_values *= self.multipliers
+            continuous_values += self.offsets
+            predictors[:, self.continuous_output_indices] = continuous_values
+        for categorical_step in self.categorical_steps:
+            categorical_step.transform(dataset, predictors)
+        return predictors, [sparse_step.transform_codes(dataset) for sparse_step in self.sparse_steps]
+
+
+def compile_preprocessing_plan(columns: List[ColumnConfig], imputation_statistics: Dict, encodings_config: List[EncodingConfig],
+                               fitted_scalers: List[Tuple[ContinuousFeatureScalingType, List[str], Union[StandardScaler, MinMaxScaler]]],
+                               feature_names: List[str]) -> PreprocessingPlan:
+    encodings = {encoding_config.original_feature_name: encoding_config for encoding_config in encodings_config}
+    column_names = {column.name for column in columns}
+    sparse_encodings_config = [encoding_config for encoding_config in encodings_config
+                               if __is_sparse_encoding(encoding_config) and encoding_config.original_feature_name in column_names]
+    sparse_feature_names = [resulting_column for encoding_config in sparse_encodings_config for resulting_column in __get_resulting_columns(encoding_config)]
+    if sparse_feature_names and feature_names[len(feature_names) - len(sparse_feature_names):] != sparse_feature_names:
+        raise Exception("Sparse encoded features must follow all dense features in the expected features")
+    output_indices = {feature_name: index for index, feature_name in enumerate(feature_names[:len(feature_names) - len(sparse_feature_names)])}
+    scaling_parameters = __get_scaling_parameters(fitted_scalers)
+
+    continuous_columns, continuous_output_indices, fill_values, continuous_scaling_parameters = list(), list(), list(), list()
+    categorical_steps, sparse_steps = list(), list()
+    for column in columns:
+        encoding_config = encodings.get(column.name)
+        fill_value = imputation_statistics.get(column.name)
+        if isinstance(encoding_config, BinaryOneHotEncodingConfig):
+            categorical_steps.append(CategoricalStep(column.name, [str(value) for value in encoding_config.mappings],
+                                                     __get_output_indices(output_indices, [encoding_config.renamed_feature_name]),
+                                                     fill_value, np.array(list(encoding_config.mappings.values()), dtype=np.float64)))
+        elif __is_sparse_encoding(encoding_config):
+            continue
+        elif isinstance(encoding_config, MultiOneHotEncodingConfig):
+            categorical_steps.append(CategoricalStep(column.name, get_multi_onehot_categories(encoding_config),
+                                                     __get_output_indices(output_indices, encoding_config.resulting_columns),
+                                                     fill_value))
+        elif isinstance(encoding_config, OrdinalEncodingConfig):
+            categorical_steps.append(CategoricalStep(column.name, [str(value) for value in encoding_config.mappings],
+                                                     __get_output_indices(output_indices, [column.name]),
+                                                     fill_value, np.array(list(encoding_config.mappings.values()), dtype=np.float64)))
+        else:
+            continuous_columns.append(column.name)
+            continuous_output_indices.extend(__get_output_indices(output_indices, [column.name]))
+            fill_values.append(np.nan if fill_value is None else fill_value)
+            continuous_scaling_parameters.append(scaling_parameters.get(column.name, (0.0, 1.0, 1.0, 0.0)))
+    for encoding_config in sparse_encodings_config:
+        fill_value = imputation_statistics.get(encoding_config.original_feature_name)
+        if isinstance(encoding_config, HashingEncodingConfig):
+            sparse_steps.append(HashingStep(encoding_config.original_feature_name, encoding_config.hash_buckets, get_hashing_feature_names(encoding_config), fill_value))
+        else:
+            sparse_steps.append(CategoricalStep(encoding_config.original_feature_name, get_multi_onehot_categories(encoding_config), None,
+                                                fill_value, output_names=encoding_config.resulting_columns))
+
+    shifts, divisors, multipliers, offsets = np.array(continuous_scaling_parameters, dtype=np.float64).reshape(-1, 4).T
+    logger.info(f"\tCompiled preprocessing plan: {len(continuous_columns)} continuous columns in one block, "
+                f"{len(categorical_steps)} dense and {len(sparse_steps)} sparse categorical columns, {len(feature_names)} output features")
+    return PreprocessingPlan(feature_names, continuous_columns, np.array(continuous_output_indices, dtype=np.intp),
+                             np.array(fill_values, dtype=np.float64), shifts, divisors, multipliers, offsets, categorical_steps, sparse_steps)
+
+
+def fill_missing_values(values: np.ndarray, fill_values: np.ndarray) -> None:
+    np.copyto(values, np.broadcast_to(fill_values, values.shape), where=np.isnan(values))
+
+
+def get_feature_names(dataset_columns: Iterable[str], target_names: List[str], encodings_config: List[EncodingConfig]) -> List[str]:
+    encodings = {encoding_config.original_feature_name: encoding_config for encoding_config in encodings_config}
+    feature_names = list()
+    for column_name in dataset_columns:
+        encoding_config = encodings.get(column_name)
+        if column_name in target_names or isinstance(encoding_config, (MultiOneHotEncodingConfig, HashingEncodingConfig)):
+            continue
+        feature_names.append(encoding_config.renamed_feature_name if isinstance(encoding_config, BinaryOneHotEncodingConfig) else column_name)
+    expanded_encodings_config = [encoding_config for encoding_config in encodings_config
+                                 if isinstance(encoding_config, (MultiOneHotEncodingConfig, HashingEncodingConfig)) and encoding_config.original_feature_name not in target_names]
+    for encoding_config in sorted(expanded_encodings_config, key=__is_sparse_encoding):
+        feature_names.extend(__get_resulting_columns(encoding_config))
+    return feature_names
+
+
+def get_sparse_columns(encodings_config: List[EncodingConfig]) -> List[str]:
+    return [encoding_config.original_feature_name for encoding_config in encodings_config if __is_sparse_encoding(encoding_config)]
+
+
+def __is_sparse_encoding(encoding_config: EncodingConfig) -> bool:
+    return isinstance(encoding_config, HashingEncodingConfig) or (isinstance(encoding_config, MultiOneHotEncodingConfig) and bool(encoding_config.sparse))
+
+
+def __get_resulting_columns(encoding_config: Union[MultiOneHotEncodingConfig, HashingEncodingConfig]) -> List[str]:
+    if isinstance(encoding_config, HashingEncodingConfig):
+        return get_hashing_feature_names(encoding_config)
+    return encoding_config.resulting_columns
+
+
+def __get_scaling_parameters(fitted_scalers: List[Tuple[ContinuousFeatureScalingType, List[str], Union[StandardScaler, MinMaxScaler]]]) -> Dict[str, Tuple[float, float, float, float]]:
+    scaling_parameters = dict()
+    for scaler_type, feature_names, scaler in fitted_scalers:
+        for feature_index, feature_name in enumerate(feature_names):
+            if scaler_type == ContinuousFeatureScalingType.STANDARD:
+                scaling_parameters[feature_name] = (scaler.mean_[feature_index], scaler.scale_[feature_index], 1.0, 0.0)
+            elif scaler_type == ContinuousFeatureScalingType.MINMAX:
+                scaling_parameters[feature_name] = (0.0, 1.0, scaler.scale_[feature_index], scaler.min_[feature_index])
+    return scaling_parameters
+
+
+def __get_output_indices(output_indices: Dict[str, int], feature_names: List[str]) -> np.ndarray:
+    missing_feature_names = [feature_name for feature_name in feature_names if feature_name not in output_indices]
+    if missing_feature_names:
+        raise Exception(f"Preprocessing plan outputs '{missing_feature_names}' are not part of the expected features")
+    return np.array([output_indices[feature_name] for feature_name in feature_names], dtype=np.intp)
@@ -1,11 +1,26 @@
 import json
-from typing import Dict, Tuple
+from pathlib import Path
+from typing import Dict, Tuple, Iterator, List
 import pandas as pd
+import pyarrow.parquet as pq
 import os
 
 from configurations.constants import SAMPLE_DATASETS_PATH, LINE_BREAK, SAMPLE_DATASET_FILE_NAME, SAMPLE_CONFIG_FILE_NAME
+from configurations.env_variables import CSV_ENGINE, CONTINUOUS_FEATURES_AS_FLOAT32
 from helpers.logger import logger
-from models.models import DatasetConfig
+from helpers.profiler import profiler
+from models.enums import FeatureType
+from models.models import DatasetConfig, ColumnConfig
+
+
+class DatasetChunks:
+    def __init__(self, dataset_path: Path, columns: List[ColumnConfig], chunk_size: int):
+        self.dataset_path = dataset_path
+        self.columns = columns
+        self.chunk_size = chunk_size
+
+    def __iter__(self) -> Iterator[pd.DataFrame]:
+        return read_file_chunks(self.dataset_path, self.columns, self.chunk_size)
 
 
 def __list_sample_datasets() -> list:
@@ -29,30 +44,73 @@ def pick_sample_dataset() -> str:
             logger.warning("Invalid dataset number. Please specify a valid dataset number.")
 
 
-def read_dataset(dataset_name: str) -> Tuple[pd.DataFrame, DatasetConfig]:
+def read_dataset(dataset_name: str, datasets_path: Path = SAMPLE_DATASETS_PATH) -> Tuple[pd.DataFrame, DatasetConfig]:
     try:
-        dataset_folder_path = SAMPLE_DATASETS_PATH / dataset_name
-        if not os.path.exists(dataset_folder_path):
-            raise Exception(f"Folder for dataset: '{dataset_folder_path}' not found.")
+        dataset_path, config = __read_dataset_config(dataset_name, datasets_path)
+        with profiler.profile("read_dataset") as profile_record:
+            dataset = pd.read_csv(dataset_path, engine=CSV_ENGINE, **__get_read_csv_arguments(config.columns))
+            profile_record.update(rows=dataset.shape[0], columns=dataset.shape[1])
+        logger.info(f"Dataset file '{dataset_path}' read successfully ({dataset.shape[0]} rows, {dataset.shape[1]} columns, {dataset.memory_usage(deep=True).sum() / 1024 ** 2:.2f} MB).")
+        return dataset, config
+    except Exception as exception:
+        logger.error(f"Error while reading files for dataset '{dataset_name}'. Exception: {str(exception)}")
+        raise
 
-        dataset_path = dataset_folder_path / SAMPLE_DATASET_FILE_NAME
-        config_path = dataset_folder_path / SAMPLE_CONFIG_FILE_NAME
 
-        if not os.path.exists(dataset_path):
-            raise Exception(f"File '{SAMPLE_DATASET_FILE_NAME}' not found in dataset folder '{dataset_name}'")
+def read_dataset_chunks(dataset_name: str, chunk_size: int, datasets_path: Path = SAMPLE_DATASETS_PATH) -> Tuple[DatasetChunks, DatasetConfig]:
+    try:
+        dataset_path, config = __read_dataset_config(dataset_name, datasets_path)
+        if CSV_ENGINE != "c":
+            logger.info(f"\tCSV engine '{CSV_ENGINE}' does not support chunked reading, using the 'c' engine instead.")
+        dataset_chunks = DatasetChunks(dataset_path, config.columns, chunk_size)
+        logger.info(f"Dataset file '{dataset_path}' opened for reading in chunks of {chunk_size} rows.")
+        return dataset_chunks, config
+    except Exception as exception:
+        logger.error(f"Error while reading files for dataset '{dataset_name}'. Exception: {str(exception)}")
+        raise
 
-        if not os.path.exists(config_path):
-            raise Exception(f"File '{SAMPLE_CONFIG_FILE_NAME}' not found in dataset folder '{dataset_name}'")
 
-        dataset = pd.read_csv(dataset_path)
-        logger.info(f"Dataset file '{dataset_path}' read successfully.")
+def read_file_chunks(file_path: Path, columns: List[ColumnConfig], chunk_size: int) -> Iterator[pd.DataFrame]:
+    if file_path.suffix == ".parquet":
+        parquet_file = pq.ParquetFile(file_path)
+        read_columns = [column.name for column in columns if column.name in parquet_file.schema_arrow.names]
+        for record_batch in parquet_file.iter_batches(batch_size=chunk_size, columns=read_columns):
+            yield record_batch.to_pandas()
+        return
+    available_columns = pd.read_csv(file_path, nrows=0).columns
+    read_columns = [column for column in columns if column.name in available_columns]
+    yield from pd.read_csv(file_path, engine="c", chunksize=chunk_size, **__get_read_csv_arguments(read_columns))
 
-        with open(config_path, "r") as f:
-            config_json = json.load(f)
-        config = DatasetConfig(**config_json)
-        logger.info(f"Dataset config file '{config_path}' read successfully.")
 
-        return dataset, config
-    except Exception as exception:
-        logger.error(f"Error while reading files for dataset '{dataset_name}'. Exception: {str(exception)}")
-        raise
+def __read_dataset_config(dataset_name: str, datasets_path: Path) -> Tuple[Path, DatasetConfig]:
+    dataset_folder_path = datasets_path / dataset_name
+    if not os.path.exists(dataset_folder_path):
+        raise Exception(f"Folder for dataset: '{dataset_folder_path}' not found.")
+
+    dataset_path = dataset_folder_path / SAMPLE_DATASET_FILE_NAME
+    config_path = dataset_folder_path / SAMPLE_CONFIG_FILE_NAME
+
+    if not os.path.exists(dataset_path):
+        raise Exception(f"File '{SAMPLE_DATASET_FILE_NAME}' not found in dataset folder '{dataset_name}'")
+
+    if not os.path.exists(config_path):
+        raise Exception(f"File '{SAMPLE_CONFIG_FILE_NAME}' not found in dataset folder '{dataset_name}'")
+
+    with open(config_path, "r") as f:
+        config_json = json.load(f)
+    config = DatasetConfig(**config_json)
+    logger.info(f"Dataset config file '{config_path}' read successfully.")
+    return dataset_path, config
+
+
+def __get_read_csv_arguments(columns: List[ColumnConfig]) -> Dict:
+    used_columns = [column for column in columns if not column.drop]
+    dtypes = dict()
+    for column in used_columns:
+        if column.type == FeatureType.CATEGORICAL and not column.target:
+            dtypes[column.name] = "category"
+        elif column.type == FeatureType.CONTINUOUS and CONTINUOUS_FEATURES_AS_FLOAT32:
+            dtypes[column.name] = "float32"
+    logger.info(f"\tReading columns ({len(used_columns)}): {[column.name for column in used_columns]}")
+    logger.info(f"\tColumn types: {dtypes}")
+    return {"usecols": [column.name for column in used_columns], "dtype": dtypes}
@@ -0,0 +1,191 @@
+import json
+import queue
+import threading
+import time
+from collections import deque
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from pathlib import Path
+from typing import List, Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from configurations.constants import LINE_BREAK
+from helpers.logger import logger
+from services.prediction_service import PredictionPlan
+
+
+class ScoringHTTPServer(ThreadingHTTPServer):
+    request_queue_size = 1024
+    daemon_threads = True
+
+
+class PendingRequest:
+    def __init__(self, rows: List[Dict]):
+        self.rows = rows
+        self.received_at = time.perf_counter()
+        self.predictions = None
+        self.error = None
+        self.completed = threading.Event()
+
+
+class LatencyMetrics:
+    def __init__(self, window_size: int = 10_000):
+        self.__latencies = deque(maxlen=window_size)
+        self.__lock = threading.Lock()
+        self.__started_at = time.time()
+        self.requests_count = 0
+        self.errors_count = 0
+        self.batches_count = 0
+        self.batched_rows_count = 0
+
+    def record_request(self, latency_seconds: float, failed: bool) -> None:
+        with self.__lock:
+            self.__latencies.append((time.time(), latency_seconds))
+            self.requests_count += 1
+            self.errors_count += int(failed)
+
+    def record_batch(self, rows_count: int) -> None:
+        with self.__lock:
+            self.batches_count += 1
+            self.batched_rows_count += rows_count
+
+    def snapshot(self) -> Dict:
+        with self.__lock:
+            latencies = list(self.__latencies)
+            now = time.time()
+            requests_count, errors_count = self.requests_count, self.errors_count
+            batches_count, batched_rows_count = self.batches_count, self.batched_rows_count
+        window_latencies = np.array([latency for _, latency in latencies]) * 1000
+        window_seconds = now - latencies[0][0] if len(latencies) > 1 else 0
+        return {
+            "requests": requests_count,
+            "errors": errors_count,
+            "batches": batches_count,
+            "mean_batch_size": batched_rows_count / batches_count if batches_count else 0,
+            "latency_p50_ms": float(np.percentile(window_latencies, 50)) if len(window_latencies) else None,
+            "latency_p99_ms": float(np.percentile(window_latencies, 99)) if len(window_latencies) else None,
+            "qps": len(latencies) / window_seconds if window_seconds else 0,
+            "uptime_seconds": now - self.__started_at,
+        }
+
+
+class MicroBatcher:
+    def __init__(self, prediction_plan: PredictionPlan, max_batch_size: int, max_wait_seconds: float, metrics: LatencyMetrics):
+        self.prediction_plan = prediction_plan
+        self.max_batch_size = max_batch_size
+        self.max_wait_seconds = max_wait_seconds
+        self.metrics = metrics
+        self.required_columns = prediction_plan.preprocessing_plan.input_columns
+        self.__pending_requests = queue.Queue()
+        threading.Thread(target=self.__process_batches, name="micro_batcher", daemon=True).start()
+
+    def score(self, rows: List[Dict]) -> List[Dict]:
+        pending_request = PendingRequest(rows)
+        pending_request.error = self.__validate_rows(rows)
+        if pending_request.error is None:
+            self.__pending_requests.put(pending_request)
+            pending_request.completed.wait()
+        self.metrics.record_request(time.perf_counter() - pending_request.received_at, pending_request.error is not None)
+        if pending_request.error is not None:
+            raise pending_request.error
+        return pending_request.predictions
+
+    def __validate_rows(self, rows: List[Dict]) -> Optional[Exception]:
+        for row_number, row in enumerate(rows, 1):
+            if not isinstance(row, dict):
+                return ValueError(f"Row {row_number} is not a JSON object")
+            missing_columns = [column for column in self.required_columns if column not in row]
+            if missing_columns:
+                return ValueError(f"Row {row_number} is missing the input columns {missing_columns}")
+        return None
+
+    def __process_batches(self) -> None:
+        while True:
+            batch = [self.__pending_requests.get()]
+            rows_count = len(batch[0].rows)
+            deadline = time.perf_counter() + self.max_wait_seconds
+            while rows_count < self.max_batch_size:
+                remaining_wait_seconds = deadline - time.perf_counter()
+                if remaining_wait_seconds <= 0:
+                    break
+                try:
+                    pending_request = self.__pending_requests.get(timeout=remaining_wait_seconds)
+                except queue.Empty:
+                    break
+                batch.append(pending_request)
+                rows_count += len(pending_request.rows)
+            self.__score_batch(batch, rows_count)
+
+    def __score_batch(self, batch: List[PendingRequest], rows_count: int) -> None:
+        try:
+            dataset = pd.DataFrame.from_records([row for pending_request in batch for row in pending_request.rows])
+            predictions = self.prediction_plan.predict(dataset).to_dict(orient="records")
+            offset = 0
+            for pending_request in batch:
+                pending_request.predictions = predictions[offset:offset + len(pending_request.rows)]
+                offset += len(pending_request.rows)
+            self.metrics.record_batch(rows_count)
+        except Exception as exception:
+            if len(batch) > 1:
+                logger.warning(f"Error while scoring batch of {rows_count} rows, scoring its requests one by one. Exception: {str(exception)}")
+                for pending_request in batch:
+                    self.__score_batch([pending_request], len(pending_request.rows))
+                return
+            logger.error(f"Error while scoring batch of {rows_count} rows. Exception: {str(exception)}")
+            batch[0].error = exception
+        for pending_request in batch:
+            pending_request.completed.set()
+
+
+def serve(working_directory_path: Path, model_name: str, host: str, port: int, max_batch_size: int, max_wait_milliseconds: float) -> None:
+    logger.info(LINE_BREAK)
+    logger.info("SCORING SERVER")
+    prediction_plan = PredictionPlan(working_directory_path, model_name)
+    logger.info(f"\tLoaded model '{model_name}' and preprocessing artifacts from '{working_directory_path}'")
+    metrics = LatencyMetrics()
+    micro_batcher = MicroBatcher(prediction_plan, max_batch_size, max_wait_milliseconds / 1000, metrics)
+    server = ScoringHTTPServer((host, port), __create_request_handler(micro_batcher, metrics))
+    logger.info(f"\tListening on 'http://{host}:{server.server_port}' (max batch size: {max_batch_size}, max wait: {max_wait_milliseconds} ms)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        logger.info("Scoring server stopped.")
+    finally:
+        server.server_close()
+
+
+def __create_request_handler(micro_batcher: MicroBatcher, metrics: LatencyMetrics) -> type:
+    class ScoringRequestHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path == "/metrics":
+                self.__send_json(200, metrics.snapshot())
+            elif self.path == "/health":
+                self.__send_json(200, {"status": "ok", "model": micro_batcher.prediction_plan.model_name})
+            else:
+                self.__send_json(404, {"error": f"Unknown path '{self.path}'"})
+
+        def do_POST(self):
+            if self.path != "/predict":
+                self.__send_json(404, {"error": f"Unknown path '{self.path}'"})
+                return
+            try:
+                request_body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+                rows = request_body["rows"] if isinstance(request_body, dict) and "rows" in request_body else [request_body]
+                predictions = micro_batcher.score(rows)
+                self.__send_json(200, {"predictions": predictions})
+            except Exception as exception:
+                self.__send_json(400, {"error": str(exception)})
+
+        def log_message(self, format, *args):
+            logger.debug(f"\t{self.address_string()} - {format % args}")
+
+        def __send_json(self, status_code: int, content: Dict) -> None:
+            response_body = json.dumps(content, default=lambda value: value.item() if hasattr(value, "item") else str(value)).encode()
+            self.send_response(status_code)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(response_body)))
+            self.end_headers()
+            self.wfile.write(response_body)
+
+    return ScoringRequestHandler